@@ -1,4 +1,8 @@
-from rest_framework import authentication
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import authentication, exceptions
+
+from . import cache
 
 
 class TokenAuthentication(authentication.TokenAuthentication):
@@ -6,3 +10,19 @@ class TokenAuthentication(authentication.TokenAuthentication):
         from .models import Token
 
         return Token
+
+    def authenticate_credentials(self, key):
+        """Resolve the token from the cache before querying the database"""
+        token = cache.get_token(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set_token(key, token)
+
+            return user, token
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+
+        return token.user, token
@@ -0,0 +1,120 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+TOKEN_KEY = "accounts:token:{digest}"
+
+
+class LRUCache:
+    """Thread safe in-process LRU cache whose entries expire after a TTL"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key, value, ttl: float, max_size: int):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LRUCache()
+
+
+def get_shared_cache():
+    """Return the shared cache backing the local one, if configured"""
+    if settings.TOKEN_CACHE_ALIAS:
+        return caches[settings.TOKEN_CACHE_ALIAS]
+
+
+def get_shared_key(key: str) -> str:
+    """Hash token keys so they never show up in the shared cache"""
+    return TOKEN_KEY.format(digest=hashlib.sha256(key.encode()).hexdigest())
+
+
+def get_token(key: str):
+    """Return the cached token (with its user loaded) for `key`.
+
+    Looks in the in-process LRU first, when enabled, and then in the shared
+    cache. A copy is returned so requests never share mutable model
+    instances.
+    """
+    token = local_cache.get(key) if settings.TOKEN_CACHE_TTL else None
+    if token is None:
+        shared_cache = get_shared_cache()
+        if shared_cache is None:
+            return None
+        token = shared_cache.get(get_shared_key(key))
+        if token is None:
+            return None
+        set_local_token(key, token)
+
+    return copy.deepcopy(token)
+
+
+def set_local_token(key: str, token):
+    if not settings.TOKEN_CACHE_TTL:
+        return
+
+    local_cache.set(
+        key,
+        token,
+        ttl=settings.TOKEN_CACHE_TTL,
+        max_size=settings.TOKEN_CACHE_SIZE,
+    )
+
+
+def set_token(key: str, token):
+    """Cache `token` in both the local and the shared cache"""
+    token = copy.deepcopy(token)
+    set_local_token(key, token)
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        shared_cache.set(
+            get_shared_key(key),
+            token,
+            timeout=settings.TOKEN_CACHE_SHARED_TTL,
+        )
+
+
+def invalidate_tokens(keys):
+    """Drop the given token keys from both caches.
+
+    Other processes only drop their local entries once the TTL expires,
+    so `TOKEN_CACHE_TTL` bounds how long a revoked token may still work
+    there.
+    """
+    keys = list(keys)
+    for key in keys:
+        local_cache.delete(key)
+    shared_cache = get_shared_cache()
+    if shared_cache is not None and keys:
+        shared_cache.delete_many([get_shared_key(key) for key in keys])
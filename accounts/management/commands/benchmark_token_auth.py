@@ -0,0 +1,54 @@
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.test.utils import override_settings
+
+from rest_framework.test import APIRequestFactory
+
+from accounts import cache
+from accounts.models import Token
+from accounts.views import ManageUserView
+from core.management.benchmark import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    """Compare token authenticated request throughput with and without
+    the token cache."""
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--requests", type=int, default=1000)
+
+    def run_benchmark(self, options):
+        user = get_user_model().objects.create_user(
+            email=f"benchmark-{uuid.uuid4()}@example.com",
+            password=str(uuid.uuid4()),
+        )
+        token = Token.objects.create(user=user)
+        factory = APIRequestFactory()
+        view = ManageUserView.as_view()
+        count = options["requests"]
+
+        def run_requests():
+            for _ in range(count):
+                request = factory.get(
+                    "/", HTTP_AUTHORIZATION=f"Token {token.key}"
+                )
+                view(request)
+
+        for label, ttl, alias in (
+            ("uncached", 0, ""),
+            ("shared cache", 0, "default"),
+            ("in-process cache", 60, ""),
+        ):
+            cache.local_cache.clear()
+            with override_settings(
+                TOKEN_CACHE_TTL=ttl, TOKEN_CACHE_ALIAS=alias
+            ):
+                milliseconds = self.timeit(run_requests, options["repeat"])
+            self.report(f"{label} ({count} requests)", milliseconds)
+            self.stdout.write(
+                f"{'':<40} {count / milliseconds * 1000:>10.0f} req/s"
+            )
@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_tokens
+from .models import Token
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Stop authenticating with a deleted token"""
+    invalidate_tokens([instance.key])
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """Drop cached tokens of updated users, e.g. when deactivated"""
+    if not created:
+        invalidate_tokens(
+            Token.objects.filter(user=instance).values_list("key", flat=True)
+        )
@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts import cache
+from accounts.models import Token
+
+ME_URL = reverse("accounts:me")
+
+
+class TokenAuthenticationCacheTest(TestCase):
+    """Test token lookups are cached and invalidated"""
+
+    def setUp(self):
+        cache.local_cache.clear()
+        caches["default"].clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+            first_name="Test",
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_token_lookup_is_cached(self):
+        """Test repeated requests do not query the token and user"""
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], self.user.email)
+
+    @override_settings(TOKEN_CACHE_TTL=0, TOKEN_CACHE_ALIAS="")
+    def test_cache_disabled(self):
+        """Test the cache can be disabled"""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+
+    def test_invalid_token(self):
+        """Test unknown tokens are still rejected"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_is_invalidated(self):
+        """Test a deleted token stops authenticating"""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_invalidated(self):
+        """Test tokens of a deactivated user stop authenticating"""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_saves_current_user(self):
+        """Test updates do not write back the columns of a cached user"""
+        self.client.get(ME_URL)
+        # As changed by another process, whose invalidation is not seen
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.client.patch(ME_URL, {"first_name": "Changed"})
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Changed")
+        self.assertFalse(self.user.is_active)
+
+    def test_updated_user_is_reloaded(self):
+        """Test changes to the user are visible on the next request"""
+        self.client.get(ME_URL)
+
+        self.client.patch(ME_URL, {"first_name": "Changed"})
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.data["first_name"], "Changed")
+
+    def test_shared_cache(self):
+        """Test tokens are resolved from the shared cache"""
+        self.client.get(ME_URL)
+        cache.local_cache.clear()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.token.delete()
+        cache.local_cache.clear()
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_CACHE_TTL=30, TOKEN_CACHE_ALIAS="")
+    def test_local_cache(self):
+        """Test tokens are resolved from the in-process cache"""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.token.delete()
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
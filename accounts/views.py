@@ -1,3 +1,5 @@
+from django.contrib.auth import get_user_model
+
 from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.response import Response
@@ -37,5 +39,12 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
-        """Retrieve and return the authenticated user"""
-        return self.request.user
+        """Retrieve and return the authenticated user.
+
+        Updates save a copy read from the database, as the authenticated
+        user may come from the token cache and have stale columns.
+        """
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+
+        return get_user_model().objects.get(pk=self.request.user.pk)
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import os
+import tempfile
 from os import environ as env
 from pathlib import Path
 
@@ -41,6 +43,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "core",
     "accounts",
@@ -49,6 +52,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -57,6 +61,12 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Responses smaller than this many bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = int(env.get("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(env.get("COMPRESSION_GZIP_LEVEL", 6))
+# Qualities above ~6 cost a lot more CPU for a few percent smaller payloads
+COMPRESSION_BROTLI_QUALITY = int(env.get("COMPRESSION_BROTLI_QUALITY", 5))
+
 ROOT_URLCONF = "app.urls"
 
 TEMPLATES = [
@@ -77,6 +87,22 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "app.wsgi.application"
 
+# Production server (`manage.py serve`, gunicorn): processes of threads,
+# the latter serving requests while others wait on the database
+SERVER_BIND = env.get("SERVER_BIND", "0.0.0.0:8000")
+SERVER_WORKERS = int(env.get("SERVER_WORKERS", os.cpu_count() or 1))
+SERVER_THREADS = int(env.get("SERVER_THREADS", 4))
+SERVER_MAX_REQUESTS = int(env.get("SERVER_MAX_REQUESTS", 10000))
+SERVER_GRACEFUL_TIMEOUT = int(env.get("SERVER_GRACEFUL_TIMEOUT", 30))
+# Seconds an idle connection is kept open for the next request
+SERVER_KEEP_ALIVE = int(env.get("SERVER_KEEP_ALIVE", 5))
+
+# Serve API reads with async views (see `core.viewsets.AsyncReadMixin`),
+# and the `serve` command with uvicorn workers running the ASGI application
+# (`app.asgi.application`). A WSGI server would run each async view in an
+# event loop of its own.
+ASYNC_VIEWS = bool(int(env.get("ASYNC_VIEWS", 0)))
+
 
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
@@ -89,9 +115,79 @@ DATABASES = {
         "NAME": env.get("DB_NAME"),
         "USER": env.get("DB_USER"),
         "PASSWORD": env.get("DB_PASS"),
+        # Seconds a connection is reused across requests, saving the setup
+        # of a new one each time
+        "CONN_MAX_AGE": int(env.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": bool(int(env.get("DB_CONN_HEALTH_CHECKS", 1))),
     }
 }
 
+# Share a pool of at most this many connections between the threads of each
+# process (threaded or ASGI servers), rather than a connection per thread
+DB_POOL_MAX_SIZE = int(env.get("DB_POOL_MAX_SIZE", 0))
+if DB_POOL_MAX_SIZE:
+    DATABASES["default"].update(
+        {
+            "ENGINE": "core.db.backends.postgresql_pool",
+            # Connections go back to the pool at the end of each request
+            "CONN_MAX_AGE": 0,
+            "POOL": {
+                "MAX_SIZE": DB_POOL_MAX_SIZE,
+                "TIMEOUT": float(env.get("DB_POOL_TIMEOUT", 10)),
+            },
+        }
+    )
+
+# Read replicas of the default database, as comma separated HOST[:PORT]
+DATABASE_REPLICAS = []
+for index, address in enumerate(
+    filter(None, env.get("DB_REPLICA_HOSTS", "").split(","))
+):
+    host, _, port = address.strip().partition(":")
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+# Seconds the reads of a user go to the primary after they write, which
+# should be above the replication lag. The pins are kept in the
+# DATABASE_REPLICA_PIN_CACHE_ALIAS cache, which must be shared by the
+# server's processes when there are replicas.
+DATABASE_REPLICA_PIN_SECONDS = int(env.get("DB_REPLICA_PIN_SECONDS", 5))
+DATABASE_REPLICA_PIN_CACHE_ALIAS = env.get(
+    "DB_REPLICA_PIN_CACHE_ALIAS", "default"
+)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# Recipe responses, their ETags, tokens and replica pins are invalidated in
+# the cache by the process handling the write, so under several server
+# workers it must be shared by them, e.g. Redis with
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and
+# CACHE_LOCATION=redis://HOST:6379. The default one is private to each
+# process, which `serve` refuses for more than one worker.
+
+CACHES = {
+    "default": {
+        "BACKEND": env.get(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": env.get("CACHE_LOCATION", ""),
+    }
+}
+
+# Cache alias and timeout (seconds, 0 disables it) of recipe API responses
+RECIPE_CACHE_ALIAS = env.get("RECIPE_CACHE_ALIAS", "default")
+RECIPE_CACHE_TIMEOUT = int(env.get("RECIPE_CACHE_TIMEOUT", 300))
+# Render recipe lists from `values()` rows rather than model instances
+RECIPE_FAST_LIST = bool(int(env.get("RECIPE_FAST_LIST", 1)))
+
 
 # Authentication
 AUTH_USER_MODEL = "core.User"
@@ -114,6 +210,18 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Token authentication cache: entries are kept in the TOKEN_CACHE_ALIAS
+# cache (empty to disable) for TOKEN_CACHE_SHARED_TTL seconds, and with a
+# TOKEN_CACHE_TTL above 0, in an in-process LRU of TOKEN_CACHE_SIZE tokens
+# for TOKEN_CACHE_TTL seconds. Deleted tokens and updated users are
+# invalidated in the cache and in the LRU of the process making the
+# change; the LRUs of other processes keep them up to TOKEN_CACHE_TTL, so
+# it is only safe for a single process.
+TOKEN_CACHE_SIZE = int(env.get("TOKEN_CACHE_SIZE", 1024))
+TOKEN_CACHE_TTL = int(env.get("TOKEN_CACHE_TTL", 0))
+TOKEN_CACHE_ALIAS = env.get("TOKEN_CACHE_ALIAS", "default")
+TOKEN_CACHE_SHARED_TTL = int(env.get("TOKEN_CACHE_SHARED_TTL", 300))
+
 # REST FRAMEWORK
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -121,8 +229,22 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.SessionAuthentication",
         "accounts.authentication.TokenAuthentication",
     ),
+    "DEFAULT_PAGINATION_CLASS": "recipe.pagination.IdCursorPagination",
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    "PAGE_SIZE": int(env.get("API_PAGE_SIZE", 100)),
 }
 
+# Upper bound for the `page_size` query parameter on paginated endpoints
+API_MAX_PAGE_SIZE = int(env.get("API_MAX_PAGE_SIZE", 500))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.1/topics/i18n/
@@ -149,4 +271,58 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Media files
 MEDIA_URL = "/media/"
-MEDIA_ROOT = "/vol/web/media"
+MEDIA_ROOT = env.get("MEDIA_ROOT", "/vol/web/media")
+
+# Media and static files are served by `core.files.serve`. Files named after
+# their content are cached for FILES_IMMUTABLE_MAX_AGE seconds, the others
+# revalidated after FILES_MAX_AGE seconds. FILES_OFFLOAD hands the sending
+# of the bytes to the proxy in front of the app: "x-accel-redirect" (nginx)
+# to the internal location FILES_ACCEL_REDIRECT_PREFIX + the URL path, or
+# "x-sendfile" (Apache, lighttpd) with the path of the file.
+STATICFILES_STORAGE = "core.storage.CompressedManifestStaticFilesStorage"
+FILES_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+FILES_MAX_AGE = int(env.get("FILES_MAX_AGE", 60 * 60))
+FILES_OFFLOAD = env.get("FILES_OFFLOAD", "")
+FILES_ACCEL_REDIRECT_PREFIX = env.get(
+    "FILES_ACCEL_REDIRECT_PREFIX", "/protected"
+)
+
+# Bulk recipe endpoints accept up to RECIPE_BULK_MAX_ITEMS items per request,
+# written in batches of RECIPE_BULK_BATCH_SIZE rows.
+RECIPE_BULK_MAX_ITEMS = int(env.get("RECIPE_BULK_MAX_ITEMS", 10000))
+RECIPE_BULK_BATCH_SIZE = int(env.get("RECIPE_BULK_BATCH_SIZE", 1000))
+
+# Recipe image processing: images are resized to fit each variant's
+# (width, height), in every format, by RECIPE_IMAGE_WORKERS background
+# threads (0 processes them inline once the upload is committed).
+RECIPE_IMAGE_WORKERS = int(env.get("RECIPE_IMAGE_WORKERS", 2))
+RECIPE_IMAGE_VARIANTS = {
+    "thumbnail": (320, 320),
+    "medium": (1280, 1280),
+}
+RECIPE_IMAGE_FORMATS = ("webp", "jpeg")
+RECIPE_IMAGE_QUALITY = int(env.get("RECIPE_IMAGE_QUALITY", 80))
+
+# Recipe image uploads are streamed to RECIPE_IMAGE_UPLOAD_TEMP_DIR. It must
+# be outside MEDIA_ROOT, which is served, and is best on the same filesystem
+# for uploads to be moved rather than copied. Images above
+# RECIPE_IMAGE_MAX_BYTES or RECIPE_IMAGE_MAX_PIXELS are rejected, and so are
+# uploads whose dimensions cannot be read in the first
+# RECIPE_IMAGE_HEADER_BYTES bytes.
+RECIPE_IMAGE_UPLOAD_TEMP_DIR = env.get(
+    "RECIPE_IMAGE_UPLOAD_TEMP_DIR", tempfile.gettempdir()
+)
+RECIPE_IMAGE_MAX_BYTES = int(env.get("RECIPE_IMAGE_MAX_BYTES", 15 * 2**20))
+RECIPE_IMAGE_MAX_PIXELS = int(env.get("RECIPE_IMAGE_MAX_PIXELS", 50_000_000))
+RECIPE_IMAGE_HEADER_BYTES = 512 * 2**10
+
+# Text search configuration used to index and query recipes on PostgreSQL
+RECIPE_SEARCH_CONFIG = env.get("RECIPE_SEARCH_CONFIG", "english")
+
+# Tag and ingredient suggestions return RECIPE_SUGGEST_LIMIT names by default,
+# up to RECIPE_SUGGEST_MAX_LIMIT. Without PostgreSQL they are served from
+# in-process tries kept for RECIPE_SUGGEST_CACHE_SIZE users.
+RECIPE_SUGGEST_LIMIT = int(env.get("RECIPE_SUGGEST_LIMIT", 10))
+RECIPE_SUGGEST_MAX_LIMIT = int(env.get("RECIPE_SUGGEST_MAX_LIMIT", 50))
+RECIPE_SUGGEST_CACHE_SIZE = int(env.get("RECIPE_SUGGEST_CACHE_SIZE", 1000))
+RECIPE_SUGGEST_CACHE_TTL = int(env.get("RECIPE_SUGGEST_CACHE_TTL", 300))
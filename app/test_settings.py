@@ -0,0 +1,18 @@
+"""
+Django settings for running the tests.
+
+    python manage.py test --settings=app.test_settings
+"""
+
+from app.settings import *  # noqa: F401, F403
+from app.settings import DATABASES
+
+# Stands in for a read replica in the tests of `core.routers`: a database
+# of its own, never catching up with the writes of the tests. Only created
+# when tests using it run.
+DATABASES["test_replica"] = {"ENGINE": "django.db.backends.sqlite3"}
+
+# In the test process, rather than in a shared cache outliving the run
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
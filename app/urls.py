@@ -15,12 +15,17 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import include, path
-from django.conf.urls.static import static
 from django.conf import settings
 
+from core.files import file_urls
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     # API endpoints
     path("api/accounts/", include("accounts.urls")),
     path("api/recipe/", include("recipe.urls")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+urlpatterns += file_urls(settings.MEDIA_URL, settings.MEDIA_ROOT)
+urlpatterns += file_urls(
+    settings.STATIC_URL, settings.STATIC_ROOT, precompressed=True
+)
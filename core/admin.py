@@ -2,7 +2,14 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 
-from .models import Ingredient, Recipe, Tag, User
+from .models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    RecipeTag,
+    Tag,
+    User,
+)
 
 
 @admin.register(User)
@@ -36,6 +43,20 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class RecipeIngredientInline(admin.TabularInline):
+    model = RecipeIngredient
+    extra = 1
+
+
+class RecipeTagInline(admin.TabularInline):
+    model = RecipeTag
+    extra = 1
+
+
+@admin.register(Recipe)
+class RecipeAdmin(admin.ModelAdmin):
+    inlines = (RecipeIngredientInline, RecipeTagInline)
+
+
 admin.site.register(Ingredient)
 admin.site.register(Tag)
-admin.site.register(Recipe)
@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+# Cache backends whose entries are private to each process
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+SHARED_CACHE_HINT = (
+    "Set CACHE_BACKEND to a cache shared by the processes, e.g. "
+    "django.core.cache.backends.redis.RedisCache"
+)
+
+
+def is_process_local_cache(alias: str) -> bool:
+    """Return whether the entries of the cache `alias` stay in one process"""
+    return settings.CACHES[alias]["BACKEND"] in PROCESS_LOCAL_CACHES
+
+
+@register(Tags.caches)
+def check_replica_pin_cache(app_configs, **kwargs):
+    """Check users are pinned to the primary across processes"""
+    alias = settings.DATABASE_REPLICA_PIN_CACHE_ALIAS
+    if settings.DATABASE_REPLICAS and is_process_local_cache(alias):
+        return [
+            Error(
+                f"DATABASE_REPLICA_PIN_CACHE_ALIAS ({alias!r}) is a cache of "
+                "each process: users writing would only read their writes "
+                "from the primary in the process serving the write.",
+                hint=f"{SHARED_CACHE_HINT}.",
+                id="core.E002",
+            )
+        ]
+
+    return []
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    """Check the caches the server's workers must agree on are shared.
+
+    The `serve` command runs it before starting several workers.
+    """
+    errors = []
+    if is_process_local_cache(settings.RECIPE_CACHE_ALIAS):
+        errors.append(
+            Error(
+                f"RECIPE_CACHE_ALIAS ({settings.RECIPE_CACHE_ALIAS!r}) is a "
+                "cache of each process: recipe writes would only invalidate "
+                "the responses and ETags of the worker serving them.",
+                hint=f"{SHARED_CACHE_HINT}, or serve with a single worker.",
+                id="core.E001",
+            )
+        )
+    alias = settings.TOKEN_CACHE_ALIAS
+    if alias and is_process_local_cache(alias):
+        errors.append(
+            Error(
+                f"TOKEN_CACHE_ALIAS ({alias!r}) is a cache of each process: "
+                "deleted tokens and deactivated users would keep "
+                "authenticating on the other workers.",
+                hint=f"{SHARED_CACHE_HINT}, set TOKEN_CACHE_ALIAS to an "
+                "empty string, or serve with a single worker.",
+                id="core.E003",
+            )
+        )
+    if settings.TOKEN_CACHE_TTL:
+        errors.append(
+            Warning(
+                "TOKEN_CACHE_TTL enables an in-process token cache: deleted "
+                "tokens and deactivated users keep authenticating on the "
+                "other workers for up to TOKEN_CACHE_TTL seconds.",
+                hint="Set TOKEN_CACHE_TTL to 0, or serve with a single worker.",
+                id="core.W001",
+            )
+        )
+
+    return errors
@@ -0,0 +1,80 @@
+import functools
+import os
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from core.db.pool import ConnectionPool
+
+# Pools by process and database alias, shared by the threads of a process
+pools = {}
+pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend checking connections out of a per-process pool.
+
+    Closing a connection, e.g. at the end of a request with `CONN_MAX_AGE`
+    set to 0, gives it back to the pool instead, rolled back, for the next
+    request of any thread to reuse. The pool is configured with the `POOL`
+    entry of the database settings: `MAX_SIZE` connections at most, waited
+    for up to `TIMEOUT` seconds. With `CONN_HEALTH_CHECKS`, a connection is
+    checked when it is taken out of the pool.
+
+    Pools are per process, so that forked workers never share the sockets
+    of their parent.
+    """
+
+    @property
+    def pool(self) -> ConnectionPool:
+        key = (os.getpid(), self.alias)
+        with pools_lock:
+            pool = pools.get(key)
+            if pool is None:
+                options = self.settings_dict.get("POOL", {})
+                pool = pools[key] = ConnectionPool(
+                    max_size=options.get("MAX_SIZE", 10),
+                    timeout=options.get("TIMEOUT", 10),
+                )
+
+        return pool
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.get(
+            functools.partial(super().get_new_connection, conn_params),
+            check=(
+                self.is_connection_usable
+                if self.settings_dict["CONN_HEALTH_CHECKS"]
+                else None
+            ),
+        )
+        self.isolation_level = connection.isolation_level
+        return connection
+
+    @staticmethod
+    def is_connection_usable(connection) -> bool:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not connection.autocommit:
+                connection.rollback()
+        except base.Database.Error:
+            return False
+
+        return True
+
+    def _close(self):
+        if self.connection is None:
+            return
+
+        connection = self.connection
+        discard = connection.closed
+        if not discard:
+            status = connection.get_transaction_status()
+            try:
+                if status != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except base.Database.Error:
+                discard = True
+        self.pool.put(connection, discard=discard)
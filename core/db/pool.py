@@ -0,0 +1,60 @@
+import threading
+
+from django.db import OperationalError
+
+
+class ConnectionPool:
+    """Thread safe pool of up to `max_size` database connections.
+
+    Connections are opened with the `connect` callable given to `get` when
+    none is idle, and callers wait up to `timeout` seconds for one to be
+    given back once `max_size` of them are checked out. The most recently
+    used connection is handed out first, so that idle ones beyond the load
+    can time out server side.
+    """
+
+    def __init__(self, max_size: int, timeout: float):
+        self.timeout = timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def get(self, connect, check=None):
+        """Check out a connection, opening one with `connect` if none is idle.
+
+        Idle connections for which `check` returns false are closed.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OperationalError(
+                f"No database connection available after {self.timeout}s"
+            )
+        try:
+            while True:
+                with self._lock:
+                    connection = self._idle.pop() if self._idle else None
+                if connection is None:
+                    return connect()
+                if check is None or check(connection):
+                    return connection
+                connection.close()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def put(self, connection, discard: bool = False):
+        """Give back a connection, closing it if `discard` or already closed"""
+        try:
+            if discard or connection.closed:
+                connection.close()
+            else:
+                with self._lock:
+                    self._idle.append(connection)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close the idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
@@ -0,0 +1,260 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote, urlsplit
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotAllowed,
+)
+from django.urls import re_path
+from django.utils._os import safe_join
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from core.middleware import get_accepted_encodings
+
+# Names with a segment of hex digits, e.g. recipe images or static files
+# hashed by `collectstatic`, are named after their content: it never changes
+HASHED_NAME = re.compile(r"(?:^|\.)[0-9a-f]{12,}\.")
+# Suffixes of the precompressed copies of static files, by content coding
+PRECOMPRESSED = {"br": ".br", "gzip": ".gz"}
+# Only single ranges are served, the whole file is sent for any other
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FileSlice:
+    """Read `length` bytes of `file` from `offset`, e.g. a requested range.
+
+    Streamed by `FileResponse`, or sent with `sendfile` by gunicorn, from
+    the current position of the file for the `Content-Length` of the
+    response.
+    """
+
+    def __init__(self, file, offset: int, length: int):
+        self.file = file
+        self.offset = offset
+        self.length = length
+        self.remaining = length
+        file.seek(offset)
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+
+        return data
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def get_cache_control(path: str) -> dict:
+    """Return the `Cache-Control` directives of the file at `path`"""
+    if HASHED_NAME.search(os.path.basename(path)):
+        return {
+            "public": True,
+            "max_age": settings.FILES_IMMUTABLE_MAX_AGE,
+            "immutable": True,
+        }
+
+    return {"public": True, "max_age": settings.FILES_MAX_AGE}
+
+
+def get_precompressed(request, fullpath: str):
+    """Return the path and coding of the best precompressed copy accepted"""
+    accepted = get_accepted_encodings(
+        request.META.get("HTTP_ACCEPT_ENCODING", "")
+    )
+    for encoding, suffix in PRECOMPRESSED.items():
+        if encoding in accepted and os.path.isfile(fullpath + suffix):
+            return fullpath + suffix, encoding
+
+    return fullpath, None
+
+
+def parse_range(header: str, size: int):
+    """Return the `(offset, length)` of the `Range` of a file of `size` bytes.
+
+    Returns None for ranges to ignore, sending the whole file, and raises
+    ValueError for those which cannot be satisfied.
+    """
+    match = RANGE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first:
+        # The last `last` bytes
+        if not last:
+            return None
+        length = min(int(last), size)
+        if not length:
+            raise ValueError(header)
+        return size - length, length
+
+    start = int(first)
+    if start >= size:
+        raise ValueError(header)
+    end = min(int(last), size - 1) if last else size - 1
+    if end < start:
+        return None
+
+    return start, end - start + 1
+
+
+def if_range_matches(request, etag: str, last_modified: int) -> bool:
+    """Return whether the file is unchanged since `If-Range`, if given"""
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def get_offload_response(request, fullpath: str, content_type: str):
+    """Return a response handing the file to the proxy, if configured.
+
+    The proxy sends the bytes, as well as ranges of them.
+    """
+    if settings.FILES_OFFLOAD == "x-accel-redirect":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = quote(
+            settings.FILES_ACCEL_REDIRECT_PREFIX + request.path
+        )
+        return response
+    if settings.FILES_OFFLOAD == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = fullpath
+        return response
+
+    return None
+
+
+def get_file_response(request, fullpath, size, content_type, range_header):
+    """Return a response of the file, or of the range requested"""
+    offset, length, status = 0, size, 200
+    if range_header:
+        try:
+            requested = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+        if requested is not None:
+            offset, length = requested
+            status = 206
+
+    if request.method == "HEAD":
+        response = HttpResponse(content_type=content_type, status=status)
+    else:
+        response = FileResponse(
+            FileSlice(open(fullpath, "rb"), offset, length),
+            content_type=content_type,
+            status=status,
+        )
+    response["Content-Length"] = str(length)
+    if status == 206:
+        last = offset + length - 1
+        response["Content-Range"] = f"bytes {offset}-{last}/{size}"
+
+    return response
+
+
+def get_local_response(request, fullpath, content_type, precompressed):
+    """Return a response sending the file, or a precompressed copy"""
+    served_path, content_encoding = fullpath, None
+    if precompressed and "HTTP_RANGE" not in request.META:
+        served_path, content_encoding = get_precompressed(request, fullpath)
+    stat = os.stat(served_path)
+    etag = quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        # Ranges are of the file as it was when `If-Range` was given
+        range_header = None
+        if content_encoding is None:
+            if if_range_matches(request, etag, last_modified):
+                range_header = request.META.get("HTTP_RANGE")
+        response = get_file_response(
+            request, served_path, stat.st_size, content_type, range_header
+        )
+    if content_encoding is None:
+        response["Accept-Ranges"] = "bytes"
+    else:
+        response["Content-Encoding"] = content_encoding
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+
+    return response
+
+
+def serve(request, path, document_root, precompressed=False):
+    """Serve the file at `path` of `document_root`, e.g. a media file.
+
+    Files are sent from the disk without being read in Python when
+    possible: by the proxy in front of the app with `FILES_OFFLOAD`, else
+    by gunicorn with `sendfile`. Single byte ranges are served
+    and files named after their content are cached for good. With
+    `precompressed`, copies gzipped or brotli compressed ahead of time
+    (see `core.storage.CompressedManifestStaticFilesStorage`) are served
+    to clients accepting them.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(("GET", "HEAD"))
+    try:
+        fullpath = safe_join(document_root, path)
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+    if not path or not os.path.isfile(fullpath):
+        raise Http404("File not found")
+
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    if content_type is None or encoding is not None:
+        content_type = "application/octet-stream"
+
+    # The proxy negotiates the precompressed copies itself
+    response = get_offload_response(request, fullpath, content_type)
+    if response is None:
+        response = get_local_response(
+            request, fullpath, content_type, precompressed
+        )
+    if precompressed:
+        patch_vary_headers(response, ("Accept-Encoding",))
+    patch_cache_control(response, **get_cache_control(path))
+
+    return response
+
+
+def file_urls(prefix: str, document_root, **kwargs) -> list:
+    """Return the URL pattern serving the files of `document_root`.
+
+    Like `django.conf.urls.static.static`, but for production as well.
+    No pattern is returned for prefixes of other hosts, e.g. a CDN.
+    """
+    if not prefix or urlsplit(prefix).netloc:
+        return []
+
+    return [
+        re_path(
+            r"^%s(?P<path>.*)$" % re.escape(prefix.lstrip("/")),
+            serve,
+            {"document_root": document_root, **kwargs},
+        )
+    ]
@@ -0,0 +1,37 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+
+class BenchmarkCommand(BaseCommand):
+    """Base command running a benchmark over throwaway data.
+
+    `run_benchmark` is executed inside a transaction that is rolled back
+    once it returns, so it is safe to run against a dev database.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run_benchmark(options)
+            transaction.set_rollback(True)
+
+    def run_benchmark(self, options):
+        raise NotImplementedError
+
+    def timeit(self, func, repeat: int) -> float:
+        """Return the median wall time of `func` in milliseconds"""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return statistics.median(timings)
+
+    def report(self, label: str, milliseconds: float):
+        self.stdout.write(f"{label:<40} {milliseconds:>10.2f} ms")
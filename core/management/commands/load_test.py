@@ -0,0 +1,77 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Load test a running server, reporting its latency and throughput.
+
+    Run it against servers started with different settings to compare them,
+    e.g. with `DB_CONN_MAX_AGE=0` and then `DB_CONN_MAX_AGE=60` to see the
+    setup of database connections leave the request latency.
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument("url")
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--token", help="API token to authenticate with")
+        parser.add_argument(
+            "--header",
+            action="append",
+            default=[],
+            help="Extra `Name: value` request header, may be repeated",
+        )
+
+    def handle(self, *args, **options):
+        headers = dict(
+            (name.strip(), value.strip())
+            for name, _, value in (
+                header.partition(":") for header in options["header"]
+            )
+        )
+        if options["token"]:
+            headers["Authorization"] = f"Token {options['token']}"
+
+        def fetch(_):
+            request = urllib.request.Request(options["url"], headers=headers)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+            except OSError:
+                status = None
+            return status, (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            results = list(executor.map(fetch, range(options["requests"])))
+        elapsed = time.perf_counter() - start
+
+        timings = sorted(ms for status, ms in results if status == 200)
+        errors = len(results) - len(timings)
+        self.stdout.write(f"requests      {len(results)} ({errors} failed)")
+        self.stdout.write(f"throughput    {len(results) / elapsed:.1f} req/s")
+        if len(timings) < 2:
+            self.stderr.write(
+                f"{len(timings)} requests succeeded, too few for percentiles"
+            )
+            return
+
+        percentiles = statistics.quantiles(timings, n=100)
+        for label, milliseconds in (
+            ("latency p50", statistics.median(timings)),
+            ("latency p90", percentiles[89]),
+            ("latency p99", percentiles[98]),
+            ("latency max", timings[-1]),
+        ):
+            self.stdout.write(f"{label:<13} {milliseconds:.2f} ms")
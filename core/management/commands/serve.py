@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.checks import Tags
+from django.core.management.base import BaseCommand
+
+from core.server import Server
+
+
+class Command(BaseCommand):
+    """Run the production server: gunicorn, with threaded workers.
+
+    The master process loads the application before forking the workers,
+    which share its memory copy-on-write. Send SIGHUP to the master to
+    restart the workers gracefully, and SIGTERM to stop it gracefully.
+    With `ASYNC_VIEWS` set, workers are uvicorn event loops serving the
+    ASGI application instead, and `--threads` does not apply.
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default=settings.SERVER_BIND)
+        parser.add_argument(
+            "--workers", type=int, default=settings.SERVER_WORKERS
+        )
+        parser.add_argument(
+            "--threads", type=int, default=settings.SERVER_THREADS
+        )
+        parser.add_argument(
+            "--max-requests",
+            type=int,
+            default=settings.SERVER_MAX_REQUESTS,
+            help="Restart workers after this many requests, 0 to never",
+        )
+        parser.add_argument(
+            "--graceful-timeout",
+            type=int,
+            default=settings.SERVER_GRACEFUL_TIMEOUT,
+        )
+        parser.add_argument("--access-log", action="store_true")
+
+    def get_server_options(self, options) -> dict:
+        """Return the gunicorn settings of the server"""
+        return {
+            "bind": options["bind"],
+            "workers": options["workers"],
+            "worker_class": (
+                "core.server.AsgiWorker" if settings.ASYNC_VIEWS else "gthread"
+            ),
+            "threads": options["threads"],
+            "max_requests": options["max_requests"],
+            # So that workers do not all restart at once
+            "max_requests_jitter": options["max_requests"] // 10,
+            "graceful_timeout": options["graceful_timeout"],
+            "keepalive": settings.SERVER_KEEP_ALIVE,
+            "accesslog": "-" if options["access_log"] else None,
+        }
+
+    def handle(self, *args, **options):
+        if options["workers"] > 1:
+            # Caches private to each process would diverge between workers
+            self.check(tags=[Tags.caches], include_deployment_checks=True)
+
+        Server(self.get_server_options(options)).run()
@@ -0,0 +1,187 @@
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Types whose content is already compressed, gaining nothing from another pass
+COMPRESSED_TYPES = (
+    "application/gzip",
+    "application/pdf",
+    "application/zip",
+    "audio/",
+    "font/woff",
+    "image/gif",
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+    "video/",
+)
+
+
+def gzip_compressor():
+    """Return the compress, flush and finish functions of a gzip stream"""
+    compressor = zlib.compressobj(
+        settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16
+    )
+    return (
+        compressor.compress,
+        lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+        compressor.flush,
+    )
+
+
+def brotli_compressor():
+    """Return the compress, flush and finish functions of a brotli stream"""
+    compressor = brotli.Compressor(
+        mode=brotli.MODE_TEXT, quality=settings.COMPRESSION_BROTLI_QUALITY
+    )
+    return compressor.process, compressor.flush, compressor.finish
+
+
+# Compressors by content coding, in order of preference
+COMPRESSORS = {"gzip": gzip_compressor}
+if brotli is not None:
+    COMPRESSORS = {"br": brotli_compressor, **COMPRESSORS}
+
+
+def get_accepted_encodings(header: str) -> set:
+    """Return the content codings of an `Accept-Encoding` header.
+
+    Codings with a quality of 0 are refused, and so left out, even when
+    `*` accepts any other coding.
+    """
+    encodings = set()
+    refused = set()
+    for item in header.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            (encodings if quality > 0 else refused).add(coding.lower())
+
+    if "*" in encodings:
+        encodings.update(COMPRESSORS)
+
+    return encodings - refused
+
+
+def negotiate_encoding(request):
+    """Return the preferred content coding accepted by `request`, if any"""
+    accepted = get_accepted_encodings(
+        request.META.get("HTTP_ACCEPT_ENCODING", "")
+    )
+    for encoding in COMPRESSORS:
+        if encoding in accepted:
+            return encoding
+
+    return None
+
+
+def compress_content(encoding: str, content: bytes) -> bytes:
+    """Compress `content` in one go with `encoding`"""
+    compress, _, finish = COMPRESSORS[encoding]()
+    return compress(content) + finish()
+
+
+def compress_sequence(encoding: str, sequence):
+    """Compress the chunks of `sequence` with `encoding`, as they come.
+
+    Each chunk is flushed so that clients receive it without waiting for
+    the following ones.
+    """
+    compress, flush, finish = COMPRESSORS[encoding]()
+    for chunk in sequence:
+        data = compress(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+def is_compressible(request, response) -> bool:
+    """Return whether the body of `response` is worth compressing"""
+    # Sent as stored, static files being compressed by `collectstatic`
+    if request.path.startswith((settings.MEDIA_URL, settings.STATIC_URL)):
+        return False
+    if response.has_header("Content-Encoding"):
+        return False
+    # Byte ranges are of the uncompressed representation
+    if response.status_code == 206 or response.has_header("Content-Range"):
+        return False
+    if response.get("Content-Type", "").startswith(COMPRESSED_TYPES):
+        return False
+
+    if response.streaming:
+        return True
+
+    return len(response.content) >= settings.COMPRESSION_MIN_SIZE
+
+
+class CompressionMiddleware:
+    """Compress responses with the best coding the client accepts.
+
+    Like Django's `GZipMiddleware`, but negotiating brotli as well when it is
+    installed. Bodies under `COMPRESSION_MIN_SIZE` bytes are sent as they are,
+    since they fit in a few packets anyway, as well as media files and types
+    which are already compressed. Streaming responses are compressed chunk by
+    chunk. Under ASGI, it runs in the event loop rather than in a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if not is_compressible(request, response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            # The compressed size is only known once streamed
+            response.streaming_content = compress_sequence(
+                encoding, response.streaming_content
+            )
+            del response.headers["Content-Length"]
+        else:
+            content = compress_content(encoding, response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers["Content-Length"] = str(len(content))
+
+        # Strong ETags identify the uncompressed bytes
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+
+        return response
@@ -0,0 +1,110 @@
+# Generated by Django 4.1.4 on 2026-10-18 06:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_recipe_image"),
+    ]
+
+    operations = [
+        # The through tables already exist as auto-created ones, only the
+        # migration state needs to learn about the explicit models.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="RecipeTag",
+                    fields=[
+                        (
+                            "id",
+                            models.AutoField(
+                                primary_key=True,
+                                serialize=False,
+                            ),
+                        ),
+                        (
+                            "recipe",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="core.recipe",
+                            ),
+                        ),
+                        (
+                            "tag",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="core.tag",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "core_recipe_tags",
+                        "unique_together": {("recipe", "tag")},
+                    },
+                ),
+                migrations.CreateModel(
+                    name="RecipeIngredient",
+                    fields=[
+                        (
+                            "id",
+                            models.AutoField(
+                                primary_key=True,
+                                serialize=False,
+                            ),
+                        ),
+                        (
+                            "ingredient",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="core.ingredient",
+                            ),
+                        ),
+                        (
+                            "recipe",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="core.recipe",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "core_recipe_ingredients",
+                        "unique_together": {("recipe", "ingredient")},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="recipe",
+                    name="ingredients",
+                    field=models.ManyToManyField(
+                        through="core.RecipeIngredient",
+                        to="core.ingredient",
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="recipe",
+                    name="tags",
+                    field=models.ManyToManyField(
+                        through="core.RecipeTag",
+                        to="core.tag",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="recipetag",
+            index=models.Index(
+                fields=["tag", "recipe"],
+                name="core_recipe_tags_tag_recipe",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipeingredient",
+            index=models.Index(
+                fields=["ingredient", "recipe"],
+                name="core_recipe_ingr_ingr_recipe",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_recipe_through_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_recipe_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="image_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("ready", "Ready"),
+                    ("failed", "Failed"),
+                ],
+                max_length=16,
+                verbose_name="image status",
+            ),
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="image_variants",
+            field=models.JSONField(default=dict, verbose_name="image variants"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:19
+
+import core.models
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_recipe_image_processing"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="recipe",
+            name="image",
+            field=models.ImageField(
+                db_index=True,
+                null=True,
+                storage=core.storage.ContentAddressedStorage(),
+                upload_to=core.models.recipe_image_file_path,
+            ),
+        ),
+    ]
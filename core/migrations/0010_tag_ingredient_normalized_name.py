@@ -0,0 +1,64 @@
+# Generated by Django 4.1.4 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+def normalize_name(name):
+    return " ".join(name.split()).casefold()
+
+
+def merge_duplicates(model, through, field):
+    """Fill normalized names, merging objects whose names collide"""
+    kept = {}
+    for obj in model.objects.order_by("pk").iterator():
+        obj.normalized_name = normalize_name(obj.name)
+        key = (obj.user_id, obj.normalized_name)
+        if key not in kept:
+            kept[key] = obj.pk
+            obj.save(update_fields=["normalized_name"])
+            continue
+        target = kept[key]
+        linked = through.objects.filter(**{f"{field}_id": target})
+        duplicates = through.objects.filter(**{f"{field}_id": obj.pk})
+        # Recipes already linked to the kept object only lose the duplicate
+        duplicates.filter(
+            recipe_id__in=linked.values("recipe_id"),
+        ).delete()
+        duplicates.update(**{f"{field}_id": target})
+        obj.delete()
+
+
+def normalize_names(apps, schema_editor):
+    merge_duplicates(
+        apps.get_model("core", "Tag"),
+        apps.get_model("core", "RecipeTag"),
+        "tag",
+    )
+    merge_duplicates(
+        apps.get_model("core", "Ingredient"),
+        apps.get_model("core", "RecipeIngredient"),
+        "ingredient",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_recipe_image_content_addressed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ingredient",
+            name="normalized_name",
+            field=models.CharField(default="", editable=False, max_length=765),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="tag",
+            name="normalized_name",
+            field=models.CharField(default="", editable=False, max_length=765),
+            preserve_default=False,
+        ),
+        migrations.RunPython(normalize_names, migrations.RunPython.noop),
+    ]
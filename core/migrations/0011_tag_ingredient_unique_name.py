@@ -0,0 +1,27 @@
+# Generated by Django 4.1.4 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_tag_ingredient_normalized_name"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="ingredient",
+            constraint=models.UniqueConstraint(
+                fields=("user", "normalized_name"),
+                name="unique_ingredient_name_per_user",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="tag",
+            constraint=models.UniqueConstraint(
+                fields=("user", "normalized_name"),
+                name="unique_tag_name_per_user",
+            ),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.1.4 on 2026-10-18 10:05
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def get_related_names(through, target):
+    return Subquery(
+        through.objects.filter(recipe=OuterRef("pk"))
+        .values("recipe")
+        .annotate(names=StringAgg(f"{target}__name", delimiter=" "))
+        .values("names")
+    )
+
+
+def populate_search_vectors(apps, schema_editor):
+    """Index the existing recipes and add the GIN index, on PostgreSQL"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    Recipe = apps.get_model("core", "Recipe")
+    config = settings.RECIPE_SEARCH_CONFIG
+    Recipe.objects.using(schema_editor.connection.alias).update(
+        search_vector=(
+            SearchVector("title", weight="A", config=config)
+            + SearchVector(
+                get_related_names(apps.get_model("core", "RecipeTag"), "tag"),
+                weight="B",
+                config=config,
+            )
+            + SearchVector(
+                get_related_names(
+                    apps.get_model("core", "RecipeIngredient"), "ingredient"
+                ),
+                weight="C",
+                config=config,
+            )
+        )
+    )
+    schema_editor.execute(
+        "CREATE INDEX core_recipe_search_vector_gin "
+        "ON core_recipe USING gin (search_vector)"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX core_recipe_search_vector_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_tag_ingredient_unique_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(populate_search_vectors, drop_search_index),
+    ]
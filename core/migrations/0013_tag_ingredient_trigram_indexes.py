@@ -0,0 +1,38 @@
+# Generated by Django 4.1.4 on 2026-10-18 11:20
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+TABLES = ("core_tag", "core_ingredient")
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Index normalized names for prefix and similarity lookups"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for table in TABLES:
+        schema_editor.execute(
+            f"CREATE INDEX {table}_normalized_name_trgm "
+            f"ON {table} USING gin (normalized_name gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for table in TABLES:
+        schema_editor.execute(f"DROP INDEX {table}_normalized_name_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_recipe_search_vector"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
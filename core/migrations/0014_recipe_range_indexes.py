@@ -0,0 +1,26 @@
+# Generated by Django 4.1.4 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_tag_ingredient_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["user", "time_minutes", "id"],
+                name="core_recipe_user_time",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["user", "price", "id"], name="core_recipe_user_price"
+            ),
+        ),
+    ]
@@ -1,3 +1,4 @@
+import hashlib
 import os
 import typing as t
 import uuid
@@ -8,12 +9,38 @@ from django.contrib.auth.models import (
     AbstractUser,
     UserManager as BaseUserManager,
 )
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.translation import gettext_lazy as _
 
+from core.storage import recipe_image_storage
+
+
+def get_content_hash(file) -> str:
+    """Return the SHA-256 of a file, reusing the one computed on upload"""
+    digest = getattr(file, "sha256", None)
+    if digest:
+        return digest
+
+    hasher = hashlib.sha256()
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    file.seek(0)
+
+    return hasher.hexdigest()
+
 
 def recipe_image_file_path(instance, filename):
-    """Generate file path for new recipe image"""
-    ext = filename.split(".")[-1]
+    """Generate file path for new recipe image.
+
+    Images are named after their content so identical uploads share a
+    single file, see `core.storage.ContentAddressedStorage`.
+    """
+    ext = filename.split(".")[-1].lower()
+    image = getattr(instance, "image", None)
+    if image and not image._committed:
+        digest = get_content_hash(image.file)
+        return os.path.join("uploads/recipe/", digest[:2], f"{digest}.{ext}")
+
     filename = f"{uuid.uuid4()}.{ext}"
 
     return os.path.join("uploads/recipe/", filename)
@@ -72,36 +99,111 @@ class User(AbstractUser):
         return self.email
 
 
-class Ingredient(models.Model):
-    """Ingredient to be used for a recipe"""
+def normalize_name(name: str) -> str:
+    """Normalize a tag or ingredient name for comparisons"""
+    return " ".join(name.split()).casefold()
+
+
+class RecipeAttributeManager(models.Manager):
+    def get_or_create_by_names(
+        self,
+        user: "User",
+        names: t.Iterable[str],
+        batch_size: t.Optional[int] = None,
+    ) -> list:
+        """Returns the user's objects named `names`, creating missing ones.
+
+        Missing objects are inserted with a single statement skipping the
+        names created concurrently, then every object is read back with
+        one query. Objects are returned in the order of `names`.
+        """
+        names = list(names)
+        # First spelling of each name is the one stored
+        wanted = {}
+        for name in names:
+            wanted.setdefault(normalize_name(name), name)
+
+        self.bulk_create(
+            (
+                self.model(user=user, name=name, normalized_name=key)
+                for key, name in wanted.items()
+            ),
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        objects = {
+            obj.normalized_name: obj
+            for obj in self.filter(user=user, normalized_name__in=wanted)
+        }
+
+        return [objects[normalize_name(name)] for name in names]
+
+
+class RecipeAttribute(models.Model):
+    """Base model for user owned objects describing recipes by name"""
 
     name = models.CharField(_("name"), max_length=255)
+    # Name used to compare names, unique per user. Case folding turns a
+    # character into up to 3, e.g. "ß" into "ss".
+    normalized_name = models.CharField(max_length=3 * 255, editable=False)
+
+    objects: RecipeAttributeManager = RecipeAttributeManager()
+
+    class Meta:
+        abstract = True
+
+    def __str__(self) -> str:
+        return self.name
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.name)
+        super().save(*args, **kwargs)
+
+
+class Ingredient(RecipeAttribute):
+    """Ingredient to be used for a recipe"""
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
 
-    def __str__(self) -> str:
-        return self.name
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "normalized_name"),
+                name="unique_ingredient_name_per_user",
+            ),
+        )
 
 
-class Tag(models.Model):
+class Tag(RecipeAttribute):
     """Tag to be used for a recipe"""
 
-    name = models.CharField(_("name"), max_length=255)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         related_name="tags",
         on_delete=models.CASCADE,
     )
 
-    def __str__(self) -> str:
-        return self.name
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "normalized_name"),
+                name="unique_tag_name_per_user",
+            ),
+        )
 
 
 class Recipe(models.Model):
     """Recipe object"""
 
+    class ImageStatus(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        PROCESSING = "processing", _("Processing")
+        READY = "ready", _("Ready")
+        FAILED = "failed", _("Failed")
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -111,10 +213,82 @@ class Recipe(models.Model):
     price = models.DecimalField(max_digits=5, decimal_places=2)
     link = models.CharField(max_length=255, blank=True)
 
-    ingredients = models.ManyToManyField("Ingredient")
-    tags = models.ManyToManyField("Tag")
-
-    image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    ingredients = models.ManyToManyField(
+        "Ingredient", through="RecipeIngredient"
+    )
+    tags = models.ManyToManyField("Tag", through="RecipeTag")
+
+    # Indexed as it is looked up to count the references to shared files
+    image = models.ImageField(
+        null=True,
+        upload_to=recipe_image_file_path,
+        storage=recipe_image_storage,
+        db_index=True,
+    )
+    image_status = models.CharField(
+        _("image status"),
+        max_length=16,
+        choices=ImageStatus.choices,
+        blank=True,
+    )
+    # Resized copies of the image, as a mapping of variant name to file path
+    image_variants = models.JSONField(_("image variants"), default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Weighted title, tag and ingredient names, maintained by `recipe.search`
+    # on PostgreSQL only, where migrations also add its GIN index
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = (
+            # Range filters and ordering within a user's recipes, the id
+            # breaking ties in the order used by cursor pagination
+            models.Index(
+                fields=("user", "time_minutes", "id"),
+                name="core_recipe_user_time",
+            ),
+            models.Index(
+                fields=("user", "price", "id"),
+                name="core_recipe_user_price",
+            ),
+        )
 
     def __str__(self) -> str:
         return self.title
+
+
+class RecipeIngredient(models.Model):
+    """Link between a recipe and one of its ingredients"""
+
+    id = models.AutoField(primary_key=True)
+    recipe = models.ForeignKey("Recipe", on_delete=models.CASCADE)
+    ingredient = models.ForeignKey("Ingredient", on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = "core_recipe_ingredients"
+        unique_together = (("recipe", "ingredient"),)
+        indexes = (
+            # Lookups from ingredient to recipes, e.g. `?ingredients=` filters
+            models.Index(
+                fields=("ingredient", "recipe"),
+                name="core_recipe_ingr_ingr_recipe",
+            ),
+        )
+
+
+class RecipeTag(models.Model):
+    """Link between a recipe and one of its tags"""
+
+    id = models.AutoField(primary_key=True)
+    recipe = models.ForeignKey("Recipe", on_delete=models.CASCADE)
+    tag = models.ForeignKey("Tag", on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = "core_recipe_tags"
+        unique_together = (("recipe", "tag"),)
+        indexes = (
+            # Lookups from tag to recipes, e.g. `?tags=` filters
+            models.Index(
+                fields=("tag", "recipe"),
+                name="core_recipe_tags_tag_recipe",
+            ),
+        )
@@ -0,0 +1,62 @@
+import io
+
+from django.conf import settings
+
+from rest_framework.parsers import JSONParser
+from rest_framework.utils import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Maps digits to "0" and other bytes to "x", to look for runs of digits
+DIGITS_TABLE = bytes(48 if 48 <= byte <= 57 else 120 for byte in range(256))
+
+
+def has_long_number(data: bytes) -> bool:
+    """Return whether `data` has a run of 20 digits or more.
+
+    orjson decodes integers over 64 bits as floats, losing their precision,
+    so such documents are left to the standard library. `bytes.translate`
+    is used as it is several times faster than a regular expression.
+    """
+    return b"0" * 20 in data.translate(DIGITS_TABLE)
+
+
+def loads(data):
+    """Decode a JSON document, given as `bytes` or `str`.
+
+    Uses orjson when it is installed, falling back to the standard library
+    for documents with long numbers and retrying with it on errors so both
+    accept the same documents.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    if orjson is not None and not has_long_number(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+
+    return json.loads(data)
+
+
+class FastJSONParser(JSONParser):
+    """JSON parser decoding UTF-8 bodies with orjson when installed"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+
+        data = stream.read() if stream is not None else b""
+        if has_long_number(data):
+            return super().parse(io.BytesIO(data), media_type, parser_context)
+
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # Let the standard parser accept or reject the document
+            return super().parse(io.BytesIO(data), media_type, parser_context)
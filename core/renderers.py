@@ -0,0 +1,54 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if orjson is not None:
+    # Datetimes go through the DRF encoder to keep its output, while keys
+    # that are not strings are converted as the standard library does
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer encoding with orjson when it is installed.
+
+    Produces the same bytes as `JSONRenderer` for the compact, unicode
+    output used by API responses, objects orjson does not know about
+    (`Decimal`, lazy strings, datetimes...) being converted by the DRF
+    encoder. Indented output, e.g. for the browsable API, and other JSON
+    settings fall back to the standard library.
+    """
+
+    def can_use_orjson(self, accepted_media_type, renderer_context) -> bool:
+        """Return whether orjson produces the output of `JSONRenderer`"""
+        if orjson is None or self.encoder_class is not JSONEncoder:
+            return False
+        if self.ensure_ascii or not self.compact:
+            return False
+
+        return not self.get_indent(accepted_media_type, renderer_context)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        if data is None or not self.can_use_orjson(
+            accepted_media_type, renderer_context
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except TypeError:
+            # e.g. integers over 64 bits, which the standard library encodes
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped by `JSONRenderer` to produce valid JavaScript as well
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
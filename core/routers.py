@@ -0,0 +1,115 @@
+import contextlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = "db:pin:{user_id}"
+
+# Whether reads of the current request may go to the replicas
+replica_reads = ContextVar("replica_reads", default=False)
+
+
+@contextlib.contextmanager
+def use_replicas(enabled: bool = True):
+    """Let the reads of the block go to the replicas, or not"""
+    token = replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+def get_cache():
+    return caches[settings.DATABASE_REPLICA_PIN_CACHE_ALIAS]
+
+
+def pin_user(user_id):
+    """Send the reads of the user to the primary for a while.
+
+    Lets replicas catch up with the user's writes before serving them.
+    """
+    get_cache().set(
+        PIN_KEY.format(user_id=user_id),
+        True,
+        timeout=settings.DATABASE_REPLICA_PIN_SECONDS,
+    )
+
+
+def is_user_pinned(user_id) -> bool:
+    """Return whether the user wrote data the replicas might not have yet"""
+    return get_cache().get(PIN_KEY.format(user_id=user_id), False)
+
+
+class ReplicaRouter:
+    """Route reads to the `DATABASE_REPLICAS`, when enabled by the request.
+
+    Reads only go to a replica inside `use_replicas()`, e.g. within views
+    using `ReplicaReadMixin`, so that everything else reads its own writes
+    from the primary. Writes always go to the primary, including those of
+    objects read from a replica, and replicas are never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and replica_reads.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+
+        return None
+
+    def db_for_write(self, model, **hints):
+        if settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+
+        return None
+
+
+class ReplicaReadMixin:
+    """Serve safe requests from the replicas, unless the user just wrote.
+
+    Unsafe requests are served from the primary and, when successful, pin
+    the user to it for `DATABASE_REPLICA_PIN_SECONDS`, so they read their
+    writes back.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with use_replicas(False):
+            return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        with use_replicas(False):
+            return await super().adispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not settings.DATABASE_REPLICAS:
+            return
+        # Only once authenticated, the user being read from the primary.
+        # Reset when `dispatch` returns.
+        if request.method in SAFE_METHODS:
+            if not is_user_pinned(request.user.pk):
+                replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS:
+            # Failed requests wrote nothing to read back
+            if request.user.is_authenticated and response.status_code < 400:
+                pin_user(request.user.pk)
+
+        return super().finalize_response(request, response, *args, **kwargs)
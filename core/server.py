@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.cache import caches
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+
+from gunicorn.app.base import BaseApplication
+from uvicorn_worker import UvicornWorker
+
+
+def close_connections(server, worker):
+    """Close the database and cache connections of the master.
+
+    Run before forking each worker, so that workers open their own rather
+    than sharing the sockets of connections opened while preloading.
+    """
+    connections.close_all()
+    caches.close_all()
+
+
+class AsgiWorker(UvicornWorker):
+    """Uvicorn worker of the Django ASGI application.
+
+    Django does not handle the ASGI lifespan protocol, so it is not tried.
+    """
+
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, "lifespan": "off"}
+
+
+class Server(BaseApplication):
+    """Gunicorn, serving the Django application loaded before forking.
+
+    Workers share the memory of the loaded code copy-on-write. `options`
+    are gunicorn settings, by name. With `ASYNC_VIEWS` set, the ASGI
+    application is loaded, for `AsgiWorker`.
+    """
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        self.cfg.set("preload_app", True)
+        self.cfg.set("pre_fork", close_connections)
+        for name, value in self.options.items():
+            self.cfg.set(name, value)
+
+    def load(self):
+        if settings.ASYNC_VIEWS:
+            return get_asgi_application()
+
+        return get_wsgi_application()
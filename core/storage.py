@@ -0,0 +1,86 @@
+import gzip
+import mimetypes
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Precompressed copies of static files by suffix, compressed at the highest
+# levels since it is done once
+COMPRESSORS = {".gz": lambda content: gzip.compress(content, 9, mtime=0)}
+if brotli is not None:
+    COMPRESSORS[".br"] = lambda content: brotli.compress(content, quality=11)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage for files named after a hash of their content.
+
+    A name that already exists holds the very same bytes, so saving it
+    again is skipped instead of storing a suffixed copy.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is not None and self.exists(name):
+            return name
+
+        return super().save(name, content, max_length=max_length)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Static files storage with hashed names and precompressed copies.
+
+    `collectstatic` saves files under names holding a hash of their
+    content, cached for good by `core.files.serve`, and a gzipped copy
+    (and brotli when installed) of each compressible file, served to the
+    clients accepting it. Names missing from the manifest, before
+    `collectstatic` ran, are used as they are.
+    """
+
+    manifest_strict = False
+    compressible_types = ("application/", "image/svg+xml", "text/")
+    # Copies saving less than this share of the size are not kept
+    min_saving = 0.05
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for name in {*paths, *self.hashed_files.values()}:
+            self.save_compressed(name)
+
+    def is_compressible(self, name: str) -> bool:
+        content_type, encoding = mimetypes.guess_type(name)
+        if content_type is None or encoding is not None:
+            return False
+
+        return content_type.startswith(self.compressible_types)
+
+    def save_compressed(self, name: str):
+        """Save the compressed copies of the file `name`, worth keeping"""
+        if not self.is_compressible(name) or not self.exists(name):
+            return
+        with self.open(name) as file:
+            content = file.read()
+
+        for suffix, compress in COMPRESSORS.items():
+            compressed = compress(content)
+            if len(compressed) > len(content) * (1 - self.min_saving):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
+
+
+recipe_image_storage = ContentAddressedStorage()
@@ -0,0 +1,68 @@
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_replica_pin_cache, check_shared_caches
+
+LOCAL_CACHE = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+SHARED_CACHE = {
+    "BACKEND": "django.core.cache.backends.redis.RedisCache",
+    "LOCATION": "redis://localhost:6379",
+}
+
+
+class SharedCachesCheckTests(SimpleTestCase):
+    """Test the caches the server's workers agree on must be shared"""
+
+    @override_settings(
+        CACHES={"default": LOCAL_CACHE},
+        TOKEN_CACHE_ALIAS="default",
+        TOKEN_CACHE_TTL=0,
+    )
+    def test_process_local_cache(self):
+        errors = check_shared_caches(None)
+
+        self.assertEqual(
+            [error.id for error in errors], ["core.E001", "core.E003"]
+        )
+
+    @override_settings(
+        CACHES={"default": LOCAL_CACHE, "shared": SHARED_CACHE},
+        RECIPE_CACHE_ALIAS="shared",
+        TOKEN_CACHE_ALIAS="shared",
+        TOKEN_CACHE_TTL=0,
+    )
+    def test_shared_cache(self):
+        self.assertEqual(check_shared_caches(None), [])
+
+    @override_settings(
+        CACHES={"default": SHARED_CACHE},
+        TOKEN_CACHE_ALIAS="",
+        TOKEN_CACHE_TTL=30,
+    )
+    def test_in_process_token_cache(self):
+        errors = check_shared_caches(None)
+
+        self.assertEqual([error.id for error in errors], ["core.W001"])
+
+
+class ReplicaPinCacheCheckTests(SimpleTestCase):
+    """Test users writing are pinned to the primary in a shared cache"""
+
+    @override_settings(
+        CACHES={"default": LOCAL_CACHE}, DATABASE_REPLICAS=["replica_0"]
+    )
+    def test_process_local_cache(self):
+        errors = check_replica_pin_cache(None)
+
+        self.assertEqual([error.id for error in errors], ["core.E002"])
+
+    @override_settings(
+        CACHES={"default": LOCAL_CACHE, "shared": SHARED_CACHE},
+        DATABASE_REPLICAS=["replica_0"],
+        DATABASE_REPLICA_PIN_CACHE_ALIAS="shared",
+    )
+    def test_shared_cache(self):
+        self.assertEqual(check_replica_pin_cache(None), [])
+
+    @override_settings(CACHES={"default": LOCAL_CACHE}, DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertEqual(check_replica_pin_cache(None), [])
@@ -1,4 +1,5 @@
-from unittest.mock import patch
+from io import StringIO
+from unittest.mock import MagicMock, patch
 
 from django.core.management import call_command
 from django.db.utils import OperationalError
@@ -21,3 +22,45 @@ class CommandTests(TestCase):
             mock.side_effect = [OperationalError] * 5 + [True]
             call_command("wait_for_database")
             self.assertEqual(mock.call_count, 6)
+
+    @patch("urllib.request.urlopen")
+    def test_load_test(self, urlopen):
+        """Test load testing a server reports its latency"""
+        urlopen.return_value.__enter__.return_value = MagicMock(status=200)
+        stdout = StringIO()
+
+        call_command(
+            "load_test",
+            "http://localhost:8000/api/recipe/recipes/",
+            "--requests=20",
+            "--token=abc",
+            stdout=stdout,
+        )
+
+        self.assertEqual(urlopen.call_count, 20)
+        request = urlopen.call_args.args[0]
+        self.assertEqual(request.get_header("Authorization"), "Token abc")
+        self.assertIn("requests      20 (0 failed)", stdout.getvalue())
+        self.assertIn("latency p99", stdout.getvalue())
+
+    @patch("urllib.request.urlopen")
+    def test_load_test_single_success(self, urlopen):
+        """Test load testing reports too few successes for percentiles"""
+        urlopen.return_value.__enter__.side_effect = [
+            MagicMock(status=200),
+            OSError,
+            OSError,
+        ]
+        stdout, stderr = StringIO(), StringIO()
+
+        call_command(
+            "load_test",
+            "http://localhost:8000/api/recipe/recipes/",
+            "--requests=3",
+            "--concurrency=1",
+            stdout=stdout,
+            stderr=stderr,
+        )
+
+        self.assertIn("requests      3 (2 failed)", stdout.getvalue())
+        self.assertIn("1 requests succeeded", stderr.getvalue())
@@ -0,0 +1,70 @@
+import threading
+from unittest.mock import MagicMock
+
+from django.db import OperationalError
+from django.test import SimpleTestCase
+
+from core.db.pool import ConnectionPool
+
+
+def fake_connection():
+    """Return a fake open DB-API connection"""
+    return MagicMock(closed=False)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test the database connection pool"""
+
+    def test_reuse_connections(self):
+        """Test given back connections are reused, most recent first"""
+        pool = ConnectionPool(max_size=2, timeout=0)
+        first = pool.get(fake_connection)
+        second = pool.get(fake_connection)
+        pool.put(first)
+        pool.put(second)
+
+        self.assertIs(pool.get(fake_connection), second)
+        self.assertIs(pool.get(fake_connection), first)
+
+    def test_discard_connections(self):
+        """Test discarded, closed or unusable connections are not reused"""
+        pool = ConnectionPool(max_size=3, timeout=0)
+        discarded, closed, unusable = (
+            pool.get(fake_connection) for _ in range(3)
+        )
+        closed.closed = True
+        pool.put(discarded, discard=True)
+        pool.put(closed)
+        pool.put(unusable)
+
+        connection = pool.get(
+            fake_connection, check=lambda connection: connection is not unusable
+        )
+
+        self.assertNotIn(connection, (discarded, closed, unusable))
+        discarded.close.assert_called_once()
+        unusable.close.assert_called_once()
+
+    def test_wait_for_connection(self):
+        """Test callers wait for a connection once all are checked out"""
+        pool = ConnectionPool(max_size=1, timeout=5)
+        connection = pool.get(fake_connection)
+        threading.Timer(0.05, pool.put, (connection,)).start()
+
+        self.assertIs(pool.get(fake_connection), connection)
+
+    def test_pool_exhausted(self):
+        """Test an error is raised when no connection is given back in time"""
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        pool.get(fake_connection)
+
+        with self.assertRaises(OperationalError):
+            pool.get(fake_connection)
+
+    def test_failed_connect(self):
+        """Test failing to connect does not use up the pool"""
+        pool = ConnectionPool(max_size=1, timeout=0)
+
+        with self.assertRaises(OperationalError):
+            pool.get(MagicMock(side_effect=OperationalError))
+        self.assertTrue(pool.get(fake_connection))
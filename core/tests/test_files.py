@@ -0,0 +1,275 @@
+import gzip
+import os
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.files import file_urls, parse_range, serve
+from core.storage import CompressedManifestStaticFilesStorage
+
+CONTENT = b"body { color: #333; }\n" * 100
+HASHED = "app.0123456789ab.css"
+
+
+@override_settings(
+    FILES_OFFLOAD="",
+    FILES_MAX_AGE=3600,
+    FILES_IMMUTABLE_MAX_AGE=31536000,
+    FILES_ACCEL_REDIRECT_PREFIX="/protected",
+)
+class ServeTests(SimpleTestCase):
+    """Test serving media and static files"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        for name in ("app.css", HASHED):
+            with open(os.path.join(self.root, name), "wb") as file:
+                file.write(CONTENT)
+        os.mkdir(os.path.join(self.root, "uploads"))
+
+    def serve(self, path, method="get", precompressed=False, **headers):
+        request = getattr(RequestFactory(), method)(
+            f"/static/{path}", **headers
+        )
+        response = serve(request, path, self.root, precompressed)
+
+        return response, b"".join(getattr(response, "streaming_content", []))
+
+    def write_gzipped(self, name):
+        with open(os.path.join(self.root, name + ".gz"), "wb") as file:
+            file.write(gzip.compress(CONTENT))
+
+    def test_serve_file(self):
+        """Test files are served with their type, size and validators"""
+        response, content = self.serve("app.css")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content, CONTENT)
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Content-Length"], str(len(CONTENT)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+    def test_head(self):
+        """Test HEAD requests get the headers only"""
+        response, _ = self.serve("app.css", method="head")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["Content-Length"], str(len(CONTENT)))
+
+    def test_not_modified(self):
+        """Test files are revalidated with their ETag"""
+        response, _ = self.serve("app.css")
+
+        response, _ = self.serve("app.css", HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_cache_control(self):
+        """Test files named after their content are cached for good"""
+        hashed, _ = self.serve(HASHED)
+        other, _ = self.serve("app.css")
+
+        self.assertEqual(
+            hashed["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+        self.assertEqual(other["Cache-Control"], "public, max-age=3600")
+
+    def test_range(self):
+        """Test single byte ranges are served"""
+        for header, expected, content_range in (
+            ("bytes=10-19", CONTENT[10:20], "bytes 10-19/2200"),
+            ("bytes=2190-", CONTENT[2190:], "bytes 2190-2199/2200"),
+            ("bytes=-5", CONTENT[-5:], "bytes 2195-2199/2200"),
+            ("bytes=2100-9999", CONTENT[2100:], "bytes 2100-2199/2200"),
+        ):
+            with self.subTest(header):
+                response, content = self.serve("app.css", HTTP_RANGE=header)
+
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(content, expected)
+                self.assertEqual(response["Content-Range"], content_range)
+                self.assertEqual(response["Content-Length"], str(len(expected)))
+
+    def test_range_ignored(self):
+        """Test the whole file is sent for ranges not served"""
+        for header in ("bytes=0-1,5-6", "items=0-1", "bytes=9-3"):
+            with self.subTest(header):
+                response, content = self.serve("app.css", HTTP_RANGE=header)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(content, CONTENT)
+
+    def test_range_not_satisfiable(self):
+        """Test ranges past the end of the file are rejected"""
+        response, _ = self.serve("app.css", HTTP_RANGE="bytes=5000-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */2200")
+
+    def test_if_range(self):
+        """Test ranges are only served if the file did not change"""
+        etag = self.serve("app.css")[0]["ETag"]
+
+        partial, _ = self.serve(
+            "app.css", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag
+        )
+        whole, _ = self.serve(
+            "app.css", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"changed"'
+        )
+
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(whole.status_code, 200)
+
+    def test_precompressed(self):
+        """Test precompressed copies are served to clients accepting them"""
+        self.write_gzipped("app.css")
+
+        response, content = self.serve(
+            "app.css", precompressed=True, HTTP_ACCEPT_ENCODING="gzip"
+        )
+        identity, _ = self.serve("app.css", precompressed=True)
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertNotIn("Accept-Ranges", response)
+        self.assertEqual(gzip.decompress(content), CONTENT)
+        self.assertNotIn("Content-Encoding", identity)
+        self.assertNotEqual(response["ETag"], identity["ETag"])
+
+    def test_precompressed_range(self):
+        """Test ranges are served from the file as it is"""
+        self.write_gzipped("app.css")
+
+        response, content = self.serve(
+            "app.css",
+            precompressed=True,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_RANGE="bytes=0-9",
+        )
+
+        self.assertEqual(response.status_code, 206)
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(content, CONTENT[:10])
+
+    @override_settings(FILES_OFFLOAD="x-accel-redirect")
+    def test_offload_accel_redirect(self):
+        """Test files are handed to nginx with `X-Accel-Redirect`"""
+        response, content = self.serve(HASHED)
+
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected/static/{HASHED}"
+        )
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response.content, b"")
+
+    @override_settings(FILES_OFFLOAD="x-sendfile")
+    def test_offload_sendfile(self):
+        """Test files are handed to the proxy with `X-Sendfile`"""
+        response, _ = self.serve("app.css")
+
+        self.assertEqual(
+            response["X-Sendfile"], os.path.join(self.root, "app.css")
+        )
+
+    def test_not_found(self):
+        """Test missing files, directories and paths outside are not found"""
+        for path in ("missing.css", "uploads", "", "../app.css"):
+            with self.subTest(path):
+                with self.assertRaises(Http404):
+                    self.serve(path)
+
+    def test_method_not_allowed(self):
+        """Test files are only read"""
+        response, _ = self.serve("app.css", method="post")
+
+        self.assertEqual(response.status_code, 405)
+
+    def test_file_urls(self):
+        """Test files are served at their prefix, unless on another host"""
+        patterns = file_urls("/media/", self.root)
+
+        self.assertEqual(len(patterns), 1)
+        self.assertEqual(
+            patterns[0].resolve("media/app.css").kwargs,
+            {"path": "app.css", "document_root": self.root},
+        )
+        self.assertEqual(file_urls("https://cdn.example.com/", self.root), [])
+        self.assertEqual(file_urls("", self.root), [])
+
+    def test_media_url(self):
+        """Test media files are served by the app's URLconf"""
+        storage = FileSystemStorage()
+        name = storage.save(f"test/{HASHED}", ContentFile(CONTENT))
+        self.addCleanup(storage.delete, name)
+
+        response = self.client.get(f"/media/{name}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        self.assertNotIn("Content-Encoding", response)
+
+
+class ParseRangeTests(SimpleTestCase):
+    """Test parsing the `Range` header"""
+
+    def test_parse_range(self):
+        for header, expected in (
+            ("bytes=0-0", (0, 1)),
+            ("bytes=0-", (0, 10)),
+            ("bytes=-20", (0, 10)),
+            ("bytes=-", None),
+            ("bytes=a-b", None),
+        ):
+            with self.subTest(header):
+                self.assertEqual(parse_range(header, 10), expected)
+
+        for header in ("bytes=10-", "bytes=-0"):
+            with self.subTest(header):
+                with self.assertRaises(ValueError):
+                    parse_range(header, 10)
+
+
+class CompressedManifestStaticFilesStorageTests(SimpleTestCase):
+    """Test the storage of collected static files"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = CompressedManifestStaticFilesStorage(
+            location=directory.name, base_url="/static/"
+        )
+
+    def test_post_process(self):
+        """Test collected files are hashed and compressed when worth it"""
+        self.storage.save("app.css", ContentFile(CONTENT))
+        self.storage.save("logo.png", ContentFile(b"\x89PNG" * 500))
+        self.storage.save("tiny.txt", ContentFile(b"a"))
+        paths = {
+            name: (self.storage, name)
+            for name in ("app.css", "logo.png", "tiny.txt")
+        }
+
+        list(self.storage.post_process(paths))
+        hashed = self.storage.stored_name("app.css")
+
+        self.assertNotEqual(hashed, "app.css")
+        for name in ("app.css", hashed):
+            with self.storage.open(name + ".gz") as file:
+                self.assertEqual(gzip.decompress(file.read()), CONTENT)
+        self.assertFalse(self.storage.exists("logo.png.gz"))
+        self.assertFalse(self.storage.exists("tiny.txt.gz"))
+
+    def test_stored_name_not_collected(self):
+        """Test names not collected yet are used as they are"""
+        self.assertEqual(self.storage.stored_name("app.css"), "app.css")
@@ -0,0 +1,93 @@
+import datetime
+import io
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser, loads
+from core.renderers import FastJSONRenderer
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """Test the fast renderer matches the DRF one"""
+
+    def assertRendersAsDRF(self, data, accepted_media_type=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_render_api_types(self):
+        """Test types found in API responses render the same"""
+        self.assertRendersAsDRF(
+            {
+                "id": 1,
+                "title": 'Crème brûlée    "quoted" \n',
+                "price": Decimal("5.50"),
+                "ratio": 0.1,
+                "created": datetime.datetime(2022, 1, 2, 3, 4, 5, 678901),
+                "aware": datetime.datetime(
+                    2022, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc
+                ),
+                "date": datetime.date(2022, 1, 2),
+                "time": datetime.time(3, 4, 5),
+                "lazy": gettext_lazy("Lazy string"),
+                "tags": (1, 2),
+                "empty": [],
+                "none": None,
+                1: True,
+            }
+        )
+
+    def test_render_big_integers(self):
+        """Test integers out of orjson range render the same"""
+        self.assertRendersAsDRF({"big": 2**64})
+
+    def test_render_none(self):
+        """Test no data renders an empty body"""
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_render_indented(self):
+        """Test requested indentation is honoured"""
+        self.assertRendersAsDRF(
+            {"id": 1, "tags": [1, 2]}, "application/json; indent=4"
+        )
+
+
+class FastJSONParserTests(SimpleTestCase):
+    """Test the fast parser matches the DRF one"""
+
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body), "application/json")
+
+    def test_parse_same_as_drf(self):
+        """Test documents parse to the same data"""
+        body = (
+            b'{"title": "Cr\xc3\xa8me \\u00e9", "price": "5.50",'
+            b' "ratio": 0.1, "big": 18446744073709551616, "tags": [1, 2]}'
+        )
+
+        data = self.parse(FastJSONParser(), body)
+
+        self.assertEqual(data, self.parse(JSONParser(), body))
+        self.assertIs(type(data["big"]), int)
+
+    def test_parse_invalid(self):
+        """Test invalid documents raise a parse error"""
+        for body in (b"{", b"", b'{"ratio": NaN}', b"\xff"):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self.parse(FastJSONParser(), body)
+
+    def test_loads(self):
+        """Test bytes and strings are decoded, rejecting invalid ones"""
+        self.assertEqual(loads(b'{"id": 1}'), {"id": 1})
+        big = loads('{"big": 18446744073709551616}')["big"]
+        self.assertEqual((type(big), big), (int, 2**64))
+        with self.assertRaises(ValueError):
+            loads("NaN")
@@ -0,0 +1,134 @@
+import gzip
+import unittest
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core import middleware
+from core.middleware import CompressionMiddleware, get_accepted_encodings
+
+CONTENT = b'{"title": "Sample recipe", "time_minutes": 5}' * 100
+
+
+@override_settings(
+    COMPRESSION_MIN_SIZE=1024, MEDIA_URL="/media/", STATIC_URL="/static/"
+)
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test compressing responses"""
+
+    def get_response(self, response, path="/api/recipe/recipes/", **headers):
+        request = RequestFactory().get(path, **headers)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_compress_gzip(self):
+        """Test responses are gzipped for clients accepting it"""
+        response = HttpResponse(CONTENT, content_type="application/json")
+        response["ETag"] = '"abc"'
+
+        response = self.get_response(
+            response, HTTP_ACCEPT_ENCODING="deflate, gzip;q=0.8"
+        )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["ETag"], 'W/"abc"')
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertEqual(gzip.decompress(response.content), CONTENT)
+
+    def test_compress_async(self):
+        """Test responses of async views are compressed in the event loop"""
+
+        async def get_response(request):
+            return HttpResponse(CONTENT, content_type="application/json")
+
+        compression = CompressionMiddleware(get_response)
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+        response = async_to_sync(compression)(request)
+
+        self.assertTrue(iscoroutinefunction(compression))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), CONTENT)
+
+    def test_not_accepted(self):
+        """Test responses are left as they are for other clients"""
+        for header in ("", "identity", "gzip;q=0", "deflate"):
+            with self.subTest(header=header):
+                response = self.get_response(
+                    HttpResponse(CONTENT), HTTP_ACCEPT_ENCODING=header
+                )
+
+                self.assertFalse(response.has_header("Content-Encoding"))
+                self.assertEqual(response["Vary"], "Accept-Encoding")
+                self.assertEqual(response.content, CONTENT)
+
+    def test_skip_small_bodies(self):
+        """Test bodies under the minimum size are not compressed"""
+        response = self.get_response(
+            HttpResponse(CONTENT[:1023]), HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, CONTENT[:1023])
+
+    def test_skip_media_and_compressed_types(self):
+        """Test media, static files and compressed types are not compressed"""
+        responses = (
+            ("/media/uploads/recipe/image.svg", "image/svg+xml"),
+            ("/static/admin/css/base.css", "text/css"),
+            ("/api/recipe/recipes/1/image/", "image/jpeg"),
+        )
+        for path, content_type in responses:
+            with self.subTest(path=path):
+                response = self.get_response(
+                    HttpResponse(CONTENT, content_type=content_type),
+                    path,
+                    HTTP_ACCEPT_ENCODING="gzip",
+                )
+
+                self.assertFalse(response.has_header("Content-Encoding"))
+                self.assertEqual(response.content, CONTENT)
+
+    def test_skip_partial_content(self):
+        """Test byte ranges are not compressed"""
+        response = HttpResponse(CONTENT, status=206)
+        response["Content-Range"] = f"bytes 0-{len(CONTENT) - 1}/10000"
+
+        response = self.get_response(response, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_compress_streaming(self):
+        """Test streaming responses are compressed chunk by chunk"""
+        response = StreamingHttpResponse(iter([b"[", CONTENT, b"]"]))
+
+        response = self.get_response(response, HTTP_ACCEPT_ENCODING="*")
+
+        self.assertFalse(response.has_header("Content-Length"))
+        self.assertIn(response["Content-Encoding"], ("br", "gzip"))
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 1)
+        if response["Content-Encoding"] == "gzip":
+            self.assertEqual(
+                gzip.decompress(b"".join(chunks)), b"[" + CONTENT + b"]"
+            )
+
+    @unittest.skipIf(middleware.brotli is None, "brotli is not installed")
+    def test_compress_brotli(self):
+        """Test brotli is preferred when installed"""
+        response = self.get_response(
+            HttpResponse(CONTENT), HTTP_ACCEPT_ENCODING="gzip, br"
+        )
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(
+            middleware.brotli.decompress(response.content), CONTENT
+        )
+
+    def test_get_accepted_encodings(self):
+        """Test parsing Accept-Encoding headers"""
+        self.assertEqual(
+            get_accepted_encodings("GZIP;q=0.5, br ; q=0, deflate;q=x, *;q=0"),
+            {"gzip"},
+        )
+        self.assertNotIn("gzip", get_accepted_encodings("gzip;q=0, *"))
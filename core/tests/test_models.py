@@ -1,5 +1,8 @@
+import hashlib
 from unittest.mock import patch
 
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 
@@ -56,6 +59,25 @@ class ModelTests(TestCase):
 
         self.assertEqual(str(tag), tag.name)
 
+    def test_tag_name_unique_per_user(self):
+        """Test tag names are unique per user ignoring case and spaces"""
+        user = sample_user()
+        tag = models.Tag.objects.create(user=user, name="  Main   Course ")
+        self.assertEqual(tag.normalized_name, "main course")
+
+        with self.assertRaises(IntegrityError):
+            models.Tag.objects.create(user=user, name="MAIN COURSE")
+
+    def test_normalized_name_fits_longest_name(self):
+        """Test the normalized name of the longest name fits its column"""
+        user = sample_user()
+        for model in (models.Tag, models.Ingredient):
+            with self.subTest(model):
+                obj = model(user=user, name="\u0390" * 255)
+                obj.normalized_name = models.normalize_name(obj.name)
+
+                obj.full_clean()
+
     def test_ingredient_str(self):
         """Test the ingredient string is correct"""
         ingredent = models.Ingredient.objects.create(
@@ -84,3 +106,16 @@ class ModelTests(TestCase):
         file_path = models.recipe_image_file_path(None, "new-image.jpg")
         expected_path = f"uploads/recipe/{uuid}.jpg"
         self.assertEqual(file_path, expected_path)
+
+    def test_recipe_file_name_content_hash(self):
+        """Test that uploaded images are named after their content"""
+        content = b"image content"
+        digest = hashlib.sha256(content).hexdigest()
+        recipe = models.Recipe(
+            image=SimpleUploadedFile("new-image.JPG", content),
+        )
+
+        file_path = models.recipe_image_file_path(recipe, "new-image.JPG")
+
+        expected_path = f"uploads/recipe/{digest[:2]}/{digest}.jpg"
+        self.assertEqual(file_path, expected_path)
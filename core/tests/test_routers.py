@@ -0,0 +1,119 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import routers
+from core.models import Recipe, Tag
+
+# Declared by `app.test_settings`
+REPLICA = "test_replica"
+TAGS_URL = reverse("recipe:tag-list")
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+@override_settings(
+    DATABASE_REPLICAS=[REPLICA],
+    DATABASE_ROUTERS=["core.routers.ReplicaRouter"],
+    RECIPE_CACHE_TIMEOUT=0,
+)
+class ReplicaRouterTests(TestCase):
+    """Test routing reads to a replica"""
+
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    def setUp(self):
+        caches["default"].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        Tag.objects.create(user=self.user, name="Vegan")
+
+    def get_tag_names(self):
+        response = self.client.get(TAGS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return sorted(tag["name"] for tag in response.data["results"])
+
+    def test_reads_from_replica(self):
+        """Test safe requests read from the replica"""
+        Recipe.objects.create(
+            user=self.user, title="Sample", time_minutes=5, price=5
+        )
+
+        self.assertEqual(self.get_tag_names(), [])
+        response = self.client.get(RECIPES_URL)
+        self.assertEqual(response.data["results"], [])
+
+    def test_read_your_writes(self):
+        """Test a user reads from the primary for a while after writing"""
+        response = self.client.post(TAGS_URL, {"name": "Dessert"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self.get_tag_names(), ["Dessert", "Vegan"])
+
+        caches["default"].clear()
+        self.assertEqual(self.get_tag_names(), [])
+
+    def test_failed_writes_do_not_pin(self):
+        """Test rejected unsafe requests leave reads on the replica"""
+        response = self.client.post(TAGS_URL, {"name": ""})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertFalse(routers.is_user_pinned(self.user.pk))
+
+    def test_pin_per_user(self):
+        """Test the writes of a user do not pin other users"""
+        other = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword",
+        )
+        Tag.objects.create(user=other, name="Dessert")
+        routers.pin_user(other.pk)
+
+        self.assertEqual(self.get_tag_names(), [])
+
+    def test_writes_to_primary(self):
+        """Test objects read from the replica are written to the primary"""
+        # Replicate the user and their tag
+        self.user.save(using=REPLICA)
+        Tag.objects.get().save(using=REPLICA)
+
+        with routers.use_replicas():
+            tag = Tag.objects.get()
+            tag.name = "Updated"
+            tag.save()
+
+        self.assertEqual(tag._state.db, DEFAULT_DB_ALIAS)
+        self.assertEqual(Tag.objects.get().name, "Updated")
+        self.assertEqual(Tag.objects.using(REPLICA).get().name, "Vegan")
+
+    def test_reads_outside_requests(self):
+        """Test reads go to the primary unless replicas are enabled"""
+        router = routers.ReplicaRouter()
+
+        self.assertIsNone(router.db_for_read(Tag))
+        with routers.use_replicas():
+            self.assertEqual(router.db_for_read(Tag), REPLICA)
+            with routers.use_replicas(False):
+                self.assertIsNone(router.db_for_read(Tag))
+        self.assertIs(router.allow_migrate(REPLICA, "core"), False)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test everything goes to the primary without replicas"""
+        with patch("core.routers.pin_user") as pin_user:
+            response = self.client.post(TAGS_URL, {"name": "Dessert"})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        pin_user.assert_not_called()
+        self.assertEqual(self.get_tag_names(), ["Dessert", "Vegan"])
@@ -0,0 +1,183 @@
+import http.client
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.test import SimpleTestCase, override_settings
+
+from gunicorn import util
+
+from core.files import FileSlice
+from core.server import AsgiWorker, Server, close_connections
+
+LISTENING = re.compile(r"Listening at: http://[^:]+:(\d+)")
+SHARED_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379",
+    }
+}
+
+
+def get(connection: http.client.HTTPConnection, path: str = "/"):
+    connection.request("GET", path)
+    response = connection.getresponse()
+
+    return response.status, response.read()
+
+
+class ServeCommandTests(SimpleTestCase):
+    """Test the `serve` command runs gunicorn with the server settings"""
+
+    @override_settings(CACHES=SHARED_CACHES)
+    @mock.patch.object(Server, "run", autospec=True)
+    def test_gunicorn_settings(self, run):
+        """Test gunicorn preloads the application for threaded workers"""
+        call_command(
+            "serve",
+            "--bind=127.0.0.1:9000",
+            "--workers=3",
+            "--threads=2",
+            "--max-requests=500",
+            "--access-log",
+        )
+
+        (server,) = run.call_args.args
+        self.assertEqual(server.cfg.bind, ["127.0.0.1:9000"])
+        self.assertEqual(server.cfg.workers, 3)
+        self.assertEqual(server.cfg.worker_class_str, "gthread")
+        self.assertEqual(server.cfg.threads, 2)
+        self.assertEqual(server.cfg.max_requests, 500)
+        self.assertEqual(server.cfg.max_requests_jitter, 50)
+        self.assertEqual(server.cfg.accesslog, "-")
+        self.assertTrue(server.cfg.preload_app)
+        self.assertIs(server.cfg.pre_fork, close_connections)
+
+    @override_settings(ASYNC_VIEWS=True)
+    @mock.patch.object(Server, "run", autospec=True)
+    def test_asgi_worker(self, run):
+        """Test uvicorn workers serve the ASGI application of async views"""
+        call_command("serve", "--workers=1")
+
+        (server,) = run.call_args.args
+        self.assertIs(server.cfg.worker_class, AsgiWorker)
+        self.assertIsInstance(server.load(), ASGIHandler)
+
+    @mock.patch.object(Server, "run", autospec=True)
+    def test_process_local_cache(self, run):
+        """Test several workers are refused a cache private to each"""
+        with self.assertRaisesMessage(SystemCheckError, "core.E001"):
+            call_command("serve", "--workers=2")
+        run.assert_not_called()
+
+        call_command("serve", "--workers=1")
+        run.assert_called_once()
+
+    @mock.patch("core.server.caches")
+    @mock.patch("core.server.connections")
+    def test_close_connections(self, connections, caches):
+        """Test the master closes its connections before forking"""
+        close_connections(server=mock.Mock(), worker=mock.Mock())
+
+        connections.close_all.assert_called_once()
+        caches.close_all.assert_called_once()
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requires os.fork()")
+class ServeTests(SimpleTestCase):
+    """Test serving with gunicorn"""
+
+    def start_server(self, *args: str, env: dict = None):
+        """Start the server, returning its process and a connection to it"""
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "manage.py",
+                "serve",
+                "--bind=127.0.0.1:0",
+                "--workers=1",
+                "--threads=2",
+                *args,
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        self.addCleanup(process.stderr.close)
+        self.addCleanup(process.kill)
+        port = int(self.read_log(process, LISTENING).group(1))
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        self.addCleanup(connection.close)
+
+        return process, connection
+
+    def read_log(self, process, pattern: re.Pattern):
+        for line in process.stderr:
+            match = pattern.search(line)
+            if match:
+                return match
+        self.fail(f"The server did not log {pattern.pattern!r}")
+
+    def test_serve_reload_and_stop(self):
+        """Test serving, restarting workers on SIGHUP and stopping on SIGTERM"""
+        process, connection = self.start_server("--graceful-timeout=5")
+
+        # Kept alive across requests
+        self.assertEqual(get(connection, "/api/recipe/")[0], 200)
+        self.assertEqual(get(connection, "/api/recipe/")[0], 200)
+        connection.close()
+
+        process.send_signal(signal.SIGHUP)
+        self.read_log(process, re.compile("Hang up"))
+        self.assertEqual(get(connection, "/api/recipe/")[0], 200)
+        connection.close()
+
+        # Workers still booting are killed after the graceful timeout
+        process.send_signal(signal.SIGTERM)
+        self.assertEqual(process.wait(10), 0)
+
+    def test_serve_async_views(self):
+        """Test serving the async views with uvicorn workers"""
+        _, connection = self.start_server(
+            env={**os.environ, "ASYNC_VIEWS": "1"}
+        )
+
+        connection.request("GET", "/api/recipe/recipes/")
+        response = connection.getresponse()
+        response.read()
+
+        self.assertEqual(response.status, 401)
+        self.assertEqual(response.getheader("Server"), "uvicorn")
+
+    def test_send_file_range(self):
+        """Test ranges of the files of `core.files.serve` are sent"""
+        with tempfile.TemporaryDirectory() as media_root:
+            path = os.path.join(media_root, "numbers.txt")
+            with open(path, "wb") as file:
+                file.write(b"0123456789" * 1000)
+            with open(path, "rb") as file:
+                # Sent by gunicorn with `sendfile`
+                self.assertTrue(util.has_fileno(FileSlice(file, 5, 10)))
+            with override_settings(MEDIA_ROOT=media_root):
+                _, connection = self.start_server(
+                    env={**os.environ, "MEDIA_ROOT": settings.MEDIA_ROOT}
+                )
+
+                connection.request(
+                    "GET", "/media/numbers.txt", headers={"Range": "bytes=5-14"}
+                )
+                response = connection.getresponse()
+
+                self.assertEqual(response.status, 206)
+                self.assertEqual(response.read(), b"5678901234")
@@ -0,0 +1,123 @@
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+
+from rest_framework.response import Response
+
+
+class AsyncReadMixin:
+    """Serve the list and retrieve actions of a viewset with the async ORM.
+
+    With `ASYNC_VIEWS` set, when served by an ASGI server, the views of
+    these actions are coroutines awaiting their queries, instead of each
+    request holding a thread until it is answered. Authentication and
+    permissions, which may query the database, still run in a thread.
+    Other actions of the same URL keep their sync view, run in a thread.
+
+    Serializers having an async `aload` method are awaited before their
+    `data` is read, to load what it would otherwise query.
+    """
+
+    async_actions = ("list", "retrieve")
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_VIEWS:
+            return view
+        if not set(cls.async_actions) & set(actions.values()):
+            return view
+
+        return cls.as_async_view(view)
+
+    @classmethod
+    def as_async_view(cls, sync_view):
+        """Return a coroutine view serving the async actions of `sync_view`"""
+        actions = dict(sync_view.actions)
+        if "get" in actions:
+            actions.setdefault("head", actions["get"])
+
+        async def view(request, *args, **kwargs):
+            if actions.get(request.method.lower()) not in cls.async_actions:
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+            self = cls(**sync_view.initkwargs)
+            self.action_map = actions
+            return await self.adispatch(request, *args, **kwargs)
+
+        # Along with `cls`, `actions` and `csrf_exempt`
+        return update_wrapper(view, sync_view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """Async `dispatch` of the async actions"""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f"a{self.action}")
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            data = await self.aget_serializer_data(serializer)
+            return self.get_paginated_response(data)
+
+        objects = [obj async for obj in queryset]
+        serializer = self.get_serializer(objects, many=True)
+        return Response(await self.aget_serializer_data(serializer))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(await self.aget_serializer_data(serializer))
+
+    async def aget_object(self):
+        """Async `get_object`"""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except queryset.model.DoesNotExist:
+            raise Http404(
+                "No %s matches the given query."
+                % queryset.model._meta.object_name
+            )
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        """Async `paginate_queryset`, fetching the page in a thread.
+
+        DRF paginators have no async API, and the async ORM of Django 4.1
+        runs its queries in a thread anyway.
+        """
+        return await sync_to_async(self.paginate_queryset)(queryset)
+
+    async def aget_serializer_data(self, serializer):
+        aload = getattr(serializer, "aload", None)
+        if aload is not None:
+            await aload()
+
+        return serializer.data
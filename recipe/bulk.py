@@ -0,0 +1,229 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from core.models import Ingredient, Recipe, Tag
+from recipe import search
+from recipe.cache import bump_user_version
+from recipe.serializers import RecipeBulkSerializer
+
+# Recipe many to many fields written in bulk, and the model they point to
+RELATED_FIELDS = {"ingredients": Ingredient, "tags": Tag}
+
+
+def check_items(items):
+    """Check the payload is a list of at most `RECIPE_BULK_MAX_ITEMS`"""
+    if not isinstance(items, list):
+        raise ValidationError(
+            {"non_field_errors": [_("Expected a list of items.")]}
+        )
+    if len(items) > settings.RECIPE_BULK_MAX_ITEMS:
+        msg = _("Ensure this list has no more than %(count)d items.")
+        raise ValidationError(
+            {
+                "non_field_errors": [
+                    msg % {"count": settings.RECIPE_BULK_MAX_ITEMS}
+                ]
+            }
+        )
+
+
+def validate_items(user, items, partial=False) -> list:
+    """Validate a list of recipes, returning their validated data.
+
+    Fields are validated item by item without touching the database, then
+    the referenced tags and ingredients are checked to belong to the user
+    with a single query per model. Errors are raised as a list with an
+    entry per item, empty for the valid ones.
+    """
+    check_items(items)
+    errors = []
+    validated = []
+    for item in items:
+        serializer = RecipeBulkSerializer(data=item, partial=partial)
+        serializer.is_valid()
+        errors.append(dict(serializer.errors))
+        validated.append(serializer.validated_data)
+
+    for field, model in RELATED_FIELDS.items():
+        requested = {pk for data in validated for pk in data.get(field, ())}
+        owned = set(
+            model.objects.filter(user=user, pk__in=requested).values_list(
+                "pk", flat=True
+            )
+        )
+        for data, item_errors in zip(validated, errors):
+            missing = [pk for pk in data.get(field, ()) if pk not in owned]
+            if missing:
+                item_errors[field] = [
+                    _('Invalid pk "%(pk)s" - object does not exist.')
+                    % {"pk": pk}
+                    for pk in missing
+                ]
+
+    if any(errors):
+        raise ValidationError(errors)
+
+    return validated
+
+
+def set_links(recipes, validated):
+    """Replace the tags/ingredients of recipes given in `validated`"""
+    batch_size = settings.RECIPE_BULK_BATCH_SIZE
+    for field in RELATED_FIELDS:
+        m2m_field = Recipe._meta.get_field(field)
+        through = m2m_field.remote_field.through
+        source = f"{m2m_field.m2m_field_name()}_id"
+        target = f"{m2m_field.m2m_reverse_field_name()}_id"
+        pairs = [
+            (recipe, data[field])
+            for recipe, data in zip(recipes, validated)
+            if field in data
+        ]
+        if not pairs:
+            continue
+
+        through.objects.filter(
+            **{f"{source}__in": [recipe.pk for recipe, _ in pairs]}
+        ).delete()
+        through.objects.bulk_create(
+            (
+                through(**{source: recipe.pk, target: pk})
+                for recipe, pks in pairs
+                for pk in dict.fromkeys(pks)
+            ),
+            batch_size=batch_size,
+        )
+
+
+def bulk_create_recipes(user, items) -> list:
+    """Create recipes and their links in one transaction"""
+    validated = validate_items(user, items)
+    recipes = [
+        Recipe(
+            user=user,
+            **{
+                key: value
+                for key, value in data.items()
+                if key not in RELATED_FIELDS
+            },
+        )
+        for data in validated
+    ]
+    with transaction.atomic():
+        recipes = Recipe.objects.bulk_create(
+            recipes,
+            batch_size=settings.RECIPE_BULK_BATCH_SIZE,
+        )
+        set_links(recipes, validated)
+        search.update_search_vectors(
+            Recipe.objects.filter(pk__in=[recipe.pk for recipe in recipes])
+        )
+    bump_user_version(user.pk)
+
+    return [recipe.pk for recipe in recipes]
+
+
+def is_pk(value) -> bool:
+    """Return whether `value` is an integer primary key, booleans excluded"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def get_user_recipes(user, items, key) -> dict:
+    """Return the user's recipes referenced by `items`, by primary key.
+
+    Items referencing unknown, foreign or repeated recipes are reported
+    with a list of errors, one entry per item.
+    """
+    check_items(items)
+    pks = [item.get(key) if isinstance(item, dict) else item for item in items]
+    recipes = Recipe.objects.filter(
+        user=user,
+        pk__in=[pk for pk in pks if is_pk(pk)],
+    ).in_bulk()
+
+    errors = []
+    seen = set()
+    for pk in pks:
+        if not is_pk(pk) or pk not in recipes:
+            errors.append({key: [_("Recipe does not exist.")]})
+        elif pk in seen:
+            errors.append({key: [_("Recipe is repeated.")]})
+        else:
+            errors.append({})
+            seen.add(pk)
+    if any(errors):
+        raise ValidationError(errors)
+
+    return recipes
+
+
+def bulk_update_recipes(user, items) -> list:
+    """Partially update recipes identified by their `id`"""
+    recipes = get_user_recipes(user, items, "id")
+    validated = validate_items(user, items, partial=True)
+    targets = [recipes[item["id"]] for item in items]
+
+    fields = {"updated_at"}
+    now = timezone.now()
+    for recipe, data in zip(targets, validated):
+        for key, value in data.items():
+            if key not in RELATED_FIELDS:
+                setattr(recipe, key, value)
+                fields.add(key)
+        recipe.updated_at = now
+
+    with transaction.atomic():
+        Recipe.objects.bulk_update(
+            targets,
+            sorted(fields),
+            batch_size=settings.RECIPE_BULK_BATCH_SIZE,
+        )
+        set_links(targets, validated)
+        search.update_search_vectors(
+            Recipe.objects.filter(pk__in=[recipe.pk for recipe in targets])
+        )
+    bump_user_version(user.pk)
+
+    return [recipe.pk for recipe in targets]
+
+
+def bulk_delete_recipes(user, items):
+    """Delete recipes given as a list of ids"""
+    recipes = get_user_recipes(user, items, "id")
+    with transaction.atomic():
+        Recipe.objects.filter(pk__in=list(recipes)).delete()
+
+
+def upsert_by_name(model, user, names) -> list:
+    """Get or create the user's tags or ingredients named in `names`.
+
+    Names are validated item by item, errors being raised as a list with
+    an entry per name, empty for the valid ones.
+    """
+    check_items(names)
+    field = serializers.CharField(
+        max_length=model._meta.get_field("name").max_length
+    )
+    errors = []
+    validated = []
+    for name in names:
+        try:
+            validated.append(field.run_validation(name))
+            errors.append({})
+        except ValidationError as exc:
+            validated.append(None)
+            errors.append({"name": exc.detail})
+    if any(errors):
+        raise ValidationError(errors)
+
+    objects = model.objects.get_or_create_by_names(
+        user, validated, batch_size=settings.RECIPE_BULK_BATCH_SIZE
+    )
+    bump_user_version(user.pk)
+
+    return objects
@@ -0,0 +1,208 @@
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag, urlencode
+
+from rest_framework.response import Response
+
+VERSION_KEY = "recipe:version:{user_id}"
+RESPONSE_KEY = "recipe:response:{user_id}:{version}:{action}:{digest}"
+STATS_KEY = "recipe:stats:{name}"
+STATS = ("hits", "misses")
+
+
+def get_cache():
+    return caches[settings.RECIPE_CACHE_ALIAS]
+
+
+def get_user_version(user_id) -> int:
+    """Return the current cache version of the user's recipe data.
+
+    Missing versions are seeded from the clock rather than from 1, so a
+    version key evicted by the backend never brings back stale entries.
+    """
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_user_version(user_id):
+    """Invalidate every cached response of the user in O(1)"""
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def incr_stat(name: str):
+    cache = get_cache()
+    key = STATS_KEY.format(name=name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_stats() -> dict:
+    """Return the hit/miss counters of the response cache"""
+    cache = get_cache()
+    keys = {STATS_KEY.format(name=name): name for name in STATS}
+    values = cache.get_many(keys)
+
+    return {name: values.get(key, 0) for key, name in keys.items()}
+
+
+def get_response_key(request, action: str, kwargs: dict) -> str:
+    """Build the cache key of a response for the requesting user.
+
+    Query params are sorted so equivalent requests share the same entry;
+    the absolute URI is part of the key since responses embed links.
+    """
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    source = "|".join(
+        (
+            request.build_absolute_uri(request.path),
+            urlencode(sorted(kwargs.items())),
+            urlencode(params),
+        )
+    )
+    digest = hashlib.sha256(source.encode()).hexdigest()
+
+    return RESPONSE_KEY.format(
+        user_id=request.user.pk,
+        version=get_user_version(request.user.pk),
+        action=action,
+        digest=digest,
+    )
+
+
+def get_etag(response_key: str) -> str:
+    """Return the strong ETag of the response stored under `response_key`"""
+    return quote_etag(hashlib.sha256(response_key.encode()).hexdigest()[:32])
+
+
+class CachedResponseMixin:
+    """Cache successful responses of read actions per user.
+
+    Cached payloads are keyed by the user's data version, which is bumped
+    whenever their recipes, tags or ingredients change (see
+    `recipe.signals`), so stale entries are never read and simply expire.
+
+    The same key is the ETag of the response, so conditional requests
+    with a matching `If-None-Match` get a 304 without touching the
+    database. Views may also set `last_modified` (a timestamp) while
+    building a response to send `Last-Modified`; it is cached alongside
+    the payload.
+    """
+
+    cached_actions = ("list", "retrieve")
+    last_modified = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aget_cached_response(super().alist, request, kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aget_cached_response(
+            super().aretrieve, request, kwargs
+        )
+
+    def get_last_modified(self, kwargs):
+        """Return when the requested object last changed, if known.
+
+        Only called to evaluate `If-Modified-Since` requests.
+        """
+        return None
+
+    def get_cached_response(self, view, request, kwargs):
+        if self.action not in self.cached_actions:
+            return view(request, **kwargs)
+
+        key, response = self.get_stored_response(request, kwargs)
+        if response is None:
+            response = view(request, **kwargs)
+            self.store_response(key, response)
+
+        return self.patch_response(key, response)
+
+    async def aget_cached_response(self, view, request, kwargs):
+        """Async `get_cached_response`, of the coroutine `view`"""
+        if self.action not in self.cached_actions:
+            return await view(request, **kwargs)
+
+        # In a thread, as the cache and `get_last_modified` may block
+        key, response = await sync_to_async(self.get_stored_response)(
+            request, kwargs
+        )
+        if response is None:
+            response = await view(request, **kwargs)
+            await sync_to_async(self.store_response)(key, response)
+
+        return self.patch_response(key, response)
+
+    def get_stored_response(self, request, kwargs):
+        """Return the cache key and, unless the view must run, the response.
+
+        That is a 304 for a conditional request matching the current
+        version, or the cached payload.
+        """
+        key = get_response_key(request, self.action, kwargs)
+        etag = get_etag(key)
+        response = get_conditional_response(request, etag=etag)
+        if response is None and "HTTP_IF_MODIFIED_SINCE" in request.META:
+            self.last_modified = self.get_last_modified(kwargs)
+            response = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=self.last_modified,
+            )
+        if response is None and settings.RECIPE_CACHE_TIMEOUT:
+            cached = get_cache().get(key)
+            if cached is None:
+                incr_stat("misses")
+            else:
+                incr_stat("hits")
+                data, self.last_modified = cached
+                response = Response(data)
+
+        return key, response
+
+    def store_response(self, key: str, response):
+        timeout = settings.RECIPE_CACHE_TIMEOUT
+        if timeout and response.status_code == 200:
+            get_cache().set(key, (response.data, self.last_modified), timeout)
+
+    def patch_response(self, key: str, response):
+        if response.status_code in (200, 304):
+            response["ETag"] = get_etag(key)
+            if self.last_modified is not None:
+                response["Last-Modified"] = http_date(self.last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ("Authorization",))
+
+        return response
@@ -0,0 +1,178 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db.backends.base.operations import BaseDatabaseOperations
+from django.db.models import Count, Exists, OuterRef
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import ValidationError
+
+from core.models import Recipe
+
+MATCH_ANY = "any"
+MATCH_ALL = "all"
+MATCH_CHOICES = (MATCH_ANY, MATCH_ALL)
+TRUE_VALUES = ("1", "true", "yes", "on")
+# Integers an `IntegerField` holds on every database
+INTEGER_RANGE = BaseDatabaseOperations.integer_field_ranges["IntegerField"]
+
+
+def params_to_ints(value: str, param: str) -> list:
+    """Convert a comma separated list of IDs to a list of unique integers.
+
+    IDs out of the range of an `IntegerField` are rejected, as in
+    `params_to_number`.
+    """
+    try:
+        ids = {int(str_id) for str_id in value.split(",") if str_id.strip()}
+    except ValueError:
+        ids = None
+    if ids is None or not all(map(is_valid_number, ids)):
+        msg = _("Expected a comma separated list of integers.")
+        raise ValidationError({param: msg})
+
+    return sorted(ids)
+
+
+def params_to_limit(value, param: str, default: int, maximum: int) -> int:
+    """Convert a positive integer param, capped to `maximum`"""
+    if value in (None, ""):
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise ValidationError({param: _("Expected a positive integer.")})
+
+    return min(limit, maximum)
+
+
+def params_to_names(value: str, param: str, choices: tuple):
+    """Convert a comma separated list of names among `choices` to a tuple"""
+    if not value:
+        return None
+    names = tuple(
+        dict.fromkeys(name.strip() for name in value.split(",") if name.strip())
+    )
+    unknown = [name for name in names if name not in choices]
+    if unknown:
+        msg = _("Unknown %(names)s, expected some of: %(choices)s.") % {
+            "names": ", ".join(unknown),
+            "choices": ", ".join(choices),
+        }
+        raise ValidationError({param: msg})
+
+    return names
+
+
+def params_to_number(value: str, param: str, number_type=int):
+    """Convert a query param to an `int` or a finite `Decimal`.
+
+    Integers out of the range of an `IntegerField` are rejected too, as the
+    database would fail to compare them.
+    """
+    try:
+        number = number_type(value.strip())
+    except (ValueError, InvalidOperation):
+        number = None
+    if number is None or not is_valid_number(number):
+        raise ValidationError({param: _("Expected a number.")})
+
+    return number
+
+
+def is_valid_number(number) -> bool:
+    if isinstance(number, Decimal):
+        return number.is_finite()
+    minimum, maximum = INTEGER_RANGE
+
+    return minimum <= number <= maximum
+
+
+def get_ordering(query_params, fields: tuple):
+    """Return the `?ordering=` requested as a field with the id tiebreak.
+
+    The field may be prefixed with `-` for a descending order, which then
+    also applies to the id so that a single index serves both.
+    """
+    value = query_params.get("ordering", "").strip()
+    if not value:
+        return None
+    field = value.lstrip("-")
+    if field not in fields or len(value) - len(field) > 1:
+        choices = ", ".join(f"{field}, -{field}" for field in fields)
+        msg = _("Expected one of: %s.") % choices
+        raise ValidationError({"ordering": msg})
+    prefix = "-" if value.startswith("-") else ""
+
+    return (value, f"{prefix}id") if field != "id" else (value,)
+
+
+def params_to_bool(value) -> bool:
+    """Interpret a query param flag such as `?assigned_only=1`"""
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def get_match(query_params, param: str) -> str:
+    """Return the `<param>_match` mode requested, defaulting to any"""
+    match = query_params.get(f"{param}_match", MATCH_ANY)
+    if match not in MATCH_CHOICES:
+        msg = _("Expected one of: %s.") % ", ".join(MATCH_CHOICES)
+        raise ValidationError({f"{param}_match": msg})
+
+    return match
+
+
+def filter_by_related(queryset, field: str, ids: list, match: str = MATCH_ANY):
+    """Filter objects linked through the many to many `field` to `ids`.
+
+    Filtering is done against the through table in a subquery instead of
+    joining it, so the outer query never returns duplicated rows:
+
+    - `any` keeps objects linked to at least one of the ids (`EXISTS`).
+    - `all` keeps objects linked to every id, grouping the matching links
+      per object and comparing their count.
+    """
+    m2m_field = queryset.model._meta.get_field(field)
+    through = m2m_field.remote_field.through
+    source = m2m_field.m2m_field_name()
+    target = f"{m2m_field.m2m_reverse_field_name()}_id__in"
+    links = through.objects.filter(**{target: ids})
+
+    if match == MATCH_ALL:
+        matching = (
+            links.values(source)
+            .annotate(matches=Count("pk"))
+            .filter(matches=len(ids))
+            .values(source)
+        )
+        return queryset.filter(pk__in=matching)
+
+    return queryset.filter(Exists(links.filter(**{source: OuterRef("pk")})))
+
+
+def _recipe_links(field: str):
+    """Return the through model of `Recipe.<field>` and its target FK name"""
+    m2m_field = Recipe._meta.get_field(field)
+
+    return m2m_field.remote_field.through, m2m_field.m2m_reverse_field_name()
+
+
+def filter_assigned(queryset, field: str):
+    """Keep the objects assigned to at least one recipe through `field`.
+
+    Uses a semi-join (`EXISTS`) so objects linked to several recipes are
+    only returned once.
+    """
+    through, target = _recipe_links(field)
+    links = through.objects.filter(**{target: OuterRef("pk")})
+
+    return queryset.filter(Exists(links))
+
+
+def annotate_recipe_count(queryset, field: str):
+    """Annotate `recipe_count`, the number of recipes using each object"""
+    through, target = _recipe_links(field)
+    related_name = through._meta.get_field(target).related_query_name()
+
+    return queryset.annotate(recipe_count=Count(related_name))
@@ -0,0 +1,235 @@
+import logging
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from PIL import Image, ImageOps
+
+from core.models import Recipe
+from recipe.cache import bump_user_version
+
+logger = logging.getLogger(__name__)
+
+# Pillow format and file extension of each variant format
+FORMATS = {"webp": ("WEBP", "webp"), "jpeg": ("JPEG", "jpg")}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process wide pool running image jobs"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.RECIPE_IMAGE_WORKERS,
+                thread_name_prefix="recipe-images",
+            )
+
+    return _executor
+
+
+def schedule_processing(recipe: Recipe):
+    """Process the recipe image once the current transaction commits.
+
+    Jobs run on a thread pool of `RECIPE_IMAGE_WORKERS` threads, or inline
+    when it is 0. Jobs lost on shutdown stay `pending` and are picked up
+    by the `process_recipe_images` command.
+    """
+    transaction.on_commit(partial(submit, recipe.pk))
+
+
+def submit(recipe_id: int):
+    if settings.RECIPE_IMAGE_WORKERS:
+        get_executor().submit(run_job, recipe_id)
+    else:
+        run_logged(recipe_id)
+
+
+def run_job(recipe_id: int):
+    """Process an image on a worker thread, which owns its DB connection"""
+    close_old_connections()
+    try:
+        run_logged(recipe_id)
+    finally:
+        close_old_connections()
+
+
+def run_logged(recipe_id: int):
+    """Process an image, logging failures instead of raising them"""
+    try:
+        process_recipe_image(recipe_id)
+    except Exception:
+        logger.exception("Processing image of recipe %s failed", recipe_id)
+
+
+def get_variant_path(image_name: str, variant: str, extension: str) -> str:
+    """Return the path of a variant, next to the original image"""
+    return f"{get_variant_dir(image_name)}/{variant}.{extension}"
+
+
+def get_variant_dir(image_name: str) -> str:
+    """Return the directory holding the variants of an image"""
+    root, _ = os.path.splitext(image_name)
+
+    return root
+
+
+def render_variant(image: Image.Image, size, image_format: str) -> bytes:
+    """Return `image` resized to fit in `size` and encoded as requested"""
+    variant = image.copy()
+    variant.thumbnail(size)
+    if image_format == "JPEG" or variant.mode not in ("RGB", "RGBA"):
+        variant = variant.convert("RGB")
+
+    buffer = BytesIO()
+    variant.save(
+        buffer,
+        format=image_format,
+        quality=settings.RECIPE_IMAGE_QUALITY,
+    )
+
+    return buffer.getvalue()
+
+
+def set_image_status(recipe: Recipe, status: str, **fields) -> bool:
+    """Update the image status unless the image was replaced meanwhile"""
+    updated = Recipe.objects.filter(
+        pk=recipe.pk,
+        image=recipe.image.name,
+    ).update(image_status=status, updated_at=timezone.now(), **fields)
+    bump_user_version(recipe.user_id)
+
+    return bool(updated)
+
+
+def process_recipe_image(recipe_id: int):
+    """Generate the resized variants of a recipe image"""
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is None or not recipe.image:
+        return
+    # Identical images share a file, and so do their variants
+    shared_variants = (
+        Recipe.objects.filter(
+            image=recipe.image.name,
+            image_status=Recipe.ImageStatus.READY,
+        )
+        .exclude(pk=recipe.pk)
+        .values_list("image_variants", flat=True)
+        .first()
+    )
+    if shared_variants:
+        set_image_status(
+            recipe,
+            Recipe.ImageStatus.READY,
+            image_variants=shared_variants,
+        )
+        return
+
+    if not set_image_status(recipe, Recipe.ImageStatus.PROCESSING):
+        return
+
+    storage = recipe.image.storage
+    variants = {}
+    try:
+        with recipe.image.open("rb") as image_file:
+            with Image.open(image_file) as image:
+                # Let JPEG decode straight at the largest variant scale
+                largest = max(
+                    max(size)
+                    for size in settings.RECIPE_IMAGE_VARIANTS.values()
+                )
+                image.draft("RGB", (largest, largest))
+                image = ImageOps.exif_transpose(image)
+                for name, size in settings.RECIPE_IMAGE_VARIANTS.items():
+                    for key in settings.RECIPE_IMAGE_FORMATS:
+                        image_format, extension = FORMATS[key]
+                        path = get_variant_path(
+                            recipe.image.name, name, extension
+                        )
+                        content = render_variant(image, size, image_format)
+                        storage.delete(path)
+                        variants[f"{name}.{key}"] = storage.save(
+                            path, ContentFile(content)
+                        )
+    except Exception:
+        set_image_status(recipe, Recipe.ImageStatus.FAILED)
+        raise
+
+    set_image_status(
+        recipe,
+        Recipe.ImageStatus.READY,
+        image_variants=variants,
+    )
+
+
+def is_image_referenced(name: str) -> bool:
+    """Return whether a recipe uses the image file `name`"""
+    return Recipe.objects.filter(image=name).exists()
+
+
+def keep_image(name: str, upload):
+    """Store `upload` again at `name` if its file was released meanwhile.
+
+    Saving an image already stored is skipped, while `release_image` may
+    be deleting it for a recipe that stopped using it. Checked once the
+    recipe using it is saved, so that either sees the other.
+    """
+    storage = Recipe._meta.get_field("image").storage
+    if storage.exists(name):
+        return
+
+    # Still open, even when the storage moved the temporary file in place
+    upload.file.seek(0)
+    stored = storage.save(name, File(upload.file))
+    if stored != name:
+        # Stored again by another upload meanwhile
+        storage.delete(stored)
+
+
+def release_image(name: str):
+    """Delete an image file and its variants once no recipe uses it.
+
+    References are counted straight from the (indexed) image column, so
+    they cannot drift from the recipes actually pointing at a file. The
+    files are moved aside before counting them again, and put back if an
+    upload of the same image, which skipped storing it, was saved
+    meanwhile; later uploads store it again, see `keep_image`.
+    """
+    if not name or is_image_referenced(name):
+        return
+
+    storage = Recipe._meta.get_field("image").storage
+    released = []
+    for path in (storage.path(name), storage.path(get_variant_dir(name))):
+        aside = f"{path}.{uuid.uuid4().hex}.released"
+        try:
+            os.rename(path, aside)
+        except FileNotFoundError:
+            continue
+        released.append((path, aside))
+
+    if is_image_referenced(name):
+        for path, aside in released:
+            try:
+                os.replace(aside, path)
+            except OSError:
+                # Variants generated again meanwhile
+                shutil.rmtree(aside)
+        return
+
+    for _, aside in released:
+        if os.path.isdir(aside):
+            shutil.rmtree(aside)
+        else:
+            os.remove(aside)
@@ -0,0 +1,107 @@
+import random
+import uuid
+
+from django.contrib.auth import get_user_model
+
+from core.management.benchmark import BenchmarkCommand
+from core.models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    RecipeTag,
+    Tag,
+)
+
+# Words recipe titles are made of, so that searches match a share of them
+TITLE_WORDS = (
+    "baked",
+    "chicken",
+    "creamy",
+    "curry",
+    "green",
+    "grilled",
+    "lemon",
+    "pasta",
+    "roasted",
+    "salad",
+    "soup",
+    "spicy",
+    "tomato",
+    "vegetable",
+)
+
+
+def seed_recipes(user, recipes: int, tags: int, ingredients: int, links: int):
+    """Bulk create recipes for `user`, each linked to random tags/ingredients"""
+    tag_objs = Tag.objects.bulk_create(
+        Tag(user=user, name=f"Tag {index}", normalized_name=f"tag {index}")
+        for index in range(tags)
+    )
+    ingredient_objs = Ingredient.objects.bulk_create(
+        Ingredient(
+            user=user,
+            name=f"Ingredient {index}",
+            normalized_name=f"ingredient {index}",
+        )
+        for index in range(ingredients)
+    )
+    recipe_objs = Recipe.objects.bulk_create(
+        (
+            Recipe(
+                user=user,
+                title=" ".join([*random.sample(TITLE_WORDS, 3), str(index)]),
+                time_minutes=random.randint(1, 240),
+                price=random.randint(100, 99999) / 100,
+            )
+            for index in range(recipes)
+        ),
+        batch_size=1000,
+    )
+    RecipeTag.objects.bulk_create(
+        (
+            RecipeTag(recipe=recipe, tag=tag)
+            for recipe in recipe_objs
+            for tag in random.sample(tag_objs, min(links, tags))
+        ),
+        batch_size=1000,
+    )
+    RecipeIngredient.objects.bulk_create(
+        (
+            RecipeIngredient(recipe=recipe, ingredient=ingredient)
+            for recipe in recipe_objs
+            for ingredient in random.sample(
+                ingredient_objs, min(links, ingredients)
+            )
+        ),
+        batch_size=1000,
+    )
+
+    return recipe_objs, tag_objs, ingredient_objs
+
+
+class RecipeBenchmarkCommand(BenchmarkCommand):
+    """Base command benchmarking over a throwaway user's seeded recipes"""
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--recipes", type=int, default=5000)
+        parser.add_argument("--tags", type=int, default=200)
+        parser.add_argument("--ingredients", type=int, default=200)
+        parser.add_argument("--links", type=int, default=5)
+
+    def run_benchmark(self, options):
+        user = get_user_model().objects.create_user(
+            email=f"benchmark-{uuid.uuid4()}@example.com",
+            password=str(uuid.uuid4()),
+        )
+        seeded = seed_recipes(
+            user,
+            options["recipes"],
+            options["tags"],
+            options["ingredients"],
+            options["links"],
+        )
+        self.run_recipe_benchmark(user, seeded, options)
+
+    def run_recipe_benchmark(self, user, seeded, options):
+        raise NotImplementedError
@@ -0,0 +1,148 @@
+import asyncio
+import statistics
+import threading
+import time
+
+from django.core.handlers.asgi import ASGIHandler
+from django.test import override_settings
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from accounts.models import Token
+from recipe import views
+from recipe.management.benchmark import RecipeBenchmarkCommand
+
+
+def get_urlconf(async_views: bool):
+    """Return a URLconf of the recipe API, with async views or not"""
+    with override_settings(ASYNC_VIEWS=async_views):
+        router = DefaultRouter()
+        router.register("ingredients", views.IngredientViewSet)
+        router.register("tags", views.TagViewSet)
+        router.register("recipes", views.RecipeViewSet)
+
+        class URLConf:
+            urlpatterns = [
+                path("api/recipe/", include((router.urls, "recipe")))
+            ]
+
+    return URLConf
+
+
+class Command(RecipeBenchmarkCommand):
+    """Compare the sync and async recipe views served by the ASGI handler.
+
+    Clients are simulated in-process, each sending its request and reading
+    the response over `--client-delay` milliseconds, as slow clients do.
+    Reports the throughput, latency and peak thread count of each.
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=100)
+        parser.add_argument("--client-delay", type=float, default=50)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--path", default="recipes/")
+
+    def handle(self, *args, **options):
+        # Requests are served in threads with their own connections, which
+        # would not see the seeded data in a transaction. It is committed,
+        # and deleted once done.
+        self.run_benchmark(options)
+
+    def run_recipe_benchmark(self, user, seeded, options):
+        token = Token.objects.create(user=user)
+        try:
+            for label, async_views in (("sync", False), ("async", True)):
+                with override_settings(
+                    ASYNC_VIEWS=async_views,
+                    ROOT_URLCONF=get_urlconf(async_views),
+                    RECIPE_CACHE_TIMEOUT=0,
+                ):
+                    results = asyncio.run(self.load(token.key, options))
+                self.report_load(label, *results)
+        finally:
+            user.delete()
+
+    async def load(self, token: str, options):
+        """Return the timings, failures, duration and peak thread count"""
+        handler = ASGIHandler()
+        delay = options["client_delay"] / 1000
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/api/recipe/{options['path']}",
+            "query_string": f"page_size={options['page_size']}".encode(),
+            "headers": [
+                (b"host", b"localhost"),
+                (b"authorization", f"Token {token}".encode()),
+            ],
+            "server": ("localhost", 80),
+        }
+
+        async def fetch():
+            status = None
+
+            async def receive():
+                await asyncio.sleep(delay)
+                return {"type": "http.request", "body": b""}
+
+            async def send(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                elif not message.get("more_body"):
+                    await asyncio.sleep(delay)
+
+            start = time.perf_counter()
+            await handler(dict(scope), receive, send)
+            return status, (time.perf_counter() - start) * 1000
+
+        remaining = options["requests"]
+        results = []
+
+        async def client():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                results.append(await fetch())
+
+        peak_threads = threading.active_count()
+
+        async def sample_threads():
+            nonlocal peak_threads
+            while True:
+                peak_threads = max(peak_threads, threading.active_count())
+                await asyncio.sleep(0.005)
+
+        await fetch()
+        sampler = asyncio.create_task(sample_threads())
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(options["concurrency"])))
+        elapsed = time.perf_counter() - start
+        sampler.cancel()
+
+        timings = sorted(ms for status, ms in results if status == 200)
+        return timings, len(results) - len(timings), elapsed, peak_threads
+
+    def report_load(self, label, timings, errors, elapsed, peak_threads):
+        self.stdout.write(
+            f"{label}: {len(timings) + errors} requests ({errors} failed), "
+            f"{(len(timings) + errors) / elapsed:.1f} req/s, "
+            f"peak {peak_threads} threads"
+        )
+        if len(timings) < 2:
+            return
+
+        percentiles = statistics.quantiles(timings, n=100)
+        for name, milliseconds in (
+            ("latency p50", statistics.median(timings)),
+            ("latency p99", percentiles[98]),
+        ):
+            self.report(f"  {name}", milliseconds)
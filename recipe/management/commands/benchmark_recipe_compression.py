@@ -0,0 +1,43 @@
+from core.middleware import COMPRESSORS, compress_content
+from core.models import Recipe
+from core.renderers import FastJSONRenderer
+from recipe.management.benchmark import RecipeBenchmarkCommand
+from recipe.serializers import RecipeValuesSerializer
+
+
+class Command(RecipeBenchmarkCommand):
+    """Measure the bytes saved compressing pages of the recipe list."""
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--page-size", type=int, default=100)
+
+    def run_recipe_benchmark(self, user, seeded, options):
+        queryset = RecipeValuesSerializer.setup_eager_loading(
+            Recipe.objects.filter(user=user).order_by("id")
+        )
+        renderer = FastJSONRenderer()
+        for page_size in (10, options["page_size"], options["page_size"] * 5):
+            content = renderer.render(
+                {
+                    "next": None,
+                    "previous": None,
+                    "results": RecipeValuesSerializer(
+                        queryset[:page_size], many=True
+                    ).data,
+                }
+            )
+            self.stdout.write(f"page={page_size} identity bytes={len(content)}")
+            for encoding in COMPRESSORS:
+                milliseconds = self.timeit(
+                    lambda: compress_content(encoding, content),
+                    options["repeat"],
+                )
+                size = len(compress_content(encoding, content))
+                self.report(
+                    f"  {encoding} bytes={size} saved="
+                    f"{1 - size / len(content):.0%}",
+                    milliseconds,
+                )
@@ -0,0 +1,26 @@
+from core.models import Recipe
+from recipe.filters import MATCH_CHOICES, filter_by_related
+from recipe.management.benchmark import RecipeBenchmarkCommand
+
+
+class Command(RecipeBenchmarkCommand):
+    """Time `?tags=` filtering as the number of requested tags grows."""
+
+    help = __doc__
+
+    def run_recipe_benchmark(self, user, seeded, options):
+        _, tags, _ = seeded
+        queryset = Recipe.objects.filter(user=user)
+        for match in MATCH_CHOICES:
+            for size in (1, 5, 25, 100):
+                tag_ids = [tag.id for tag in tags[:size]]
+                filtered = filter_by_related(queryset, "tags", tag_ids, match)
+                milliseconds = self.timeit(
+                    lambda: list(filtered.values_list("id", flat=True)),
+                    options["repeat"],
+                )
+                rows = filtered.count()
+                self.report(
+                    f"tags_match={match} tags={size} rows={rows}",
+                    milliseconds,
+                )
@@ -0,0 +1,55 @@
+import io
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Recipe
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+from recipe.management.benchmark import RecipeBenchmarkCommand
+from recipe.serializers import RecipeDetailSerializer
+
+
+class Command(RecipeBenchmarkCommand):
+    """Time encoding and decoding recipe payloads with each JSON backend."""
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--page-size", type=int, default=100)
+
+    def run_recipe_benchmark(self, user, seeded, options):
+        queryset = RecipeDetailSerializer.setup_eager_loading(
+            Recipe.objects.filter(user=user).order_by("id")
+        )
+        backends = (
+            (JSONRenderer(), JSONParser()),
+            (FastJSONRenderer(), FastJSONParser()),
+        )
+        for page_size in (options["page_size"], options["page_size"] * 10):
+            data = {
+                "results": RecipeDetailSerializer(
+                    queryset[:page_size], many=True
+                ).data
+            }
+            rendered = set()
+            for renderer, parser in backends:
+                name = type(renderer).__name__
+                milliseconds = self.timeit(
+                    lambda: renderer.render(data), options["repeat"]
+                )
+                body = renderer.render(data)
+                rendered.add(body)
+                self.report(
+                    f"{name} page={page_size} bytes={len(body)}",
+                    milliseconds,
+                )
+
+                name = type(parser).__name__
+                milliseconds = self.timeit(
+                    lambda: parser.parse(io.BytesIO(body)), options["repeat"]
+                )
+                self.report(f"{name} page={page_size}", milliseconds)
+            if len(rendered) != 1:
+                self.stderr.write("Rendered payloads differ")
@@ -0,0 +1,36 @@
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Recipe
+from recipe.management.benchmark import RecipeBenchmarkCommand
+from recipe.serializers import RecipeSerializer, RecipeValuesSerializer
+
+
+class Command(RecipeBenchmarkCommand):
+    """Time rendering a page of recipes with and without model instances."""
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--page-size", type=int, default=100)
+
+    def run_recipe_benchmark(self, user, seeded, options):
+        queryset = Recipe.objects.filter(user=user).order_by("id")
+        renderer = JSONRenderer()
+        for page_size in (options["page_size"], options["page_size"] * 5):
+            rendered = {}
+            for serializer_class in (RecipeSerializer, RecipeValuesSerializer):
+                page = serializer_class.setup_eager_loading(queryset)
+
+                def render():
+                    data = serializer_class(page[:page_size], many=True).data
+                    return renderer.render(data)
+
+                milliseconds = self.timeit(render, options["repeat"])
+                rendered[serializer_class] = render()
+                self.report(
+                    f"{serializer_class.__name__} page={page_size}",
+                    milliseconds,
+                )
+            if len(set(rendered.values())) != 1:
+                self.stderr.write("Rendered pages differ")
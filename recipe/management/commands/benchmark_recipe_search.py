@@ -0,0 +1,48 @@
+from core.models import Recipe
+from recipe import search
+from recipe.management.benchmark import RecipeBenchmarkCommand
+
+QUERIES = ("curry", "green curry", "tomato -soup", '"roasted chicken"')
+
+
+class Command(RecipeBenchmarkCommand):
+    """Time `?search=` against substring matching on a seeded dataset.
+
+    Seeds a million recipes by default. Search vectors are only maintained
+    on PostgreSQL, elsewhere both timings use the substring fallback.
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(recipes=1_000_000, repeat=5)
+        parser.add_argument("--page-size", type=int, default=100)
+
+    def run_recipe_benchmark(self, user, seeded, options):
+        queryset = Recipe.objects.filter(user=user)
+        milliseconds = self.timeit(
+            lambda: search.update_search_vectors(queryset), 1
+        )
+        self.report(f"index recipes={len(seeded[0])}", milliseconds)
+
+        page_size = options["page_size"]
+        for query in QUERIES:
+            results = search.search_recipes(queryset, query).order_by(
+                "-search_rank", "id"
+            )
+            substring = search.match_terms(queryset, query).order_by(
+                "-search_rank", "id"
+            )
+
+            for label, filtered in (("search", results), ("substr", substring)):
+                milliseconds = self.timeit(
+                    lambda: list(
+                        filtered.values_list("id", flat=True)[:page_size]
+                    ),
+                    options["repeat"],
+                )
+                self.report(
+                    f"{label} {query!r} rows={filtered.count()}",
+                    milliseconds,
+                )
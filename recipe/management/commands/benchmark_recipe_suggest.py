@@ -0,0 +1,50 @@
+import itertools
+import uuid
+
+from django.contrib.auth import get_user_model
+
+from core.management.benchmark import BenchmarkCommand
+from core.models import Ingredient
+from recipe.management.benchmark import TITLE_WORDS
+from recipe.suggest import suggest_names
+
+QUERIES = ("c", "cur", "green cu", "tomatto", "zz")
+
+
+class Command(BenchmarkCommand):
+    """Time ingredient suggestions over a seeded set of names."""
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--names", type=int, default=50000)
+        parser.add_argument("--limit", type=int, default=10)
+
+    def run_benchmark(self, options):
+        user = get_user_model().objects.create_user(
+            email=f"benchmark-{uuid.uuid4()}@example.com",
+            password=str(uuid.uuid4()),
+        )
+        names = (
+            f"{' '.join(words)} {index}"
+            for index, words in enumerate(
+                itertools.cycle(itertools.permutations(TITLE_WORDS, 2))
+            )
+        )
+        Ingredient.objects.bulk_create(
+            (
+                Ingredient(user=user, name=name, normalized_name=name)
+                for name in itertools.islice(names, options["names"])
+            ),
+            batch_size=1000,
+        )
+
+        queryset = Ingredient.objects.all()
+        for query in QUERIES:
+            milliseconds = self.timeit(
+                lambda: suggest_names(queryset, user, query, options["limit"]),
+                options["repeat"],
+            )
+            found = suggest_names(queryset, user, query, options["limit"])
+            self.report(f"suggest {query!r} found={len(found)}", milliseconds)
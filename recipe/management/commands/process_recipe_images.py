@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Recipe
+from recipe.images import process_recipe_image
+
+
+class Command(BaseCommand):
+    """Generate the variants of recipe images left unprocessed, e.g. by
+    jobs lost on shutdown or uploads made before processing existed."""
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Reprocess every recipe image, including ready ones.",
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["all"]:
+            recipes = recipes.exclude(image_status=Recipe.ImageStatus.READY)
+
+        failed = 0
+        for recipe_id in recipes.values_list("id", flat=True).iterator():
+            try:
+                process_recipe_image(recipe_id)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Recipe {recipe_id}: {exc}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed images, {failed} failed.")
+        )
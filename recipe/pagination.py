@@ -0,0 +1,25 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset pagination over the primary key of user owned objects.
+
+    Pages are fetched with `WHERE id > cursor LIMIT page_size`, so the cost
+    of a page does not depend on how many rows the user owns. Views can
+    page over another ordering by defining `get_pagination_ordering`.
+    """
+
+    ordering = "id"
+    page_size_query_param = "page_size"
+
+    @property
+    def max_page_size(self):
+        return settings.API_MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        """Return the view's ordering for `queryset`, by default the id"""
+        get_ordering = getattr(view, "get_pagination_ordering", None)
+        ordering = get_ordering(queryset) if get_ordering else None
+
+        return ordering or super().get_ordering(request, queryset, view)
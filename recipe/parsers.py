@@ -0,0 +1,29 @@
+import codecs
+
+from django.conf import settings
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from core.parsers import loads
+
+
+class NDJSONParser(BaseParser):
+    """Parses newline delimited JSON into a list, one item per line"""
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        decoded_stream = codecs.getreader(encoding)(stream)
+        items = []
+        for number, line in enumerate(decoded_stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(loads(line))
+            except ValueError as exc:
+                raise ParseError(f"NDJSON parse error on line {number} - {exc}")
+
+        return items
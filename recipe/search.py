@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, router
+from django.db.models import (
+    Case,
+    Exists,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast
+
+from core.models import Recipe
+
+# Weight of the text indexed from each source, most relevant first
+SEARCH_WEIGHTS = (("title", "A"), ("tags", "B"), ("ingredients", "C"))
+
+
+def is_supported(using: str) -> bool:
+    """Return whether full-text search is available on database `using`"""
+    return connections[using].vendor == "postgresql"
+
+
+def is_enabled() -> bool:
+    """Return whether recipes are written to a database with search"""
+    return is_supported(router.db_for_write(Recipe))
+
+
+def get_related_names(field: str) -> Subquery:
+    """Return the names of the objects linked to a recipe through `field`"""
+    m2m_field = Recipe._meta.get_field(field)
+    through = m2m_field.remote_field.through
+    source = m2m_field.m2m_field_name()
+    target = m2m_field.m2m_reverse_field_name()
+
+    return Subquery(
+        through.objects.filter(**{source: OuterRef("pk")})
+        .values(source)
+        .annotate(names=StringAgg(f"{target}__name", delimiter=" "))
+        .values("names")
+    )
+
+
+def get_search_vector() -> SearchVector:
+    """Return the weighted search vector of a recipe.
+
+    Computed in the database from the recipe title and the names of its
+    tags and ingredients.
+    """
+    vector = None
+    for field, weight in SEARCH_WEIGHTS:
+        expression = field if field == "title" else get_related_names(field)
+        field_vector = SearchVector(
+            expression,
+            weight=weight,
+            config=settings.RECIPE_SEARCH_CONFIG,
+        )
+        vector = field_vector if vector is None else vector + field_vector
+
+    return vector
+
+
+def get_vector_update() -> dict:
+    """Return the fields to update to refresh the search vector, if any"""
+    if not is_enabled():
+        return {}
+
+    return {"search_vector": get_search_vector()}
+
+
+def update_search_vectors(queryset):
+    """Recompute the search vector of the recipes in `queryset`"""
+    fields = get_vector_update()
+    if fields:
+        queryset.update(**fields)
+
+
+def get_term_filter(term: str) -> Q:
+    """Match recipes with `term` in their title, tags or ingredients"""
+    condition = Q(title__icontains=term)
+    for field in ("tags", "ingredients"):
+        m2m_field = Recipe._meta.get_field(field)
+        through = m2m_field.remote_field.through
+        source = m2m_field.m2m_field_name()
+        target = m2m_field.m2m_reverse_field_name()
+        links = through.objects.filter(
+            **{source: OuterRef("pk"), f"{target}__name__icontains": term}
+        )
+        condition |= Exists(links)
+
+    return condition
+
+
+def match_terms(queryset, query: str):
+    """Filter recipes matching every word of `query` as a substring.
+
+    Words prefixed with `-` exclude the recipes matching them and quotes
+    are ignored. Recipes are ranked by the number of words found in their
+    title, as `search_rank`.
+    """
+    rank = Value(0.0)
+    for term in query.replace('"', " ").split():
+        if term.startswith("-"):
+            if term[1:]:
+                queryset = queryset.exclude(get_term_filter(term[1:]))
+            continue
+        queryset = queryset.filter(get_term_filter(term))
+        rank += Case(
+            When(title__icontains=term, then=Value(1.0)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+
+    return queryset.annotate(search_rank=rank)
+
+
+def search_recipes(queryset, query: str):
+    """Filter recipes matching `query`, annotating their `search_rank`.
+
+    PostgreSQL matches the stored search vector against a websearch query
+    ranked with `ts_rank`. Other databases fall back to `match_terms`.
+    """
+    if not query.replace('"', " ").split():
+        return queryset
+
+    if is_supported(queryset.db):
+        search_query = SearchQuery(
+            query,
+            search_type="websearch",
+            config=settings.RECIPE_SEARCH_CONFIG,
+        )
+        # `ts_rank` returns a float4, read back as its shortest decimal text,
+        # which the cursor of the next page then compares as a float8 with
+        # the rank itself. Cast to a float8, the rank reads back exactly.
+        rank = SearchRank(F("search_vector"), search_query)
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=Cast(rank, FloatField())
+        )
+
+    return match_terms(queryset, query)
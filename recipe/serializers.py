@@ -1,9 +1,88 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import connections
+from django.db.models import OuterRef, Prefetch
+from django.utils.translation import gettext_lazy as _
+
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+from core.models import Ingredient, Recipe, Tag, normalize_name
+
+
+class RecipeAttributeSerializer(serializers.ModelSerializer):
+    """Base serializer for tags and ingredients, unique by name per user"""
+
+    def validate_name(self, name: str) -> str:
+        """Reject names already used by the user, ignoring case and spaces"""
+        request = self.context.get("request")
+        if request is None:
+            return name
+        existing = self.Meta.model.objects.filter(
+            user=request.user,
+            normalized_name=normalize_name(name),
+        )
+        if self.instance is not None:
+            existing = existing.exclude(pk=self.instance.pk)
+        if existing.exists():
+            raise serializers.ValidationError(
+                _("An object with this name already exists.")
+            )
+
+        return name
+
+
+class UserManyRelatedField(serializers.ManyRelatedField):
+    """Many related field looking up every primary key with one query"""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        child = self.child_relation
+        queryset = child.get_queryset()
+        pk_field = queryset.model._meta.pk
+        pks = []
+        for item in data:
+            try:
+                if isinstance(item, bool):
+                    raise TypeError
+                pks.append(pk_field.to_python(item))
+            except (TypeError, ValueError, DjangoValidationError):
+                child.fail("incorrect_type", data_type=type(item).__name__)
 
-from core.models import Ingredient, Recipe, Tag
+        objects = queryset.in_bulk(set(pks))
+        for pk in pks:
+            if pk not in objects:
+                child.fail("does_not_exist", pk_value=pk)
 
+        return [objects[pk] for pk in dict.fromkeys(pks)]
 
-class IngredientSerializer(serializers.ModelSerializer):
+
+class UserPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field limited to the objects of the requesting user"""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key, value in kwargs.items():
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = value
+
+        return UserManyRelatedField(**list_kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = self.context.get("request")
+        if request is None:
+            return queryset.none()
+
+        return queryset.filter(user=request.user)
+
+
+class IngredientSerializer(RecipeAttributeSerializer):
     """Serializer for ingredient objects"""
 
     class Meta:
@@ -12,7 +91,7 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(RecipeAttributeSerializer):
     """Serializer for tag objects"""
 
     class Meta:
@@ -21,16 +100,51 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
+class IngredientUsageSerializer(IngredientSerializer):
+    """Serializer for ingredient objects with their recipe count"""
+
+    recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(IngredientSerializer.Meta):
+        fields = IngredientSerializer.Meta.fields + ("recipe_count",)
+
+
+class TagUsageSerializer(TagSerializer):
+    """Serializer for tag objects with their recipe count"""
+
+    recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ("recipe_count",)
+
+
 class RecipeSerializer(serializers.ModelSerializer):
-    """Serializer for recipe objects"""
+    """Serializer for recipe objects.
+
+    Tags and ingredients are written as ids of the user's objects, and can
+    also be given by name with `tag_names` and `ingredient_names`, creating
+    the ones the user does not have yet.
+    """
 
-    ingredients = serializers.PrimaryKeyRelatedField(
+    ingredients = UserPrimaryKeyRelatedField(
         many=True,
         queryset=Ingredient.objects.all(),
+        required=False,
     )
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = UserPrimaryKeyRelatedField(
         many=True,
         queryset=Tag.objects.all(),
+        required=False,
+    )
+    ingredient_names = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        write_only=True,
+        required=False,
+    )
+    tag_names = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        write_only=True,
+        required=False,
     )
 
     class Meta:
@@ -43,21 +157,296 @@ class RecipeSerializer(serializers.ModelSerializer):
             "tags",
             "price",
             "link",
+            "ingredient_names",
+            "tag_names",
         )
         read_only_fields = ("id",)
 
+    # Fields naming the objects to add to each many to many field
+    name_fields = {"ingredient_names": "ingredients", "tag_names": "tags"}
+
+    # Related fields that `?expand=` renders as nested objects
+    expandable_fields = {
+        "ingredients": IngredientSerializer,
+        "tags": TagSerializer,
+    }
+    # Related fields rendered as nested objects without asking
+    expanded_fields = ()
+    # Columns loaded for related objects rendered as ids, or nested
+    related_only_fields = ("id",)
+    expanded_only_fields = ("id", "name")
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        """Render only `fields` if given, nesting the `expand` ones"""
+        super().__init__(*args, **kwargs)
+        for name in self.get_expanded_fields(expand):
+            self.fields[name] = self.expandable_fields[name](
+                many=True, read_only=True
+            )
+        if fields is not None:
+            for name in set(self.get_readable_field_names()) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def get_readable_field_names(cls) -> tuple:
+        """Return the fields rendered by default, the ones `?fields=` picks"""
+        return tuple(
+            name for name in cls.Meta.fields if name not in cls.name_fields
+        )
+
+    @classmethod
+    def get_expanded_fields(cls, expand=()) -> set:
+        return {*cls.expanded_fields, *expand}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None, expand=(), columns=()):
+        """Restrict the queryset to the columns and relations rendered.
+
+        `columns` are loaded on top of the rendered fields, e.g. to order
+        recipes.
+        """
+        if fields is None:
+            fields = cls.get_readable_field_names()
+        expanded = cls.get_expanded_fields(expand)
+        prefetches = []
+        for name, serializer_class in cls.expandable_fields.items():
+            if name not in fields:
+                continue
+            only_fields = (
+                cls.expanded_only_fields
+                if name in expanded
+                else cls.related_only_fields
+            )
+            prefetches.append(
+                Prefetch(
+                    name,
+                    queryset=serializer_class.Meta.model.objects.only(
+                        *only_fields
+                    ).order_by("pk"),
+                )
+            )
+
+        return queryset.only(
+            "id",
+            "updated_at",
+            *(name for name in fields if name not in cls.expandable_fields),
+            *(
+                name
+                for name in columns
+                if name not in queryset.query.annotations
+            ),
+        ).prefetch_related(*prefetches)
+
+    def resolve_names(self, validated_data: dict) -> dict:
+        """Replace the names given for related objects by the objects"""
+        for names_field, field in self.name_fields.items():
+            names = validated_data.pop(names_field, None)
+            if names is None:
+                continue
+            model = Recipe._meta.get_field(field).related_model
+            objects = model.objects.get_or_create_by_names(
+                self.context["request"].user, names
+            )
+            validated_data[field] = list(
+                dict.fromkeys([*validated_data.get(field, ()), *objects])
+            )
+
+        return validated_data
+
+    def create(self, validated_data):
+        return super().create(self.resolve_names(validated_data))
+
+    def update(self, instance, validated_data):
+        return super().update(instance, self.resolve_names(validated_data))
+
+
+class RecipeValuesSerializer:
+    """Read only rendering of `RecipeSerializer` lists from `values()` rows.
+
+    Recipes are read as dicts along with the ids of their tags and
+    ingredients, aggregated per recipe in the same query on PostgreSQL and
+    with one query per relation elsewhere. No model or serializer is
+    instantiated per recipe, and the data is the same `RecipeSerializer`
+    renders for ids (not expanded) related fields.
+    """
+
+    serializer_class = RecipeSerializer
+    expandable_fields = RecipeSerializer.expandable_fields
+
+    def __init__(self, instance=None, many=True, fields=None, **kwargs):
+        self.instance = instance
+        # Rendered in the order of the serializer fields
+        self.field_names = [
+            name
+            for name in self.get_readable_field_names()
+            if fields is None or name in fields
+        ]
+        self.context = kwargs.get("context", {})
+
+    @classmethod
+    def get_readable_field_names(cls) -> tuple:
+        return cls.serializer_class.get_readable_field_names()
+
+    @staticmethod
+    def get_ids_key(name: str) -> str:
+        """Return the row key holding the ids of the related field `name`"""
+        return f"{name[:-1]}_ids"
+
+    @classmethod
+    def get_related_ids(cls, name: str):
+        """Return the sorted ids linked to the outer recipe through `name`"""
+        m2m_field = Recipe._meta.get_field(name)
+        target = f"{m2m_field.m2m_reverse_field_name()}_id"
+
+        return ArraySubquery(
+            m2m_field.remote_field.through.objects.filter(
+                **{m2m_field.m2m_field_name(): OuterRef("pk")}
+            )
+            .order_by(target)
+            .values(target)
+        )
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None, expand=(), columns=()):
+        """Select the rendered columns as dicts instead of models"""
+        if fields is None:
+            fields = cls.get_readable_field_names()
+        related = {}
+        if connections[queryset.db].vendor == "postgresql":
+            related = {
+                cls.get_ids_key(name): cls.get_related_ids(name)
+                for name in cls.expandable_fields
+                if name in fields
+            }
+
+        names = dict.fromkeys(
+            [
+                "id",
+                *(name for name in fields if name not in cls.expandable_fields),
+                *columns,
+            ]
+        )
+
+        return queryset.values(*names, **related)
+
+    def get_missing_links(self, rows: list):
+        """Yield the row key and the links of relations missing from `rows`"""
+        pks = [row["id"] for row in rows]
+        for name in self.expandable_fields:
+            key = self.get_ids_key(name)
+            if name not in self.field_names or (rows and key in rows[0]):
+                continue
+            m2m_field = Recipe._meta.get_field(name)
+            source = f"{m2m_field.m2m_field_name()}_id"
+            target = f"{m2m_field.m2m_reverse_field_name()}_id"
+            links = (
+                m2m_field.remote_field.through.objects.filter(
+                    **{f"{source}__in": pks}
+                )
+                .order_by(source, target)
+                .values_list(source, target)
+            )
+            yield key, links
+
+    @staticmethod
+    def add_related_ids(rows: list, key: str, links):
+        ids = {row["id"]: [] for row in rows}
+        for pk, related_pk in links:
+            ids[pk].append(related_pk)
+        for row in rows:
+            row[key] = ids[row["id"]]
+
+    def load_related_ids(self, rows: list):
+        """Add the related ids missing from `rows`, a query per relation"""
+        for key, links in self.get_missing_links(rows):
+            self.add_related_ids(rows, key, links)
+
+    async def aload_related_ids(self, rows: list):
+        """Async `load_related_ids`, querying with the async ORM"""
+        for key, links in self.get_missing_links(rows):
+            self.add_related_ids(rows, key, [link async for link in links])
+
+    async def aload(self):
+        """Load the related ids of the rows with the async ORM"""
+        await self.aload_related_ids(self.instance)
+
+    @property
+    def data(self) -> list:
+        rows = list(self.instance)
+        self.load_related_ids(rows)
+        fields = self.serializer_class().fields
+        getters = []
+        for name in self.field_names:
+            if name in self.expandable_fields:
+                key = self.get_ids_key(name)
+                getters.append((name, key, None))
+            else:
+                getters.append((name, name, fields[name].to_representation))
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, key, to_representation in getters:
+                value = row[key]
+                if to_representation is not None and value is not None:
+                    value = to_representation(value)
+                item[name] = value
+            data.append(item)
+
+        return data
+
 
 class RecipeDetailSerializer(RecipeSerializer):
     """Serializer for recipe detail object"""
 
-    ingredients = IngredientSerializer(many=True, read_only=True)
-    tags = TagSerializer(many=True, read_only=True)
+    expanded_fields = ("ingredients", "tags")
+
+
+class RecipeBulkSerializer(serializers.ModelSerializer):
+    """Serializer validating recipes written in bulk.
+
+    Tags and ingredients are plain ids here, `recipe.bulk` checks them for
+    every item at once instead of one query per id.
+    """
+
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+    )
+    tags = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+    )
+
+    class Meta(RecipeSerializer.Meta):
+        fields = (
+            "id",
+            "title",
+            "time_minutes",
+            "ingredients",
+            "tags",
+            "price",
+            "link",
+        )
 
 
 class RecipeImageSerializer(serializers.ModelSerializer):
     """Serializer for uploading images to recipes"""
 
+    image_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Recipe
-        fields = ("id", "image")
-        read_only_fields = ("id",)
+        fields = ("id", "image", "image_status", "image_variants")
+        read_only_fields = ("id", "image_status")
+
+    def get_image_variants(self, recipe) -> dict:
+        """Return the URL of each processed variant of the image"""
+        request = self.context.get("request")
+        storage = recipe.image.storage
+        urls = {}
+        for name, path in recipe.image_variants.items():
+            url = storage.url(path)
+            urls[name] = request.build_absolute_uri(url) if request else url
+
+        return urls
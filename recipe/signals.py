@@ -0,0 +1,165 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import Ingredient, Recipe, Tag
+from recipe import search
+from recipe.cache import bump_user_version
+from recipe.images import release_image
+
+# Recipe field linking recipes to each kind of attribute
+RECIPE_FIELDS = {Tag: "tags", Ingredient: "ingredients"}
+
+
+def touch_recipes(**filters):
+    """Mark recipes as updated without loading them or sending signals.
+
+    Their search vector is recomputed in the same query, which only keeps
+    it current once the change is visible, i.e. from `post_*` signals.
+    """
+    Recipe.objects.filter(**filters).update(
+        updated_at=timezone.now(),
+        **search.get_vector_update(),
+    )
+
+
+def remember_linked_recipes(instance, **filters):
+    """Remember the recipes to reindex once `instance` is unlinked"""
+    if search.is_enabled():
+        instance._linked_recipes = list(
+            Recipe.objects.filter(**filters).values_list("pk", flat=True)
+        )
+
+
+def reindex_linked_recipes(instance):
+    """Reindex the recipes remembered by `remember_linked_recipes`"""
+    pks = getattr(instance, "_linked_recipes", None)
+    if pks:
+        search.update_search_vectors(Recipe.objects.filter(pk__in=pks))
+        instance._linked_recipes = None
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_user_recipes(sender, instance, **kwargs):
+    """Invalidate cached recipe responses of the object's owner"""
+    bump_user_version(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_user_recipe_links(sender, instance, action, **kwargs):
+    """Invalidate cached recipe responses when recipe links change"""
+    if action.startswith("post_"):
+        bump_user_version(instance.user_id)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_new_user(sender, instance, created, **kwargs):
+    """Start new accounts with a fresh cache namespace.
+
+    Protects against entries left behind by a deleted user whose primary
+    key gets reused.
+    """
+    if created:
+        bump_user_version(instance.pk)
+
+
+@receiver(post_delete, sender=get_user_model())
+def invalidate_deleted_user(sender, instance, **kwargs):
+    bump_user_version(instance.pk)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def touch_attribute_recipes(sender, instance, created=False, **kwargs):
+    """Update the timestamp of recipes rendering a changed tag/ingredient"""
+    if not created:
+        touch_recipes(**{RECIPE_FIELDS[sender]: instance})
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def touch_linked_recipes(sender, instance, action, reverse, pk_set, **kwargs):
+    """Update the timestamp of recipes whose links changed"""
+    if not reverse:
+        if action.startswith("post_"):
+            touch_recipes(pk=instance.pk)
+    elif action in ("post_add", "post_remove"):
+        touch_recipes(pk__in=pk_set)
+    elif action == "pre_clear":
+        filters = {RECIPE_FIELDS[type(instance)]: instance}
+        touch_recipes(**filters)
+        remember_linked_recipes(instance, **filters)
+    elif action == "post_clear":
+        reindex_linked_recipes(instance)
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def remember_deleted_attribute_recipes(sender, instance, **kwargs):
+    remember_linked_recipes(instance, **{RECIPE_FIELDS[sender]: instance})
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def reindex_deleted_attribute_recipes(sender, instance, **kwargs):
+    """Drop the names of a deleted tag/ingredient from recipe vectors"""
+    reindex_linked_recipes(instance)
+
+
+@receiver(post_save, sender=Recipe)
+def reindex_recipe(sender, instance, update_fields=None, **kwargs):
+    """Refresh the search vector of a saved recipe"""
+    if update_fields is None or "title" in update_fields:
+        search.update_search_vectors(Recipe.objects.filter(pk=instance.pk))
+
+
+def get_loaded_image(recipe: Recipe):
+    """Return the stored image name of a recipe without loading it"""
+    value = recipe.__dict__.get("image")
+
+    return getattr(value, "name", value) or None
+
+
+@receiver(post_init, sender=Recipe)
+def remember_image(sender, instance, **kwargs):
+    """Remember the image a recipe was loaded with"""
+    value = instance.__dict__.get("image")
+    instance._stored_image = value if isinstance(value, str) else None
+
+
+@receiver(post_save, sender=Recipe)
+def release_replaced_image(sender, instance, **kwargs):
+    """Release the previous image of a recipe once it is replaced"""
+    if "image" not in instance.__dict__:
+        return
+
+    image = get_loaded_image(instance)
+    if instance._stored_image and instance._stored_image != image:
+        transaction.on_commit(partial(release_image, instance._stored_image))
+    instance._stored_image = image
+
+
+@receiver(post_delete, sender=Recipe)
+def release_deleted_image(sender, instance, **kwargs):
+    """Release the image of a deleted recipe"""
+    image = get_loaded_image(instance)
+    if image:
+        transaction.on_commit(partial(release_image, image))
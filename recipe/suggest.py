@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import BooleanField, ExpressionWrapper, Q
+
+from accounts.cache import LRUCache
+from core.models import normalize_name
+from recipe.cache import get_user_version
+
+# Tries of the fallback implementation, per model and user
+local_tries = LRUCache()
+
+
+class Trie:
+    """Prefix tree mapping keys to the list of values stored under them"""
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, key: str, value):
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+        # Values live under the `None` key, never a character
+        node.setdefault(None, []).append(value)
+
+    def iter_prefix(self, prefix: str):
+        """Yield the values of the keys starting with `prefix`, in order"""
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return
+
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            yield from node.get(None, ())
+            stack.extend(
+                node[char]
+                for char in sorted(
+                    (char for char in node if char is not None), reverse=True
+                )
+            )
+
+
+def build_tries(queryset) -> tuple:
+    """Index names by their start, and by the start of their later words"""
+    names = Trie()
+    words = Trie()
+    for pk, name, normalized_name in queryset.values_list(
+        "pk", "name", "normalized_name"
+    ):
+        item = {"id": pk, "name": name}
+        names.insert(normalized_name, item)
+        for index, char in enumerate(normalized_name, start=1):
+            if char == " ":
+                words.insert(normalized_name[index:], item)
+
+    return names, words
+
+
+def get_tries(queryset, user) -> tuple:
+    """Return the user's tries, rebuilt once their objects change"""
+    key = (queryset.model._meta.label, user.pk)
+    version = get_user_version(user.pk)
+    entry = local_tries.get(key)
+    if entry is None or entry[0] != version:
+        entry = (version, build_tries(queryset.filter(user=user)))
+        local_tries.set(
+            key,
+            entry,
+            ttl=settings.RECIPE_SUGGEST_CACHE_TTL,
+            max_size=settings.RECIPE_SUGGEST_CACHE_SIZE,
+        )
+
+    return entry[1]
+
+
+def suggest_from_tries(queryset, user, query: str, limit: int) -> list:
+    """Suggest names starting with `query`, then names with a word that does"""
+    suggestions = {}
+    for trie in get_tries(queryset, user):
+        for item in trie.iter_prefix(query):
+            suggestions.setdefault(item["id"], item)
+            if len(suggestions) == limit:
+                return list(suggestions.values())
+
+    return list(suggestions.values())
+
+
+def suggest_names(queryset, user, query: str, limit: int) -> list:
+    """Return up to `limit` of the user's objects named like `query`.
+
+    PostgreSQL ranks names starting with the query first and then the ones
+    with the best trigram word similarity, both matched with the trigram
+    GIN index of `normalized_name`, so misspelled names are suggested too.
+    Other databases fall back to prefix matching on an in-process trie.
+    """
+    query = normalize_name(query)
+    if not query:
+        return []
+
+    if connections[queryset.db].vendor != "postgresql":
+        return suggest_from_tries(queryset, user, query, limit)
+
+    prefix = Q(normalized_name__startswith=query)
+    return list(
+        queryset.filter(user=user)
+        .filter(prefix | Q(normalized_name__trigram_word_similar=query))
+        .annotate(
+            is_prefix=ExpressionWrapper(prefix, output_field=BooleanField()),
+            similarity=TrigramWordSimilarity(query, "normalized_name"),
+        )
+        .order_by("-is_prefix", "-similarity", "normalized_name", "pk")
+        .values("id", "name")[:limit]
+    )
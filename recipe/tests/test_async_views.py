@@ -0,0 +1,201 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import include, path, reverse
+
+from rest_framework import status
+from rest_framework.routers import DefaultRouter
+from rest_framework.test import APIClient
+
+from accounts.models import Token
+from core.models import Ingredient, Recipe, Tag
+
+from recipe import views
+
+RECIPES_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+INGREDIENTS_URL = reverse("recipe:ingredient-list")
+
+# The recipe API with async views, the URLconf of the async requests
+with override_settings(ASYNC_VIEWS=True):
+    router = DefaultRouter()
+    router.register("ingredients", views.IngredientViewSet)
+    router.register("tags", views.TagViewSet)
+    router.register("recipes", views.RecipeViewSet)
+    urlpatterns = [path("api/recipe/", include((router.urls, "recipe")))]
+
+
+def detail_url(recipe_id):
+    """Return recipe detail URL"""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+@override_settings(RECIPE_CACHE_TIMEOUT=0)
+class AsyncViewsTests(TestCase):
+    """Test the async list and retrieve views of the recipe API"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        token = Token.objects.create(user=self.user)
+        self.async_client = AsyncClient()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        # Headers of async requests are given by name, in Django 4.1
+        self.authorization = {"Authorization": f"Token {token.key}"}
+
+        self.tag = Tag.objects.create(user=self.user, name="Vegan")
+        Tag.objects.create(user=self.user, name="Dessert")
+        ingredient = Ingredient.objects.create(user=self.user, name="Kale")
+        self.recipes = [
+            Recipe.objects.create(
+                user=self.user,
+                title=f"Recipe {index}",
+                time_minutes=index + 1,
+                price=index + 1,
+            )
+            for index in range(3)
+        ]
+        self.recipes[0].tags.add(self.tag)
+        self.recipes[0].ingredients.add(ingredient)
+
+    def async_request(self, method, path, data=None, **extra):
+        """Return the response of the async view of `path`"""
+        request = getattr(self.async_client, method)
+        with override_settings(ROOT_URLCONF=__name__):
+            return async_to_sync(request)(path, data, **extra)
+
+    def async_get(self, path, data=None, **extra):
+        return self.async_request(
+            "get", path, data, **self.authorization, **extra
+        )
+
+    def assertSameResponse(self, path, data=None):
+        """Assert the async and sync views of `path` respond the same"""
+        response = self.async_get(path, data)
+        expected = self.client.get(path, data)
+
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.json(), expected.json())
+
+        return response
+
+    def test_views_are_coroutines(self):
+        """Test the views of URLs with list or retrieve actions are async"""
+        callbacks = {url.name: url.callback for url in router.urls}
+        for name in (
+            "recipe-list",
+            "recipe-detail",
+            "tag-list",
+            "ingredient-list",
+        ):
+            with self.subTest(name):
+                self.assertTrue(asyncio.iscoroutinefunction(callbacks[name]))
+        self.assertFalse(asyncio.iscoroutinefunction(callbacks["recipe-bulk"]))
+
+    def test_list_recipes(self):
+        """Test the async list of recipes renders like the sync one"""
+        for data in (
+            {},
+            {"expand": "tags,ingredients"},
+            {"fields": "id,title,tags"},
+            {"ordering": "-price", "tags": str(self.tag.pk)},
+        ):
+            with self.subTest(data):
+                response = self.assertSameResponse(RECIPES_URL, data)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(RECIPE_FAST_LIST=False)
+    def test_list_recipes_models(self):
+        """Test the async list of recipes from model instances"""
+        self.assertSameResponse(RECIPES_URL)
+
+    def test_list_recipes_pages(self):
+        """Test paging through recipes with the cursor of the async list"""
+        response = self.async_get(RECIPES_URL, {"page_size": 2})
+        self.assertEqual(len(response.json()["results"]), 2)
+
+        response = self.async_get(response.json()["next"])
+        titles = [recipe["title"] for recipe in response.json()["results"]]
+
+        self.assertEqual(titles, ["Recipe 2"])
+        self.assertIsNone(response.json()["next"])
+        self.assertSameResponse(response.json()["previous"])
+
+    def test_list_invalid_params(self):
+        """Test invalid query params are rejected by the async list"""
+        response = self.assertSameResponse(RECIPES_URL, {"tags": "invalid"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_recipe(self):
+        """Test the async retrieve of a recipe renders like the sync one"""
+        response = self.assertSameResponse(detail_url(self.recipes[0].pk))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["tags"][0]["name"], "Vegan")
+        self.assertIn("Last-Modified", response.headers)
+
+    def test_retrieve_not_found(self):
+        """Test other users' recipes and invalid ids are not found"""
+        other = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword",
+        )
+        recipe = Recipe.objects.create(
+            user=other, title="Other", time_minutes=5, price=5
+        )
+
+        for pk in (recipe.pk, "invalid"):
+            with self.subTest(pk):
+                response = self.assertSameResponse(detail_url(pk))
+                self.assertEqual(
+                    response.status_code, status.HTTP_404_NOT_FOUND
+                )
+
+    def test_authentication_required(self):
+        """Test the async views require authentication"""
+        response = self.async_request("get", RECIPES_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.headers["WWW-Authenticate"], "Token")
+
+    @override_settings(RECIPE_CACHE_TIMEOUT=60)
+    def test_cached_response(self):
+        """Test async responses are cached and conditional"""
+        response = self.async_get(RECIPES_URL)
+        Recipe.objects.filter(pk=self.recipes[0].pk).update(title="Stale")
+
+        cached = self.async_get(RECIPES_URL)
+        not_modified = self.async_get(
+            RECIPES_URL, **{"If-None-Match": response.headers["ETag"]}
+        )
+
+        self.assertEqual(cached.json(), response.json())
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_tags(self):
+        """Test the async list of tags renders like the sync one"""
+        for data in ({}, {"assigned_only": 1}, {"with_counts": 1}):
+            with self.subTest(data):
+                self.assertSameResponse(TAGS_URL, data)
+        self.assertSameResponse(INGREDIENTS_URL)
+
+    def test_writes_use_sync_views(self):
+        """Test the other actions of the async views' URLs are served"""
+        response = self.async_request(
+            "post",
+            INGREDIENTS_URL,
+            {"name": "Salt"},
+            content_type="application/json",
+            **self.authorization,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            Ingredient.objects.filter(user=self.user, name="Salt").exists()
+        )
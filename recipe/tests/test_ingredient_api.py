@@ -8,8 +8,9 @@ from rest_framework.test import APIClient
 from core.models import Ingredient, Recipe
 from recipe.serializers import IngredientSerializer
 
-
 INGREDIENT_URL = reverse("recipe:ingredient-list")
+INGREDIENT_BULK_URL = reverse("recipe:ingredient-bulk")
+INGREDIENT_SUGGEST_URL = reverse("recipe:ingredient-suggest")
 
 
 class PublicIngredientsApiTest(TestCase):
@@ -43,10 +44,10 @@ class PrivateIngredientsApiTest(TestCase):
 
         response = self.client.get(INGREDIENT_URL)
 
-        ingredients = Ingredient.objects.all()
+        ingredients = Ingredient.objects.filter(user=self.user).order_by("id")
         serializer = IngredientSerializer(ingredients, many=True)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_ingredients_limited_to_user(self):
         """Test that ingredients returned are for the logged in user"""
@@ -59,8 +60,11 @@ class PrivateIngredientsApiTest(TestCase):
 
         response = self.client.get(INGREDIENT_URL)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["name"], ingredient.name)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(
+            response.data["results"][0]["name"],
+            ingredient.name,
+        )
 
     def test_create_ingredient_successful(self):
         """Test creating a new ingredient"""
@@ -79,6 +83,47 @@ class PrivateIngredientsApiTest(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_create_duplicate_ingredient(self):
+        """Test creating an ingredient whose name is already used"""
+        Ingredient.objects.create(user=self.user, name="Salt")
+        response = self.client.post(INGREDIENT_URL, {"name": "SALT"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_upsert_ingredients(self):
+        """Test getting or creating ingredients from a list of names"""
+        salt = Ingredient.objects.create(user=self.user, name="Salt")
+        response = self.client.post(
+            INGREDIENT_BULK_URL, ["salt", "Pepper"], format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        pepper = Ingredient.objects.get(user=self.user, name="Pepper")
+        self.assertEqual(
+            response.data,
+            [
+                {"id": salt.id, "name": "Salt"},
+                {"id": pepper.id, "name": "Pepper"},
+            ],
+        )
+
+    def test_suggest_ingredients(self):
+        """Test ingredients are suggested by the start of their words"""
+        oil = Ingredient.objects.create(user=self.user, name="Olive oil")
+        olives = Ingredient.objects.create(user=self.user, name="Olives")
+        Ingredient.objects.create(user=self.user, name="Salt")
+
+        response = self.client.get(INGREDIENT_SUGGEST_URL, {"q": "ol"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [
+                {"id": oil.id, "name": "Olive oil"},
+                {"id": olives.id, "name": "Olives"},
+            ],
+        )
+
     def test_retrieve_ingredients_assigned_to_recipes(self):
         """Test filtering ingredients by those assigned to recipes"""
         ingredient1 = Ingredient.objects.create(
@@ -100,5 +145,41 @@ class PrivateIngredientsApiTest(TestCase):
         serializer1 = IngredientSerializer(ingredient1)
         serializer2 = IngredientSerializer(ingredient2)
 
-        self.assertIn(serializer1.data, response.data)
-        self.assertNotIn(serializer2.data, response.data)
+        self.assertIn(serializer1.data, response.data["results"])
+        self.assertNotIn(serializer2.data, response.data["results"])
+
+    def test_retrieve_ingredients_assigned_unique(self):
+        """Test filtering ingredients by assigned returns unique items"""
+        ingredient = Ingredient.objects.create(name="Eggs", user=self.user)
+        Ingredient.objects.create(name="Cheese", user=self.user)
+        for title in ("Eggs benedict", "Omelette"):
+            recipe = Recipe.objects.create(
+                title=title,
+                time_minutes=30,
+                price=12.00,
+                user=self.user,
+            )
+            recipe.ingredients.add(ingredient)
+
+        response = self.client.get(INGREDIENT_URL, {"assigned_only": 1})
+
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_retrieve_ingredients_with_counts(self):
+        """Test ingredients can be annotated with their recipe count"""
+        ingredient = Ingredient.objects.create(name="Eggs", user=self.user)
+        for title in ("Eggs benedict", "Omelette"):
+            recipe = Recipe.objects.create(
+                title=title,
+                time_minutes=30,
+                price=12.00,
+                user=self.user,
+            )
+            recipe.ingredients.add(ingredient)
+
+        response = self.client.get(INGREDIENT_URL, {"with_counts": 1})
+
+        self.assertEqual(
+            response.data["results"],
+            [{"id": ingredient.id, "name": ingredient.name, "recipe_count": 2}],
+        )
@@ -0,0 +1,245 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Recipe, Tag
+from recipe import cache
+from recipe.tests.test_recipes_api import create_sample_recipe
+
+RECIPES_URL = reverse("recipe:recipe-list")
+CACHE_STATS_URL = reverse("recipe:cache-stats")
+
+
+def detail_url(recipe_id):
+    """Return recipe detail URL"""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+class RecipeCacheTests(TestCase):
+    """Test recipe responses are cached per user and invalidated"""
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = create_sample_recipe(user=self.user)
+
+    def test_list_is_cached(self):
+        """Test a repeated list request does not hit the database"""
+        response = self.client.get(RECIPES_URL)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(RECIPES_URL)
+
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached.data, response.data)
+        self.assertEqual(cache.get_stats(), {"hits": 1, "misses": 1})
+
+    def test_query_params_are_normalized(self):
+        """Test query params order does not change the cache entry"""
+        self.client.get(RECIPES_URL, {"page_size": 5, "tags_match": "all"})
+
+        with self.assertNumQueries(0):
+            self.client.get(f"{RECIPES_URL}?tags_match=all&page_size=5")
+
+    def test_write_invalidates_list(self):
+        """Test creating a recipe invalidates the cached list"""
+        self.client.get(RECIPES_URL)
+
+        self.client.post(
+            RECIPES_URL,
+            {"title": "New recipe", "time_minutes": 10, "price": 2.00},
+        )
+        response = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_tag_change_invalidates_detail(self):
+        """Test renaming or linking a tag invalidates the recipe detail"""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        self.client.get(detail_url(self.recipe.id))
+
+        self.recipe.tags.add(tag)
+        response = self.client.get(detail_url(self.recipe.id))
+        self.assertEqual(response.data["tags"][0]["name"], "Vegan")
+
+        tag.name = "Vegetarian"
+        tag.save()
+        response = self.client.get(detail_url(self.recipe.id))
+        self.assertEqual(response.data["tags"][0]["name"], "Vegetarian")
+
+    def test_delete_invalidates_detail(self):
+        """Test a deleted recipe is not served from the cache"""
+        self.client.get(detail_url(self.recipe.id))
+
+        self.recipe.delete()
+        response = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cache_is_per_user(self):
+        """Test other users neither read nor invalidate the user's cache"""
+        other = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword",
+        )
+        self.client.get(RECIPES_URL)
+        create_sample_recipe(user=other)
+
+        with self.assertNumQueries(0):
+            self.client.get(RECIPES_URL)
+
+        self.client.force_authenticate(other)
+        response = self.client.get(RECIPES_URL)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertNotEqual(response.data["results"][0]["id"], self.recipe.id)
+
+    @override_settings(RECIPE_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self):
+        """Test the cache can be disabled with a zero timeout"""
+        self.client.get(RECIPES_URL)
+
+        with self.assertNumQueries(3):
+            self.client.get(RECIPES_URL)
+
+
+class CacheStatsApiTests(TestCase):
+    """Test the cache stats endpoint"""
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.client = APIClient()
+
+    def test_stats_require_staff(self):
+        """Test the stats are not available to regular users"""
+        user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user)
+
+        response = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_retrieve_stats(self):
+        """Test staff users can retrieve the counters"""
+        admin = get_user_model().objects.create_superuser(
+            email="admin@example.com",
+            password="admin123",
+        )
+        self.client.force_authenticate(admin)
+        self.client.get(RECIPES_URL)
+        self.client.get(RECIPES_URL)
+
+        response = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"hits": 1, "misses": 1})
+
+
+class ConditionalRequestTests(TestCase):
+    """Test conditional GET support on recipe resources"""
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = create_sample_recipe(user=self.user)
+
+    def test_list_if_none_match(self):
+        """Test a matching ETag returns 304 without querying the database"""
+        response = self.client.get(RECIPES_URL)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    @override_settings(RECIPE_CACHE_TIMEOUT=0)
+    def test_etag_without_response_cache(self):
+        """Test conditional requests work with the response cache disabled"""
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        response = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_after_write(self):
+        """Test the ETag no longer matches once the user's data changes"""
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        create_sample_recipe(user=self.user, title="Another recipe")
+        response = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_etag_differs_per_query(self):
+        """Test different pages or filters get different ETags"""
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        response = self.client.get(RECIPES_URL, {"page_size": 1})
+
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_detail_if_modified_since(self):
+        """Test detail responses honour If-Modified-Since"""
+        response = self.client.get(detail_url(self.recipe.id))
+        last_modified = response["Last-Modified"]
+
+        response = self.client.get(
+            detail_url(self.recipe.id),
+            HTTP_IF_MODIFIED_SINCE=last_modified,
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(
+            detail_url(self.recipe.id),
+            HTTP_IF_MODIFIED_SINCE="Mon, 01 Jan 2001 00:00:00 GMT",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Last-Modified"], last_modified)
+
+    def test_cached_detail_keeps_last_modified(self):
+        """Test detail responses served from the cache keep Last-Modified"""
+        response = self.client.get(detail_url(self.recipe.id))
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(cached["Last-Modified"], response["Last-Modified"])
+
+    def test_related_changes_update_recipe(self):
+        """Test changes rendered in a recipe update its timestamp"""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+        changes = (
+            lambda: self.recipe.tags.add(tag),
+            lambda: tag.recipe_set.clear(),
+            lambda: ingredient.recipe_set.add(self.recipe),
+            lambda: ingredient.save(),
+            lambda: ingredient.delete(),
+        )
+        for change in changes:
+            Recipe.objects.filter(pk=self.recipe.pk).update(
+                updated_at="2001-01-01T00:00:00Z"
+            )
+            change()
+            self.recipe.refresh_from_db()
+            self.assertGreater(self.recipe.updated_at.year, 2001)
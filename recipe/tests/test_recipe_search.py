@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Tag
+from recipe.tests.test_recipes_api import create_sample_recipe
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+class RecipeSearchTests(TestCase):
+    """Test searching recipes with `?search=`"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.curry = create_sample_recipe(self.user, title="Thai green curry")
+        self.soup = create_sample_recipe(self.user, title="Tomato soup")
+        self.soup.tags.add(Tag.objects.create(user=self.user, name="Curry"))
+        self.salad = create_sample_recipe(self.user, title="Greek salad")
+        self.salad.ingredients.add(
+            Ingredient.objects.create(user=self.user, name="Tomato")
+        )
+
+    def search(self, query, **params):
+        response = self.client.get(RECIPES_URL, {"search": query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return [recipe["id"] for recipe in response.data["results"]]
+
+    def test_search_title_and_related_names(self):
+        """Test titles, tag and ingredient names are searched"""
+        self.assertEqual(self.search("tomato"), [self.soup.id, self.salad.id])
+        self.assertEqual(self.search("CURRY"), [self.curry.id, self.soup.id])
+
+    def test_search_matches_every_word(self):
+        """Test every word of the query has to match"""
+        self.assertEqual(self.search("tomato curry"), [self.soup.id])
+        self.assertEqual(self.search("tomato pasta"), [])
+
+    def test_search_excluded_words(self):
+        """Test words prefixed with a dash exclude recipes"""
+        self.assertEqual(self.search("tomato -curry"), [self.salad.id])
+
+    def test_search_ranks_title_matches_first(self):
+        """Test recipes matching in their title come before the others"""
+        dish = create_sample_recipe(self.user, title="Curry of tomato")
+
+        self.assertEqual(
+            self.search("curry tomato"),
+            [dish.id, self.soup.id],
+        )
+
+    def test_search_paginated(self):
+        """Test search results can be paged through in rank order"""
+        ids = []
+        response = self.client.get(
+            RECIPES_URL, {"search": "curry", "page_size": 1}
+        )
+        while True:
+            ids.extend(recipe["id"] for recipe in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(ids, [self.curry.id, self.soup.id])
+
+    def test_search_paginated_equal_ranks(self):
+        """Test paging through many equally ranked results returns each once"""
+        dishes = [
+            create_sample_recipe(self.user, title=f"Red curry {index}")
+            for index in range(7)
+        ]
+
+        ids = []
+        response = self.client.get(
+            RECIPES_URL, {"search": "red curry", "page_size": 2}
+        )
+        while True:
+            ids.extend(recipe["id"] for recipe in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(ids, [dish.id for dish in dishes])
+
+    def test_blank_search_returns_all(self):
+        """Test a blank query does not filter recipes"""
+        self.assertEqual(
+            self.search(' " '),
+            [self.curry.id, self.soup.id, self.salad.id],
+        )
+
+    def test_search_limited_to_user(self):
+        """Test recipes of other users are not searched"""
+        other = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword",
+        )
+        create_sample_recipe(other, title="Tomato pie")
+
+        self.assertEqual(self.search("tomato"), [self.soup.id, self.salad.id])
+
+    def test_search_combined_with_filters(self):
+        """Test search composes with the tag filter"""
+        tag = self.soup.tags.get()
+
+        self.assertEqual(self.search("curry", tags=str(tag.id)), [self.soup.id])
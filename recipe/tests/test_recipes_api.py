@@ -1,8 +1,15 @@
+import hashlib
 import os
+import shutil
 import tempfile
+from io import StringIO
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from PIL import Image
@@ -12,6 +19,8 @@ from rest_framework.test import APIClient
 
 from core.models import Ingredient, Recipe, Tag
 
+from core.storage import ContentAddressedStorage
+from recipe.images import get_variant_dir, process_recipe_image, release_image
 from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
 
 RECIPES_URL = reverse("recipe:recipe-list")
@@ -84,7 +93,7 @@ class PrivateRecipesApiTest(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_retrieve_recipe_limite_to_user(self):
         """Test that recipes can be retrieved by the logged in user"""
@@ -100,8 +109,8 @@ class PrivateRecipesApiTest(TestCase):
 
         response = self.client.get(RECIPES_URL)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_retrieve_recipe_detail(self):
         """Test retrieve recipe details"""
@@ -211,6 +220,595 @@ class PrivateRecipesApiTest(TestCase):
         tags = recipe.tags.all()
         self.assertEqual(len(tags), 0)
 
+    def test_create_recipe_with_related_names(self):
+        """Test tags and ingredients can be given by name"""
+        tag = create_sample_tag(user=self.user, name="Vegan")
+        other = create_sample_tag(user=self.user, name="Dinner")
+        payload = {
+            "title": "Avocado toast",
+            "time_minutes": 5,
+            "price": "4.00",
+            "tags": [other.id],
+            "tag_names": ["vegan", "Breakfast"],
+            "ingredient_names": ["Avocado", "Bread", "avocado"],
+        }
+        response = self.client.post(RECIPES_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("tag_names", response.data)
+        recipe = Recipe.objects.get(id=response.data["id"])
+        breakfast = Tag.objects.get(user=self.user, name="Breakfast")
+        self.assertEqual(
+            sorted(response.data["tags"]), [tag.id, other.id, breakfast.id]
+        )
+        self.assertEqual(set(recipe.tags.all()), {tag, other, breakfast})
+        self.assertEqual(
+            sorted(recipe.ingredients.values_list("name", flat=True)),
+            ["Avocado", "Bread"],
+        )
+
+    def test_update_recipe_with_related_names(self):
+        """Test names replace the related objects on update"""
+        recipe = create_sample_recipe(user=self.user)
+        recipe.tags.add(create_sample_tag(user=self.user))
+
+        response = self.client.patch(
+            detail_url(recipe.id), {"tag_names": ["Curry"]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(recipe.tags.values_list("name", flat=True)), ["Curry"]
+        )
+
+    def test_create_recipe_related_names_scoped_to_user(self):
+        """Test names resolve to the user's objects only"""
+        new_user = get_user_model().objects.create_user(
+            email="another_user@example.com",
+            password="testpassword",
+        )
+        foreign = create_sample_tag(user=new_user, name="Vegan")
+        payload = {
+            "title": "Salad",
+            "time_minutes": 5,
+            "price": "4.00",
+            "tag_names": ["Vegan"],
+        }
+        response = self.client.post(RECIPES_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        tag = Tag.objects.get(user=self.user, name="Vegan")
+        self.assertEqual(response.data["tags"], [tag.id])
+        self.assertNotEqual(tag, foreign)
+
+    def test_create_recipe_with_foreign_tag(self):
+        """Test tags of other users cannot be assigned"""
+        new_user = get_user_model().objects.create_user(
+            email="another_user@example.com",
+            password="testpassword",
+        )
+        foreign = create_sample_tag(user=new_user)
+        payload = {
+            "title": "Salad",
+            "time_minutes": 5,
+            "price": "4.00",
+            "tags": [foreign.id],
+        }
+        response = self.client.post(RECIPES_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tags", response.data)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_create_recipe_with_invalid_tag_id(self):
+        """Test tag ids have to be integers"""
+        payload = {
+            "title": "Salad",
+            "time_minutes": 5,
+            "price": "4.00",
+            "tags": ["abc"],
+        }
+        response = self.client.post(RECIPES_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tags", response.data)
+
+
+class RecipeQueryCountTests(TestCase):
+    """Test the number of queries issued by the recipe API is bounded"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_recipes(self, count):
+        """Create recipes with a couple of tags and ingredients each"""
+        recipes = []
+        start = Recipe.objects.filter(user=self.user).count()
+        for index in range(start, start + count):
+            recipe = create_sample_recipe(user=self.user, title=f"R{index}")
+            recipe.tags.add(
+                create_sample_tag(user=self.user, name=f"Tag{index}"),
+                create_sample_tag(user=self.user, name=f"Tag{index}b"),
+            )
+            recipe.ingredients.add(
+                create_sample_ingredient(user=self.user, name=f"Ing{index}"),
+            )
+            recipes.append(recipe)
+
+        return recipes
+
+    def create_recipe_queries(self, count):
+        """Return the queries creating a recipe with `count` related ids"""
+        tags = [
+            create_sample_tag(user=self.user, name=f"Tag{count}-{index}")
+            for index in range(count)
+        ]
+        ingredients = [
+            create_sample_ingredient(user=self.user, name=f"Ing{count}-{index}")
+            for index in range(count)
+        ]
+        payload = {
+            "title": "Soup",
+            "time_minutes": 30,
+            "price": "4.00",
+            "tags": [tag.id for tag in tags],
+            "ingredients": [ingredient.id for ingredient in ingredients],
+        }
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(RECIPES_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        return len(context)
+
+    def test_create_query_count_is_constant(self):
+        """Test related ids are validated with one query per field"""
+        self.assertEqual(
+            self.create_recipe_queries(1), self.create_recipe_queries(10)
+        )
+
+    def test_list_query_count_is_constant(self):
+        """Test listing recipes does not issue queries per recipe"""
+        self.create_recipes(1)
+        with self.assertNumQueries(3):
+            response = self.client.get(RECIPES_URL)
+        self.assertEqual(len(response.data["results"]), 1)
+
+        self.create_recipes(10)
+        with self.assertNumQueries(3):
+            response = self.client.get(RECIPES_URL)
+        self.assertEqual(len(response.data["results"]), 11)
+
+    def test_detail_query_count_is_constant(self):
+        """Test retrieving a recipe loads its relations in bulk"""
+        recipe = self.create_recipes(1)[0]
+        recipe.tags.add(
+            *[
+                create_sample_tag(user=self.user, name=f"Extra{index}")
+                for index in range(10)
+            ]
+        )
+
+        with self.assertNumQueries(3):
+            response = self.client.get(detail_url(recipe.id))
+        self.assertEqual(len(response.data["tags"]), 12)
+
+    def test_list_matches_serializer_output(self):
+        """Test the eager loaded list renders the same as a plain query"""
+        self.create_recipes(3)
+
+        response = self.client.get(RECIPES_URL)
+
+        recipes = Recipe.objects.filter(user=self.user)
+        serializer = RecipeSerializer(recipes, many=True)
+        self.assertEqual(response.data["results"], serializer.data)
+
+
+class RecipeSparseFieldsTests(TestCase):
+    """Test narrowing and expanding the recipe fields rendered"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.tag = create_sample_tag(user=self.user)
+        self.ingredient = create_sample_ingredient(user=self.user)
+        self.recipes = []
+        for index in range(3):
+            recipe = create_sample_recipe(
+                user=self.user, title=f"Recipe {index}", price=3 - index
+            )
+            recipe.tags.add(self.tag)
+            recipe.ingredients.add(self.ingredient)
+            self.recipes.append(recipe)
+
+    def test_list_fields(self):
+        """Test only the requested fields are rendered and loaded"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(RECIPES_URL, {"fields": "id,title"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"][0],
+            {"id": self.recipes[0].id, "title": "Recipe 0"},
+        )
+        self.assertEqual(len(context), 1)
+        self.assertNotIn('"price"', context[0]["sql"])
+
+    def test_list_fields_with_ordering(self):
+        """Test ordering on a field not rendered does not add queries"""
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                RECIPES_URL,
+                {"fields": "title", "ordering": "price", "page_size": 2},
+            )
+
+        self.assertEqual(
+            response.data["results"],
+            [{"title": "Recipe 2"}, {"title": "Recipe 1"}],
+        )
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.data["results"], [{"title": "Recipe 0"}])
+
+    def test_list_expand(self):
+        """Test related objects can be nested in the list"""
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                RECIPES_URL, {"fields": "id,tags,ingredients", "expand": "tags"}
+            )
+
+        self.assertEqual(
+            response.data["results"][0],
+            {
+                "id": self.recipes[0].id,
+                "tags": [{"id": self.tag.id, "name": self.tag.name}],
+                "ingredients": [self.ingredient.id],
+            },
+        )
+
+    def test_detail_fields(self):
+        """Test the detail keeps nesting the related fields requested"""
+        response = self.client.get(
+            detail_url(self.recipes[0].id), {"fields": "tags"}
+        )
+
+        self.assertEqual(
+            response.data,
+            {"tags": [{"id": self.tag.id, "name": self.tag.name}]},
+        )
+
+    def test_invalid_fields(self):
+        """Test unknown or write only fields are rejected"""
+        for params in (
+            {"fields": "id,name"},
+            {"fields": "tag_names"},
+            {"expand": "title"},
+        ):
+            response = self.client.get(RECIPES_URL, params)
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST,
+            )
+            self.assertIn(next(iter(params)), response.data)
+
+
+@override_settings(RECIPE_CACHE_TIMEOUT=0)
+class RecipeValuesSerializerTests(TestCase):
+    """Test lists rendered from values rows match the model serializer"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.tags = tags = [
+            create_sample_tag(user=self.user, name=f"Tag {index}")
+            for index in range(3)
+        ]
+        ingredient = create_sample_ingredient(user=self.user, name="Rice")
+        for index, price in enumerate(("5", "5.5", "12.34", "0.99")):
+            recipe = create_sample_recipe(
+                user=self.user,
+                title=f"Risotto {index} \u00e0 la cr\u00e8me",
+                time_minutes=10 * index,
+                price=price,
+                link="https://example.com/" if index % 2 else "",
+            )
+            # Linked out of id order
+            first = index % 3
+            recipe.tags.add(*reversed(tags[first:]))
+            if index:
+                recipe.ingredients.add(ingredient)
+
+    def assert_same_response(self, params, url=RECIPES_URL):
+        """Assert both serializers produce the same response body"""
+        with override_settings(RECIPE_FAST_LIST=False):
+            expected = self.client.get(url, params)
+        with override_settings(RECIPE_FAST_LIST=True):
+            response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, expected.content)
+        return response
+
+    def test_values_serializer_parity(self):
+        """Test the values serializer renders byte identical JSON"""
+        for params in (
+            {},
+            {"page_size": 2},
+            {"fields": "id,title,tags"},
+            {"fields": "price,ingredients,link"},
+            {"ordering": "-price"},
+            {"search": "risotto", "page_size": 3},
+            {"max_time": 20, "tags": f"{self.tags[0].id},{self.tags[2].id}"},
+        ):
+            with self.subTest(params=params):
+                self.assert_same_response(params)
+
+    def test_values_serializer_pages(self):
+        """Test cursors built from values rows walk every page"""
+        response = self.assert_same_response(
+            {"ordering": "price", "page_size": 3}
+        )
+        response = self.assert_same_response({}, url=response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_values_serializer_query_count(self):
+        """Test the list takes one query per relation at most"""
+        with override_settings(RECIPE_FAST_LIST=True):
+            with self.assertNumQueries(3):
+                self.client.get(RECIPES_URL)
+            with self.assertNumQueries(1):
+                self.client.get(RECIPES_URL, {"fields": "id,title"})
+
+
+class RecipeFilterTests(TestCase):
+    """Test filtering recipes by tags and ingredients"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.vegan = create_sample_tag(user=self.user, name="Vegan")
+        self.quick = create_sample_tag(user=self.user, name="Quick")
+        self.both = create_sample_recipe(user=self.user, title="Both")
+        self.both.tags.add(self.vegan, self.quick)
+        self.vegan_only = create_sample_recipe(user=self.user, title="Vegan")
+        self.vegan_only.tags.add(self.vegan)
+        self.untagged = create_sample_recipe(user=self.user, title="None")
+
+    def get_ids(self, params):
+        """Return the recipe ids listed for the given query params"""
+        response = self.client.get(RECIPES_URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return [item["id"] for item in response.data["results"]]
+
+    def test_filter_any_does_not_duplicate(self):
+        """Test recipes matching several tags are returned once"""
+        ids = self.get_ids({"tags": f"{self.vegan.id},{self.quick.id}"})
+
+        self.assertEqual(ids, [self.both.id, self.vegan_only.id])
+
+    def test_filter_all_tags(self):
+        """Test filtering recipes that have every requested tag"""
+        ids = self.get_ids(
+            {
+                "tags": f"{self.vegan.id},{self.quick.id},{self.vegan.id}",
+                "tags_match": "all",
+            }
+        )
+
+        self.assertEqual(ids, [self.both.id])
+
+    def test_filter_all_ingredients(self):
+        """Test filtering recipes that have every requested ingredient"""
+        salt = create_sample_ingredient(user=self.user, name="Salt")
+        oil = create_sample_ingredient(user=self.user, name="Oil")
+        self.both.ingredients.add(salt, oil)
+        self.vegan_only.ingredients.add(salt)
+
+        ids = self.get_ids(
+            {"ingredients": f"{salt.id},{oil.id}", "ingredients_match": "all"}
+        )
+
+        self.assertEqual(ids, [self.both.id])
+
+    def test_filter_tags_and_ingredients(self):
+        """Test tag and ingredient filters are combined"""
+        salt = create_sample_ingredient(user=self.user, name="Salt")
+        self.vegan_only.ingredients.add(salt)
+
+        ids = self.get_ids(
+            {"tags": f"{self.vegan.id}", "ingredients": f"{salt.id}"}
+        )
+
+        self.assertEqual(ids, [self.vegan_only.id])
+
+    def test_filter_query_count_is_constant(self):
+        """Test filtering by many tags does not add queries"""
+        tags = [
+            create_sample_tag(user=self.user, name=f"Tag{index}")
+            for index in range(20)
+        ]
+        self.both.tags.add(*tags)
+        tag_ids = ",".join(str(tag.id) for tag in tags)
+
+        with self.assertNumQueries(3):
+            ids = self.get_ids({"tags": tag_ids, "tags_match": "all"})
+        self.assertEqual(ids, [self.both.id])
+
+    def test_filter_time_and_price_ranges(self):
+        """Test recipes can be filtered by cooking time and price range"""
+        Recipe.objects.filter(pk=self.both.pk).update(
+            time_minutes=10, price="4.50"
+        )
+        Recipe.objects.filter(pk=self.vegan_only.pk).update(
+            time_minutes=45, price="3.00"
+        )
+        Recipe.objects.filter(pk=self.untagged.pk).update(
+            time_minutes=15, price="12.00"
+        )
+
+        self.assertEqual(
+            self.get_ids({"max_time": 15}), [self.both.id, self.untagged.id]
+        )
+        self.assertEqual(
+            self.get_ids({"price_min": "3.5", "price_max": "12"}),
+            [self.both.id, self.untagged.id],
+        )
+        self.assertEqual(
+            self.get_ids(
+                {"max_time": 30, "price_max": "5", "tags": str(self.quick.id)}
+            ),
+            [self.both.id],
+        )
+
+    def test_filter_ranges_invalid(self):
+        """Test range filters reject values that are not valid numbers"""
+        for params in (
+            {"max_time": "soon"},
+            {"max_time": "99999999999999999999"},
+            {"max_time": "-99999999999999999999"},
+            {"price_max": "NaN"},
+        ):
+            with self.subTest(params):
+                response = self.client.get(RECIPES_URL, params)
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+                self.assertEqual(
+                    response.data, {next(iter(params)): "Expected a number."}
+                )
+
+        self.assertEqual(self.get_ids({"price_max": "1e30"}), self.get_ids({}))
+
+    def test_filter_ids_out_of_range(self):
+        """Test related ids out of the IntegerField range are rejected"""
+        for param in ("tags", "ingredients"):
+            for value in ("99999999999999999999", f"1,-{2**63}"):
+                with self.subTest(param=param, value=value):
+                    response = self.client.get(RECIPES_URL, {param: value})
+
+                    self.assertEqual(
+                        response.status_code, status.HTTP_400_BAD_REQUEST
+                    )
+                    self.assertEqual(
+                        response.data,
+                        {param: "Expected a comma separated list of integers."},
+                    )
+
+    def test_ordering(self):
+        """Test recipes can be ordered by time and price, across pages"""
+        Recipe.objects.filter(pk=self.both.pk).update(
+            time_minutes=30, price="4.50"
+        )
+        Recipe.objects.filter(pk=self.vegan_only.pk).update(
+            time_minutes=10, price="4.50"
+        )
+        Recipe.objects.filter(pk=self.untagged.pk).update(
+            time_minutes=20, price="1.00"
+        )
+
+        for ordering, expected in (
+            ("time_minutes", [self.vegan_only, self.untagged, self.both]),
+            ("-time_minutes", [self.both, self.untagged, self.vegan_only]),
+            ("price", [self.untagged, self.both, self.vegan_only]),
+            ("-price", [self.vegan_only, self.both, self.untagged]),
+            ("-id", [self.untagged, self.vegan_only, self.both]),
+        ):
+            ids = []
+            response = self.client.get(
+                RECIPES_URL, {"ordering": ordering, "page_size": 1}
+            )
+            while True:
+                ids.extend(item["id"] for item in response.data["results"])
+                if not response.data["next"]:
+                    break
+                response = self.client.get(response.data["next"])
+
+            self.assertEqual(ids, [recipe.id for recipe in expected])
+
+    def test_invalid_filter_params(self):
+        """Test invalid filter values are rejected"""
+        for params in (
+            {"tags": "1,abc"},
+            {"tags": f"{self.vegan.id}", "tags_match": "some"},
+            {"max_time": "soon"},
+            {"price_min": "NaN"},
+            {"price_max": "1e"},
+            {"ordering": "title"},
+            {"ordering": "--price"},
+        ):
+            response = self.client.get(RECIPES_URL, params)
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+
+class RecipePaginationTests(TestCase):
+    """Test the recipe list is paginated with a cursor"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_walk_pages_with_cursor(self):
+        """Test following the next links returns every recipe once"""
+        recipes = [
+            create_sample_recipe(user=self.user, title=f"Recipe {index}")
+            for index in range(7)
+        ]
+
+        response = self.client.get(RECIPES_URL, {"page_size": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["previous"])
+
+        seen = []
+        while True:
+            self.assertLessEqual(len(response.data["results"]), 3)
+            seen.extend(item["id"] for item in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(seen, [recipe.id for recipe in recipes])
+
+    @override_settings(API_MAX_PAGE_SIZE=2)
+    def test_page_size_is_capped(self):
+        """Test the requested page size cannot exceed the maximum"""
+        for index in range(4):
+            create_sample_recipe(user=self.user, title=f"Recipe {index}")
+
+        response = self.client.get(RECIPES_URL, {"page_size": 1000})
+
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor is rejected"""
+        response = self.client.get(RECIPES_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class RecipeImageUploadTests(TestCase):
     """Test uploading image to recipe"""
@@ -225,8 +823,24 @@ class RecipeImageUploadTests(TestCase):
         self.recipe = create_sample_recipe(user=self.user)
 
     def tearDown(self):
+        self.recipe.refresh_from_db()
+        for path in self.recipe.image_variants.values():
+            self.recipe.image.storage.delete(path)
         self.recipe.image.delete()
 
+    def upload_image(self, size=(10, 10), mode="RGB", image_format="JPEG"):
+        """Upload a generated image to the recipe and return the response"""
+        url = image_upload_url(self.recipe.id)
+        suffix = f".{image_format.lower()}"
+        with tempfile.NamedTemporaryFile(suffix=suffix) as temp_file:
+            img = Image.new(mode, size)
+            img.save(temp_file, format=image_format)
+            temp_file.seek(0)
+
+            return self.client.post(
+                url, {"image": temp_file}, format="multipart"
+            )
+
     def test_upload_image_to_recipe(self):
         """Test uploading an image to recipe"""
         url = image_upload_url(self.recipe.id)
@@ -243,6 +857,115 @@ class RecipeImageUploadTests(TestCase):
         self.assertIn("image", response.data)
         self.assertTrue(os.path.exists(self.recipe.image.path))
 
+    @override_settings(RECIPE_IMAGE_WORKERS=0)
+    def test_upload_image_is_processed(self):
+        """Test uploaded images are resized once the upload is committed"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.upload_image(size=(2000, 1000))
+
+        self.assertEqual(response.data["image_status"], "pending")
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, "pending")
+
+        for callback in callbacks:
+            callback()
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, "ready")
+        self.assertEqual(
+            sorted(self.recipe.image_variants),
+            ["medium.jpeg", "medium.webp", "thumbnail.jpeg", "thumbnail.webp"],
+        )
+        storage = self.recipe.image.storage
+        with Image.open(
+            storage.path(self.recipe.image_variants["thumbnail.webp"])
+        ) as img:
+            self.assertEqual(img.format, "WEBP")
+            self.assertEqual(img.size, (320, 160))
+        with Image.open(
+            storage.path(self.recipe.image_variants["medium.jpeg"])
+        ) as img:
+            self.assertEqual(img.format, "JPEG")
+            self.assertEqual(img.size, (1280, 640))
+
+        response = self.client.get(image_upload_url(self.recipe.id))
+        self.assertEqual(response.data["image_status"], "ready")
+        self.assertTrue(
+            response.data["image_variants"]["thumbnail.webp"].endswith(
+                self.recipe.image_variants["thumbnail.webp"]
+            )
+        )
+
+    def test_process_transparent_image(self):
+        """Test images with transparency keep it in WebP variants"""
+        self.upload_image(mode="RGBA", image_format="PNG")
+
+        process_recipe_image(self.recipe.id)
+
+        self.recipe.refresh_from_db()
+        storage = self.recipe.image.storage
+        with Image.open(
+            storage.path(self.recipe.image_variants["thumbnail.webp"])
+        ) as img:
+            self.assertEqual(img.mode, "RGBA")
+
+    def test_process_corrupted_image(self):
+        """Test images failing to decode are marked as failed"""
+        self.upload_image()
+        self.recipe.refresh_from_db()
+        with open(self.recipe.image.path, "wb") as image_file:
+            image_file.write(b"corrupted")
+
+        with self.assertRaises(Exception):
+            process_recipe_image(self.recipe.id)
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, "failed")
+        self.assertEqual(self.recipe.image_variants, {})
+
+    def test_process_pending_images_command(self):
+        """Test the command processes images left pending"""
+        self.upload_image()
+
+        call_command("process_recipe_images", stdout=StringIO())
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, "ready")
+
+    @override_settings(RECIPE_IMAGE_MAX_BYTES=100)
+    def test_upload_image_too_many_bytes(self):
+        """Test images above the byte limit are rejected"""
+        response = self.upload_image(size=(200, 200), image_format="PNG")
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+        self.recipe.refresh_from_db()
+        self.assertFalse(self.recipe.image)
+
+    @override_settings(RECIPE_IMAGE_MAX_PIXELS=100)
+    def test_upload_image_too_many_pixels(self):
+        """Test images above the pixel limit are rejected"""
+        response = self.upload_image(size=(20, 20))
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    def test_upload_image_not_an_image(self):
+        """Test files that are not images are rejected"""
+        url = image_upload_url(self.recipe.id)
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as temp_file:
+            temp_file.write(b"not an image")
+            temp_file.seek(0)
+            response = self.client.post(
+                url, {"image": temp_file}, format="multipart"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_upload_image_bad_request(self):
         """Test uploading an invalid image"""
         url = image_upload_url(self.recipe.id)
@@ -270,9 +993,9 @@ class RecipeImageUploadTests(TestCase):
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
 
-        self.assertIn(serializer1.data, response.data)
-        self.assertIn(serializer2.data, response.data)
-        self.assertNotIn(serializer3.data, response.data)
+        self.assertIn(serializer1.data, response.data["results"])
+        self.assertIn(serializer2.data, response.data["results"])
+        self.assertNotIn(serializer3.data, response.data["results"])
 
     def test_filter_recipes_by_ingredients(self):
         """Test returning recipes with specific ingredients"""
@@ -297,6 +1020,162 @@ class RecipeImageUploadTests(TestCase):
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
 
-        self.assertIn(serializer1.data, response.data)
-        self.assertIn(serializer2.data, response.data)
-        self.assertNotIn(serializer3.data, response.data)
+        self.assertIn(serializer1.data, response.data["results"])
+        self.assertIn(serializer2.data, response.data["results"])
+        self.assertNotIn(serializer3.data, response.data["results"])
+
+
+class RecipeImageStorageTests(TestCase):
+    """Test recipe images are stored once per content"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_settings = override_settings(
+            MEDIA_ROOT=self.media_root,
+            RECIPE_IMAGE_WORKERS=0,
+        )
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.addCleanup(shutil.rmtree, self.media_root)
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+
+    def upload_image(self, recipe, color="red"):
+        """Upload a generated image to the recipe and process it"""
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as temp_file:
+            Image.new("RGB", (10, 10), color).save(temp_file, format="JPEG")
+            temp_file.seek(0)
+            content = temp_file.read()
+            temp_file.seek(0)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    image_upload_url(recipe.id),
+                    {"image": temp_file},
+                    format="multipart",
+                )
+
+        recipe.refresh_from_db()
+
+        return content
+
+    def stored_files(self):
+        """Return the files stored under the media root"""
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.media_root)
+            for root, _, files in os.walk(self.media_root)
+            for name in files
+        )
+
+    def test_image_named_after_content(self):
+        """Test images are stored under their content hash"""
+        recipe = create_sample_recipe(user=self.user)
+
+        content = self.upload_image(recipe)
+
+        digest = hashlib.sha256(content).hexdigest()
+        self.assertEqual(
+            recipe.image.name,
+            f"uploads/recipe/{digest[:2]}/{digest}.jpg",
+        )
+
+    def test_identical_images_stored_once(self):
+        """Test the same image uploaded to several recipes is shared"""
+        recipe1 = create_sample_recipe(user=self.user, title="Recipe 1")
+        recipe2 = create_sample_recipe(user=self.user, title="Recipe 2")
+        self.upload_image(recipe1)
+        files = self.stored_files()
+
+        with patch("recipe.images.render_variant") as render_variant:
+            self.upload_image(recipe2)
+
+        render_variant.assert_not_called()
+        self.assertEqual(recipe2.image.name, recipe1.image.name)
+        self.assertEqual(recipe2.image_status, "ready")
+        self.assertEqual(recipe2.image_variants, recipe1.image_variants)
+        self.assertEqual(self.stored_files(), files)
+
+    def test_replaced_image_is_released(self):
+        """Test replacing an image deletes the unreferenced one"""
+        recipe = create_sample_recipe(user=self.user)
+        self.upload_image(recipe, color="red")
+        old_files = self.stored_files()
+
+        self.upload_image(recipe, color="blue")
+
+        new_files = self.stored_files()
+        self.assertTrue(new_files)
+        self.assertFalse(set(old_files) & set(new_files))
+
+    def test_shared_image_kept_until_unreferenced(self):
+        """Test deleting recipes only removes images nobody uses"""
+        recipe1 = create_sample_recipe(user=self.user, title="Recipe 1")
+        recipe2 = create_sample_recipe(user=self.user, title="Recipe 2")
+        self.upload_image(recipe1)
+        self.upload_image(recipe2)
+        files = self.stored_files()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(detail_url(recipe1.id))
+        self.assertEqual(self.stored_files(), files)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(detail_url(recipe2.id))
+        self.assertEqual(self.stored_files(), [])
+
+    def test_released_image_directories_removed(self):
+        """Test releasing an image removes its variant directory"""
+        recipe = create_sample_recipe(user=self.user)
+        self.upload_image(recipe)
+        variant_dir = recipe.image.storage.path(
+            get_variant_dir(recipe.image.name)
+        )
+        self.assertTrue(os.path.isdir(variant_dir))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(detail_url(recipe.id))
+
+        self.assertFalse(os.path.exists(variant_dir))
+        self.assertEqual(os.listdir(os.path.dirname(variant_dir)), [])
+
+    def test_release_keeps_image_used_meanwhile(self):
+        """Test images used by a recipe saved while releasing are kept"""
+        recipe = create_sample_recipe(user=self.user)
+        self.upload_image(recipe)
+        files = self.stored_files()
+
+        with patch(
+            "recipe.images.is_image_referenced", side_effect=[False, True]
+        ):
+            release_image(recipe.image.name)
+
+        self.assertEqual(self.stored_files(), files)
+
+    def test_upload_stores_image_released_meanwhile(self):
+        """Test uploads skipping a stored image store it again if released"""
+        recipe1 = create_sample_recipe(user=self.user, title="Recipe 1")
+        recipe2 = create_sample_recipe(user=self.user, title="Recipe 2")
+        content = self.upload_image(recipe1)
+        save = ContentAddressedStorage.save
+
+        def save_and_release(storage, name, *args, **kwargs):
+            # Skips storing the image, then recipe 1 releases it
+            name = save(storage, name, *args, **kwargs)
+            Recipe.objects.filter(pk=recipe1.pk).update(image=None)
+            release_image(name)
+            return name
+
+        with patch.object(
+            ContentAddressedStorage,
+            "save",
+            autospec=True,
+            side_effect=save_and_release,
+        ):
+            self.upload_image(recipe2)
+
+        with recipe2.image.open("rb") as image_file:
+            self.assertEqual(image_file.read(), content)
@@ -0,0 +1,227 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Recipe, Tag
+from recipe.tests.test_recipes_api import create_sample_recipe
+
+RECIPES_URL = reverse("recipe:recipe-list")
+BULK_URL = reverse("recipe:recipe-bulk")
+
+
+def sample_items(count, **params):
+    """Return a list of recipe payloads"""
+    items = []
+    for index in range(count):
+        item = {"title": f"Recipe {index}", "time_minutes": 10, "price": "4.50"}
+        item.update(params)
+        items.append(item)
+
+    return items
+
+
+class RecipeBulkApiTests(TestCase):
+    """Test writing recipes in bulk"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name="Vegan")
+        self.ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+
+    def test_bulk_create(self):
+        """Test creating a list of recipes with tags and ingredients"""
+        items = sample_items(
+            3, tags=[self.tag.id], ingredients=[self.ingredient.id]
+        )
+
+        response = self.client.post(BULK_URL, items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        recipes = Recipe.objects.filter(user=self.user).order_by("id")
+        self.assertEqual(
+            [recipe.title for recipe in recipes],
+            [item["title"] for item in items],
+        )
+        for recipe, data in zip(recipes, response.data):
+            self.assertEqual(data["id"], recipe.id)
+            self.assertEqual(data["tags"], [self.tag.id])
+            self.assertEqual(list(recipe.ingredients.all()), [self.ingredient])
+            self.assertEqual(recipe.price, Decimal("4.50"))
+
+    def test_bulk_create_query_count_is_constant(self):
+        """Test the number of queries does not grow with the items"""
+        items = sample_items(2, tags=[self.tag.id])
+        with self.assertNumQueries(9):
+            self.client.post(BULK_URL, items, format="json")
+
+        items = sample_items(50, tags=[self.tag.id])
+        with self.assertNumQueries(9):
+            self.client.post(BULK_URL, items, format="json")
+
+    def test_bulk_create_ndjson(self):
+        """Test recipes can be sent as newline delimited JSON"""
+        body = "\n".join(json.dumps(item) for item in sample_items(2))
+
+        response = self.client.post(
+            BULK_URL,
+            body + "\n",
+            content_type="application/x-ndjson",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 2)
+
+    def test_bulk_create_invalid_ndjson(self):
+        """Test malformed NDJSON lines are reported"""
+        response = self.client.post(
+            BULK_URL,
+            '{"title": "Ok"}\n{oops\n',
+            content_type="application/x-ndjson",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("line 2", response.data["detail"])
+
+    def test_bulk_create_reports_item_errors(self):
+        """Test invalid items are reported by position and nothing is saved"""
+        foreign_tag = Tag.objects.create(user=self.other_user, name="Other")
+        items = sample_items(3)
+        items[1]["title"] = ""
+        items[2]["tags"] = [self.tag.id, foreign_tag.id]
+
+        response = self.client.post(BULK_URL, items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("title", response.data[1])
+        self.assertEqual(len(response.data[2]["tags"]), 1)
+        self.assertIn(str(foreign_tag.id), response.data[2]["tags"][0])
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
+
+    @override_settings(RECIPE_BULK_MAX_ITEMS=2)
+    def test_bulk_create_max_items(self):
+        """Test the number of items per request is capped"""
+        response = self.client.post(BULK_URL, sample_items(3), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_requires_list(self):
+        """Test the payload must be a list"""
+        response = self.client.post(BULK_URL, sample_items(1)[0], format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update(self):
+        """Test partially updating a list of recipes"""
+        recipe1 = create_sample_recipe(user=self.user, title="Recipe 1")
+        recipe2 = create_sample_recipe(user=self.user, title="Recipe 2")
+        recipe2.tags.add(self.tag)
+        new_tag = Tag.objects.create(user=self.user, name="Quick")
+
+        response = self.client.patch(
+            BULK_URL,
+            [
+                {"id": recipe1.id, "title": "Updated"},
+                {"id": recipe2.id, "tags": [new_tag.id]},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        recipe1.refresh_from_db()
+        recipe2.refresh_from_db()
+        self.assertEqual(recipe1.title, "Updated")
+        self.assertEqual(recipe2.title, "Recipe 2")
+        self.assertEqual(list(recipe2.tags.all()), [new_tag])
+        self.assertEqual(response.data[1]["tags"], [new_tag.id])
+
+    def test_bulk_update_foreign_recipe(self):
+        """Test recipes of other users cannot be updated"""
+        recipe = create_sample_recipe(user=self.user)
+        foreign = create_sample_recipe(user=self.other_user, title="Foreign")
+
+        response = self.client.patch(
+            BULK_URL,
+            [
+                {"id": recipe.id, "title": "Updated"},
+                {"id": foreign.id, "title": "Updated"},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("id", response.data[1])
+        foreign.refresh_from_db()
+        recipe.refresh_from_db()
+        self.assertEqual(foreign.title, "Foreign")
+        self.assertEqual(recipe.title, "Sample recipe")
+
+    def test_bulk_update_boolean_id(self):
+        """Test booleans are not taken for recipe ids"""
+        recipe = create_sample_recipe(user=self.user, id=1)
+
+        response = self.client.patch(
+            BULK_URL, [{"id": True, "title": "Updated"}], format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("id", response.data[0])
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, "Sample recipe")
+
+    def test_bulk_delete(self):
+        """Test deleting a list of recipes"""
+        recipes = [create_sample_recipe(user=self.user) for _ in range(3)]
+
+        response = self.client.delete(
+            BULK_URL,
+            [recipes[0].id, recipes[2].id],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            list(Recipe.objects.filter(user=self.user)),
+            [recipes[1]],
+        )
+
+    def test_bulk_delete_foreign_recipe(self):
+        """Test deleting recipes of other users fails as a whole"""
+        recipe = create_sample_recipe(user=self.user)
+        foreign = create_sample_recipe(user=self.other_user)
+
+        response = self.client.delete(
+            BULK_URL,
+            [recipe.id, foreign.id],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Recipe.objects.count(), 2)
+
+    def test_bulk_write_invalidates_cache(self):
+        """Test cached lists include recipes written in bulk"""
+        self.client.get(RECIPES_URL)
+
+        self.client.post(BULK_URL, sample_items(2), format="json")
+        response = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(response.data["results"]), 2)
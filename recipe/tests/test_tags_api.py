@@ -9,8 +9,9 @@ from core.models import Recipe, Tag
 
 from recipe.serializers import TagSerializer
 
-
 TAGS_URL = reverse("recipe:tag-list")
+TAGS_BULK_URL = reverse("recipe:tag-bulk")
+TAGS_SUGGEST_URL = reverse("recipe:tag-suggest")
 
 
 class PublicTagsApiTest(TestCase):
@@ -42,10 +43,30 @@ class PrivateTagsApiTest(TestCase):
         Tag.objects.create(name="Dessert", user=self.user)
 
         response = self.client.get(TAGS_URL)
-        tags = Tag.objects.all().order_by("-name")
+        tags = Tag.objects.filter(user=self.user).order_by("id")
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
+
+    def test_retrieve_tags_paginated(self):
+        """Test that tags are returned in pages ordered by id"""
+        tags = [
+            Tag.objects.create(name=f"Tag {index}", user=self.user)
+            for index in range(3)
+        ]
+
+        response = self.client.get(TAGS_URL, {"page_size": 2})
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]],
+            [tag.id for tag in tags[:2]],
+        )
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]],
+            [tags[2].id],
+        )
+        self.assertIsNone(response.data["next"])
 
     def test_tags_limited_to_user(self):
         """Test that tags returned are for the autheticated user"""
@@ -58,8 +79,11 @@ class PrivateTagsApiTest(TestCase):
 
         response = self.client.get(TAGS_URL)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["name"], tag.name)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(
+            response.data["results"][0]["name"],
+            tag.name,
+        )
 
     def test_create_tag_successful(self):
         """Test creating a new tag"""
@@ -79,6 +103,147 @@ class PrivateTagsApiTest(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_create_duplicate_tag(self):
+        """Test creating a tag whose name is already used by the user"""
+        Tag.objects.create(user=self.user, name="Main  Course")
+        response = self.client.post(TAGS_URL, {"name": " main course"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("name", response.data)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
+    def test_create_tag_name_used_by_another_user(self):
+        """Test names only have to be unique for the same user"""
+        new_user = get_user_model().objects.create_user(
+            email="another_user@example.com",
+            password="testpassword",
+        )
+        Tag.objects.create(user=new_user, name="Vegan")
+        response = self.client.post(TAGS_URL, {"name": "Vegan"})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_bulk_upsert_tags(self):
+        """Test getting or creating tags from a list of names"""
+        new_user = get_user_model().objects.create_user(
+            email="another_user@example.com",
+            password="testpassword",
+        )
+        Tag.objects.create(user=new_user, name="Vegan")
+        existing = Tag.objects.create(user=self.user, name="Dessert")
+
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                TAGS_BULK_URL,
+                ["vegan", "DESSERT", "Quick", "quick "],
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tags = Tag.objects.filter(user=self.user)
+        self.assertEqual(
+            sorted(tag.name for tag in tags), ["Dessert", "Quick", "vegan"]
+        )
+        vegan = tags.get(name="vegan")
+        quick = tags.get(name="Quick")
+        self.assertEqual(
+            response.data,
+            [
+                {"id": vegan.id, "name": "vegan"},
+                {"id": existing.id, "name": "Dessert"},
+                {"id": quick.id, "name": "Quick"},
+                {"id": quick.id, "name": "Quick"},
+            ],
+        )
+
+    def test_bulk_upsert_tags_invalid(self):
+        """Test invalid names are reported per item and nothing is saved"""
+        response = self.client.post(
+            TAGS_BULK_URL, ["Vegan", "", 3, "x" * 256], format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("name", response.data[1])
+        self.assertEqual(response.data[2], {})
+        self.assertIn("name", response.data[3])
+        self.assertFalse(Tag.objects.exists())
+
+    def test_bulk_upsert_tags_requires_list(self):
+        """Test the bulk payload has to be a list"""
+        response = self.client.post(
+            TAGS_BULK_URL, {"name": "Vegan"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_suggest_tags(self):
+        """Test names starting with the query come first, then words"""
+        green = Tag.objects.create(user=self.user, name="Green curry")
+        curry = Tag.objects.create(user=self.user, name="Curry")
+        paste = Tag.objects.create(user=self.user, name="Curry paste")
+        Tag.objects.create(user=self.user, name="Soup")
+        new_user = get_user_model().objects.create_user(
+            email="another_user@example.com",
+            password="testpassword",
+        )
+        Tag.objects.create(user=new_user, name="Curry leaves")
+
+        response = self.client.get(TAGS_SUGGEST_URL, {"q": " CUR"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [
+                {"id": curry.id, "name": "Curry"},
+                {"id": paste.id, "name": "Curry paste"},
+                {"id": green.id, "name": "Green curry"},
+            ],
+        )
+
+    def test_suggest_tags_limit(self):
+        """Test the number of suggestions can be limited"""
+        for name in ("Curry", "Curry paste", "Green curry"):
+            Tag.objects.create(user=self.user, name=name)
+
+        response = self.client.get(TAGS_SUGGEST_URL, {"q": "cur", "limit": 2})
+
+        self.assertEqual(
+            [tag["name"] for tag in response.data], ["Curry", "Curry paste"]
+        )
+
+        response = self.client.get(TAGS_SUGGEST_URL, {"q": "cur", "limit": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_suggest_tags_sees_changes(self):
+        """Test suggestions follow created, renamed and deleted tags"""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        response = self.client.get(TAGS_SUGGEST_URL, {"q": "ve"})
+        self.assertEqual(response.data, [{"id": tag.id, "name": "Vegan"}])
+
+        tag.name = "Vegetarian"
+        tag.save()
+        other = Tag.objects.create(user=self.user, name="Velvet cake")
+        response = self.client.get(TAGS_SUGGEST_URL, {"q": "ve"})
+        self.assertEqual(
+            response.data,
+            [
+                {"id": tag.id, "name": "Vegetarian"},
+                {"id": other.id, "name": "Velvet cake"},
+            ],
+        )
+
+        tag.delete()
+        response = self.client.get(TAGS_SUGGEST_URL, {"q": "veg"})
+        self.assertEqual(response.data, [])
+
+    def test_suggest_tags_blank_query(self):
+        """Test a blank query suggests nothing"""
+        Tag.objects.create(user=self.user, name="Vegan")
+        response = self.client.get(TAGS_SUGGEST_URL, {"q": " "})
+
+        self.assertEqual(response.data, [])
+
     def test_retrieve_tags_assigned_to_recipes(self):
         """Test filtering tags by those assigned to recipes"""
         tag1 = Tag.objects.create(user=self.user, name="Tag1")
@@ -96,5 +261,54 @@ class PrivateTagsApiTest(TestCase):
         serializer1 = TagSerializer(tag1)
         serializer2 = TagSerializer(tag2)
 
-        self.assertIn(serializer1.data, response.data)
-        self.assertNotIn(serializer2.data, response.data)
+        self.assertIn(serializer1.data, response.data["results"])
+        self.assertNotIn(serializer2.data, response.data["results"])
+
+    def test_retrieve_tags_assigned_unique(self):
+        """Test filtering tags by assigned returns unique items"""
+        tag = Tag.objects.create(user=self.user, name="Breakfast")
+        Tag.objects.create(user=self.user, name="Lunch")
+        for title in ("Pancakes", "Porridge"):
+            recipe = Recipe.objects.create(
+                title=title,
+                time_minutes=5,
+                price=3.00,
+                user=self.user,
+            )
+            recipe.tags.add(tag)
+
+        response = self.client.get(TAGS_URL, {"assigned_only": 1})
+
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_retrieve_tags_with_counts(self):
+        """Test tags can be annotated with the number of recipes using them"""
+        tag1 = Tag.objects.create(user=self.user, name="Breakfast")
+        tag2 = Tag.objects.create(user=self.user, name="Lunch")
+        for title in ("Pancakes", "Porridge"):
+            recipe = Recipe.objects.create(
+                title=title,
+                time_minutes=5,
+                price=3.00,
+                user=self.user,
+            )
+            recipe.tags.add(tag1)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(TAGS_URL, {"with_counts": 1})
+
+        self.assertEqual(
+            response.data["results"],
+            [
+                {"id": tag1.id, "name": tag1.name, "recipe_count": 2},
+                {"id": tag2.id, "name": tag2.name, "recipe_count": 0},
+            ],
+        )
+
+        response = self.client.get(
+            TAGS_URL, {"with_counts": 1, "assigned_only": 1}
+        )
+        self.assertEqual(
+            response.data["results"],
+            [{"id": tag1.id, "name": tag1.name, "recipe_count": 2}],
+        )
@@ -0,0 +1,90 @@
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from recipe.uploads import ImageUploadHandler, UploadTooLarge
+
+
+def sample_image_bytes(size=(300, 300), image_format="PNG") -> bytes:
+    """Return a noisy image that does not compress well"""
+    image = Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3))
+    buffer = BytesIO()
+    image.save(buffer, format=image_format)
+
+    return buffer.getvalue()
+
+
+class ImageUploadHandlerTests(SimpleTestCase):
+    """Test the streaming image upload handler"""
+
+    def stream(self, content, chunk_size=1024):
+        """Feed `content` to a new handler and return the uploaded file"""
+        handler = ImageUploadHandler()
+        handler.new_file("image", "image.png", "image/png", None)
+        for start in range(0, len(content), chunk_size):
+            end = start + chunk_size
+            handler.receive_data_chunk(content[start:end], start)
+
+        return handler.file_complete(len(content))
+
+    def test_stream_image(self):
+        """Test the upload is written to the temp dir and hashed"""
+        content = sample_image_bytes()
+
+        uploaded = self.stream(content)
+
+        self.assertEqual(uploaded.read(), content)
+        self.assertEqual(uploaded.sha256, hashlib.sha256(content).hexdigest())
+        path = uploaded.temporary_file_path()
+        self.assertTrue(path.startswith(settings.RECIPE_IMAGE_UPLOAD_TEMP_DIR))
+        # Not served with the media while in progress
+        self.assertFalse(path.startswith(settings.MEDIA_ROOT))
+        uploaded.close()
+
+    @override_settings(RECIPE_IMAGE_MAX_PIXELS=1000)
+    def test_pixels_checked_from_header(self):
+        """Test pixel limits are enforced before the whole file is read"""
+        content = sample_image_bytes()
+        handler = ImageUploadHandler()
+        handler.new_file("image", "image.png", "image/png", None)
+
+        with self.assertRaises(UploadTooLarge):
+            handler.receive_data_chunk(content[:1024], 0)
+        handler.upload_interrupted()
+
+    @override_settings(RECIPE_IMAGE_MAX_BYTES=4096)
+    def test_bytes_limit(self):
+        """Test streaming stops once the byte limit is exceeded"""
+        with self.assertRaises(UploadTooLarge):
+            self.stream(sample_image_bytes())
+
+    def test_request_content_length_limit(self):
+        """Test oversized requests are rejected before reading the body"""
+        handler = ImageUploadHandler()
+
+        with self.assertRaises(UploadTooLarge):
+            handler.handle_raw_input(
+                None, {}, settings.RECIPE_IMAGE_MAX_BYTES * 2, b"boundary"
+            )
+
+    def test_not_an_image(self):
+        """Test content that is not an image is rejected"""
+        with self.assertRaises(ValidationError):
+            self.stream(b"not an image" * 10)
+
+    @override_settings(RECIPE_IMAGE_HEADER_BYTES=2048)
+    def test_header_limit(self):
+        """Test content without readable dimensions is rejected early"""
+        handler = ImageUploadHandler()
+        handler.new_file("image", "image.png", "image/png", None)
+        handler.receive_data_chunk(b"x" * 1024, 0)
+
+        with self.assertRaises(ValidationError):
+            handler.receive_data_chunk(b"x" * 1024, 1024)
+        handler.upload_interrupted()
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import tempfile
+import warnings
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import (
+    TemporaryUploadedFile,
+    UploadedFile,
+)
+from django.core.files.uploadhandler import FileUploadHandler
+from django.utils.translation import gettext_lazy as _
+
+from PIL import Image
+from rest_framework import exceptions, status
+
+# Bytes allowed in a request on top of the image for the multipart framing
+MULTIPART_OVERHEAD = 64 * 2**10
+
+
+class UploadTooLarge(exceptions.APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = _("Uploaded image is too large.")
+    default_code = "upload_too_large"
+
+
+class StreamedUploadedFile(TemporaryUploadedFile):
+    """Temporary upload created in `directory`, hashed as it is written.
+
+    Keeping it on the same filesystem as the storage lets
+    `FileSystemStorage` move it in place instead of copying it.
+    """
+
+    def __init__(
+        self, name, content_type, charset, content_type_extra, directory
+    ):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(
+            suffix=".upload" + ext,
+            dir=directory,
+        )
+        UploadedFile.__init__(
+            self, file, name, content_type, 0, charset, content_type_extra
+        )
+        self.sha256 = None
+
+
+def get_upload_temp_dir() -> str:
+    """Return the directory uploads are streamed to, out of the media"""
+    directory = settings.RECIPE_IMAGE_UPLOAD_TEMP_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    return directory
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """Stream image uploads to disk, enforcing limits as early as possible.
+
+    - Requests whose `Content-Length` exceeds `RECIPE_IMAGE_MAX_BYTES` are
+      rejected before reading the body, and so are files growing past it.
+    - The image dimensions are read from the first chunks, without
+      decoding the image, and uploads above `RECIPE_IMAGE_MAX_PIXELS` or
+      that are not images are rejected right away.
+    - The content is hashed while streaming; the digest is available as
+      `sha256` on the uploaded file.
+    """
+
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ):
+        limit = settings.RECIPE_IMAGE_MAX_BYTES + MULTIPART_OVERHEAD
+        if content_length and content_length > limit:
+            raise UploadTooLarge()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.size = 0
+        self.hasher = hashlib.sha256()
+        self.header = bytearray()
+        self.header_checked = False
+        self.file = StreamedUploadedFile(
+            self.file_name,
+            self.content_type,
+            self.charset,
+            self.content_type_extra,
+            get_upload_temp_dir(),
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > settings.RECIPE_IMAGE_MAX_BYTES:
+            raise UploadTooLarge()
+
+        self.hasher.update(raw_data)
+        if not self.header_checked:
+            self.header += raw_data
+            self.check_header()
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if not self.header_checked:
+            self.check_header(complete=True)
+
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.hasher.hexdigest()
+
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, "file"):
+            self.file.close()
+
+    def check_header(self, complete=False):
+        """Check the image dimensions once enough of it is received"""
+        try:
+            with warnings.catch_warnings():
+                # Dimensions are checked against our own limit below
+                warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+                with Image.open(BytesIO(self.header)) as image:
+                    width, height = image.size
+        except Image.DecompressionBombError:
+            raise UploadTooLarge(_("Uploaded image has too many pixels."))
+        except Exception:
+            header_limit = settings.RECIPE_IMAGE_HEADER_BYTES
+            if not complete and len(self.header) < header_limit:
+                return
+            raise exceptions.ValidationError(
+                {"image": [_("Upload a valid image.")]}
+            )
+
+        self.header_checked = True
+        self.header = None
+        if width * height > settings.RECIPE_IMAGE_MAX_PIXELS:
+            raise UploadTooLarge(_("Uploaded image has too many pixels."))
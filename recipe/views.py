@@ -1,14 +1,34 @@
+from decimal import Decimal
+
+from django.conf import settings
+
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from accounts.authentication import TokenAuthentication
 from core.models import Ingredient, Recipe, Tag
-from recipe import serializers
+from core.parsers import FastJSONParser
+from core.routers import ReplicaReadMixin
+from core.viewsets import AsyncReadMixin
+from recipe import (
+    bulk,
+    filters,
+    images,
+    search,
+    serializers,
+    suggest,
+    uploads,
+)
+from recipe.cache import CachedResponseMixin, get_stats
+from recipe.parsers import NDJSONParser
 
 
 class BaseRecipeAttrViewSet(
+    ReplicaReadMixin,
+    AsyncReadMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
@@ -17,26 +37,84 @@ class BaseRecipeAttrViewSet(
 
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    # `Recipe` many to many field linking recipes to these objects
+    recipe_field = None
+    # Serializer used when the recipe count is requested with `?with_counts=1`
+    usage_serializer_class = None
+
+    @property
+    def with_counts(self) -> bool:
+        return filters.params_to_bool(
+            self.request.query_params.get("with_counts")
+        )
 
     def get_queryset(self):
         """Returns objects that belongs to the authenticated user"""
-        assigned_only = bool(self.request.query_params.get("assigned_only"))
-        queryset = self.queryset
+        assigned_only = filters.params_to_bool(
+            self.request.query_params.get("assigned_only")
+        )
+        queryset = self.queryset.filter(user=self.request.user)
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+            queryset = filters.filter_assigned(queryset, self.recipe_field)
+        if self.with_counts:
+            queryset = filters.annotate_recipe_count(
+                queryset, self.recipe_field
+            )
 
-        return queryset.filter(user=self.request.user)
+        return queryset
+
+    def get_serializer_class(self):
+        """Return the usage serializer when recipe counts are requested"""
+        if self.action == "list" and self.with_counts:
+            return self.usage_serializer_class
+
+        return self.serializer_class
 
     def perform_create(self, serializer):
         """Creates an object owned by the authenticated user"""
         serializer.save(user=self.request.user)
 
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk",
+        url_name="bulk",
+        parser_classes=(FastJSONParser, NDJSONParser),
+    )
+    def bulk_upsert(self, request):
+        """Get or create objects from a list of names"""
+        objects = bulk.upsert_by_name(
+            self.queryset.model, request.user, request.data
+        )
+        serializer = self.serializer_class(objects, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(methods=["GET"], detail=False)
+    def suggest(self, request):
+        """Suggest objects whose name looks like `?q=`, best first"""
+        limit = filters.params_to_limit(
+            request.query_params.get("limit"),
+            "limit",
+            default=settings.RECIPE_SUGGEST_LIMIT,
+            maximum=settings.RECIPE_SUGGEST_MAX_LIMIT,
+        )
+        objects = suggest.suggest_names(
+            self.queryset,
+            request.user,
+            request.query_params.get("q", ""),
+            limit,
+        )
+        serializer = self.serializer_class(objects, many=True)
+        return Response(serializer.data)
+
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
     """Manage ingredients"""
 
     queryset = Ingredient.objects.all()
     serializer_class = serializers.IngredientSerializer
+    usage_serializer_class = serializers.IngredientUsageSerializer
+    recipe_field = "ingredients"
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
@@ -44,38 +122,151 @@ class TagViewSet(BaseRecipeAttrViewSet):
 
     queryset = Tag.objects.all()
     serializer_class = serializers.TagSerializer
+    usage_serializer_class = serializers.TagUsageSerializer
+    recipe_field = "tags"
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    ReplicaReadMixin,
+    CachedResponseMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     """Manage recipes"""
 
     serializer_class = serializers.RecipeSerializer
     queryset = Recipe.objects.all()
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    # Read only actions whose queryset is shaped by the serializer in use
+    eager_loading_actions = ("list", "retrieve")
+    # Range query params, as the lookup they filter on and their type
+    range_filters = {
+        "max_time": ("time_minutes__lte", int),
+        "price_min": ("price__gte", Decimal),
+        "price_max": ("price__lte", Decimal),
+    }
+    # Fields recipes can be listed by with `?ordering=`
+    ordering_fields = ("id", "time_minutes", "price")
 
     def get_queryset(self):
         """Retrieve the recipes that belongs to the authenticated user"""
-        tags = self.request.query_params.get("tags")
-        ingredients = self.request.query_params.get("ingredients")
-        queryset = self.queryset
-        if tags:
-            tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
-        if ingredients:
-            ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
-
-        return queryset.filter(user=self.request.user)
-
-    def _params_to_ints(self, qs: str) -> list:
-        """Convert a list of string IDs to a list of integers"""
-        return [int(str_id) for str_id in qs.split(",")]
+        queryset = self.queryset.filter(user=self.request.user)
+        for param in ("tags", "ingredients"):
+            value = self.request.query_params.get(param)
+            if not value:
+                continue
+            ids = filters.params_to_ints(value, param)
+            if ids:
+                match = filters.get_match(self.request.query_params, param)
+                queryset = filters.filter_by_related(
+                    queryset, param, ids, match
+                )
+
+        for param, (lookup, number_type) in self.range_filters.items():
+            value = self.request.query_params.get(param)
+            if value:
+                number = filters.params_to_number(value, param, number_type)
+                queryset = queryset.filter(**{lookup: number})
+
+        query = self.request.query_params.get("search")
+        if query:
+            queryset = search.search_recipes(queryset, query)
+
+        if self.action in self.eager_loading_actions:
+            serializer_class = self.get_serializer_class()
+            ordering = self.get_pagination_ordering(queryset)
+            queryset = serializer_class.setup_eager_loading(
+                queryset,
+                columns=[field.lstrip("-") for field in ordering or ()],
+                **self.get_sparse_fields(),
+            )
+
+        return queryset
+
+    def get_sparse_fields(self) -> dict:
+        """Return the `?fields=` and `?expand=` requested for reads"""
+        if self.action not in self.eager_loading_actions:
+            return {}
+
+        serializer_class = self.get_serializer_class()
+        params = self.request.query_params
+        fields = filters.params_to_names(
+            params.get("fields"),
+            "fields",
+            serializer_class.get_readable_field_names(),
+        )
+        expand = filters.params_to_names(
+            params.get("expand"),
+            "expand",
+            tuple(serializer_class.expandable_fields),
+        )
+
+        return {"fields": fields, "expand": expand or ()}
+
+    def get_serializer(self, *args, **kwargs):
+        """Return a serializer rendering the fields requested"""
+        kwargs.update(self.get_sparse_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_pagination_ordering(self, queryset):
+        """Return the requested ordering, else search results by relevance"""
+        ordering = filters.get_ordering(
+            self.request.query_params, self.ordering_fields
+        )
+        if ordering is None and "search_rank" in queryset.query.annotations:
+            ordering = ("-search_rank", "id")
+
+        return ordering
+
+    def get_last_modified(self, kwargs):
+        """Return the update timestamp of the requested recipe"""
+        if self.action != "retrieve":
+            return None
+
+        try:
+            updated_at = (
+                self.queryset.filter(user=self.request.user, pk=kwargs["pk"])
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+        except ValueError:
+            return None
+        if updated_at is not None:
+            return int(updated_at.timestamp())
+
+    def get_object(self):
+        """Return the recipe, recording when it was last modified"""
+        recipe = super().get_object()
+        if self.action == "retrieve":
+            self.last_modified = int(recipe.updated_at.timestamp())
+
+        return recipe
+
+    async def aget_object(self):
+        recipe = await super().aget_object()
+        if self.action == "retrieve":
+            self.last_modified = int(recipe.updated_at.timestamp())
+
+        return recipe
+
+    def use_values_serializer(self) -> bool:
+        """Return whether the list can be rendered from `values()` rows.
+
+        Only for reads that do not nest related objects, so that forms of
+        the browsable API keep using the model serializer.
+        """
+        if not settings.RECIPE_FAST_LIST or self.request.method != "GET":
+            return False
+
+        return not self.request.query_params.get("expand")
 
     def get_serializer_class(self, *args, **kwargs):
         """Return appropriate serializer class"""
         if self.action == "retrieve":
             return serializers.RecipeDetailSerializer
+        elif self.action == "list" and self.use_values_serializer():
+            return serializers.RecipeValuesSerializer
         elif self.action == "upload_image":
             return serializers.RecipeImageSerializer
 
@@ -85,14 +276,72 @@ class RecipeViewSet(viewsets.ModelViewSet):
         """Creates an object owned by the authenticated user"""
         serializer.save(user=self.request.user)
 
-    @action(methods=["POST"], detail=True, url_path="upload-image")
+    def get_bulk_response(self, pks, status_code):
+        """Return the recipes written by a bulk action"""
+        queryset = self.serializer_class.setup_eager_loading(
+            self.queryset.filter(pk__in=pks)
+        ).in_bulk(pks)
+        serializer = self.serializer_class(
+            [queryset[pk] for pk in pks], many=True
+        )
+
+        return Response(serializer.data, status=status_code)
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk",
+        url_name="bulk",
+        parser_classes=(FastJSONParser, NDJSONParser),
+    )
+    def bulk_create(self, request):
+        """Create a list of recipes, given as a JSON array or NDJSON"""
+        pks = bulk.bulk_create_recipes(request.user, request.data)
+        return self.get_bulk_response(pks, status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """Partially update a list of recipes identified by their id"""
+        pks = bulk.bulk_update_recipes(request.user, request.data)
+        return self.get_bulk_response(pks, status.HTTP_200_OK)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request):
+        """Delete a list of recipes given by their id"""
+        bulk.bulk_delete_recipes(request.user, request.data)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(methods=["GET", "POST"], detail=True, url_path="upload-image")
     def upload_image(self, request, pk=None):
-        """Upload an image to a recipe"""
+        """Upload an image to a recipe, or check its processing status"""
         recipe = self.get_object()
+        if request.method == "GET":
+            serializer = self.get_serializer(recipe)
+            return Response(serializer.data)
+
+        request.upload_handlers = [uploads.ImageUploadHandler(request)]
         serializer = self.get_serializer(recipe, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            recipe = serializer.save(
+                image_status=Recipe.ImageStatus.PENDING,
+                image_variants={},
+            )
+            if recipe.image:
+                images.keep_image(
+                    recipe.image.name, serializer.validated_data["image"]
+                )
+            images.schedule_processing(recipe)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CacheStatsView(APIView):
+    """Expose the recipe response cache hit/miss counters"""
+
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(get_stats())